@@ -0,0 +1,130 @@
+"""
+
+Python Interchangeable Virtual Instrument Library
+
+Copyright (c) 2016 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+# Cached property read benchmark
+#
+# Measures the time to read a cached property (scope.timebase.range) through
+# the property tree, compared against the same read on a driver using the old
+# inspect.stack() based cache tag lookup.
+#
+# usage: python benchmarks/bench_cache.py
+
+import inspect
+import io
+import os
+import sys
+import timeit
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import ivi
+
+
+class LoopbackInstrument(object):
+    "Minimal interface that answers every query with a fixed value"
+    def __init__(self, response=b'+1.00000E-03'):
+        self.response = response
+        self.read_buffer = io.BytesIO()
+
+    def write_raw(self, data):
+        if b'?' in data:
+            self.read_buffer = io.BytesIO(self.response)
+
+    def read_raw(self, num=-1):
+        return self.read_buffer.read(num)
+
+
+def legacy_get_cache_tag(self, tag=None, skip=1):
+    "Cache tag lookup as implemented before the tag registry"
+    if tag is None:
+        stack = inspect.stack()
+        start = 0 + skip
+        if len(stack) < start + 1:
+            return ''
+        tag = stack[start][3]
+
+    if tag[0:4] == "_get": tag = tag[4:]
+    if tag[0:4] == "_set": tag = tag[4:]
+    if tag[0] == "_": tag = tag[1:]
+
+    return tag
+
+
+def legacy_get_cache_valid(self, tag=None, index=-1, skip_disable=False):
+    if not skip_disable and not self._driver_operation_cache:
+        return False
+    tag = self._get_cache_tag(tag, 2)
+    if index >= 0:
+        tag = tag + '_%d' % index
+    try:
+        return self._cache_valid[tag]
+    except KeyError:
+        self._cache_valid[tag] = False
+        return False
+
+
+def legacy_set_cache_valid(self, valid=True, tag=None, index=-1):
+    tag = self._get_cache_tag(tag, 2)
+    if index >= 0:
+        tag = tag + '_%d' % index
+    self._cache_valid[tag] = valid
+
+
+def bench(stmt, number):
+    t = min(timeit.repeat(stmt, number=number, repeat=5))
+    return t / number
+
+
+def main():
+    scope = ivi.agilent.agilentDSOX3034A(LoopbackInstrument())
+
+    # same driver with the cache methods replaced by the legacy ones
+    legacy = ivi.agilent.agilentDSOX3034A(LoopbackInstrument())
+    legacy._get_cache_tag = types.MethodType(legacy_get_cache_tag, legacy)
+    legacy._get_cache_valid = types.MethodType(legacy_get_cache_valid, legacy)
+    legacy._set_cache_valid = types.MethodType(legacy_set_cache_valid, legacy)
+
+    # prime the caches
+    scope.timebase.range
+    legacy.timebase.range
+
+    def read_range():
+        scope.timebase.range
+
+    def read_range_legacy():
+        legacy.timebase.range
+
+    t_new = bench(read_range, 100000)
+    t_old = bench(read_range_legacy, 200)
+
+    print("cached scope.timebase.range read:           %8.3f us" % (t_new * 1e6))
+    print("same read with inspect.stack() tag lookup:  %8.3f us" % (t_old * 1e6))
+    print("speedup:                                    %8.1fx" % (t_old / t_new))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+
+Python Interchangeable Virtual Instrument Library
+
+Copyright (c) 2016 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+# Arbitrary waveform encoding benchmark
+#
+# Measures the time to clip, scale and pack a 1M point waveform to 12 bit
+# MSB-first codes as used by the Tektronix AWG2000 series, compared against
+# the previous per-sample struct.pack loop (run on a shorter record, since
+# it is quadratic in the record length).
+#
+# usage: python benchmarks/bench_fgen_encode.py
+
+import os
+import struct
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+
+from ivi import fgen
+
+
+def legacy_encode(y):
+    "Encoding loop as implemented before encode_arbitrary_waveform"
+    raw_data = b''
+
+    for f in y:
+        if f > 1.0: f = 1.0
+        if f < -1.0: f = -1.0
+
+        f = (f + 1) / 2
+
+        i = int(f * ((1 << 12) - 2) + 0.5) & 0x000fffff
+
+        raw_data = raw_data + struct.pack('>H', i)
+
+    return raw_data
+
+
+def bench(f, *args):
+    best = None
+    for k in range(3):
+        start = time.time()
+        f(*args)
+        t = time.time() - start
+        if best is None or t < best:
+            best = t
+    return best
+
+
+def main():
+    n = 1 << 20
+    y = np.sin(2*np.pi/n*np.arange(n)) * 1.1
+
+    n_legacy = 1 << 15
+    y_legacy = y[::n//n_legacy]
+
+    assert legacy_encode(y_legacy) == fgen.encode_arbitrary_waveform(y_legacy, '>u2', 12)
+
+    t_new = bench(fgen.encode_arbitrary_waveform, y, '>u2', 12)
+    t_old = bench(legacy_encode, y_legacy)
+
+    print("encode_arbitrary_waveform, %7d points: %10.3f ms" % (n, t_new * 1e3))
+    print("legacy struct.pack loop,   %7d points: %10.3f ms" % (n_legacy, t_old * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+
+Python Interchangeable Virtual Instrument Library
+
+Copyright (c) 2016 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+# Property dispatch benchmark
+#
+# Measures the overhead of reading and writing managed properties through the
+# property tree in simulate mode, where the getters and setters do no I/O, and
+# reports the cost per attribute hop along the dotted path.
+#
+# usage: python benchmarks/bench_property.py
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import ivi
+
+
+def bench(stmt, number=100000):
+    # the statements run in the timeit namespace, import the drivers into it
+    setup = "from %s import scope, ch" % __name__
+    t = min(timeit.repeat(stmt, setup, number=number, repeat=5))
+    return t / number
+
+
+def main():
+    global scope, ch
+    scope = ivi.agilent.agilentDSOX3034A(simulate=True)
+    ch = scope.channels[0]
+
+    tests = [
+        # (description, statement, hops)
+        ("read  scope._timebase_range (plain)", "scope._timebase_range", 1),
+        ("read  scope.timebase.range", "scope.timebase.range", 2),
+        ("write scope.timebase.range", "scope.timebase.range = 1e-3", 2),
+        ("read  scope.channels[0].offset", "scope.channels[0].offset", 3),
+        ("write scope.channels[0].offset", "scope.channels[0].offset = 0.1", 3),
+        ("read  ch.offset", "ch.offset", 1),
+        ("read  scope.driver_operation.simulate", "scope.driver_operation.simulate", 2),
+    ]
+
+    print("%-40s %10s %10s" % ("operation", "total", "per hop"))
+    for desc, stmt, hops in tests:
+        t = bench(stmt)
+        print("%-40s %8.3f us %8.3f us" % (desc, t * 1e6, t * 1e6 / hops))
+
+
+if __name__ == '__main__':
+    main()
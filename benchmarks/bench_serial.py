@@ -0,0 +1,138 @@
+"""
+
+Python Interchangeable Virtual Instrument Library
+
+Copyright (c) 2016 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+# Serial transport benchmark
+#
+# Measures queries per second and client CPU time per query through
+# interface.pyserial.SerialInstrument over a pseudo terminal loopback.
+# The responder paces its output at the line rate of the selected baud
+# rate (10 bit times per character), compared against the old
+# character-at-a-time read loop, and against pipelined query lists.
+#
+# usage: python benchmarks/bench_serial.py
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ivi.interface import pyserial
+
+RESPONSE = b'+1.23456789E+00\n'
+
+
+class Responder(threading.Thread):
+    "Answers every line received on the pty master at the given line rate"
+    def __init__(self, fd, baudrate):
+        super(Responder, self).__init__()
+        self.daemon = True
+        self.fd = fd
+        self.char_time = 10.0 / baudrate
+
+    def run(self):
+        data = b''
+        while True:
+            try:
+                d = os.read(self.fd, 4096)
+            except OSError:
+                break
+            if not d:
+                break
+            # time to receive the command
+            time.sleep(len(d) * self.char_time)
+            data += d
+            while b'\n' in data:
+                cmd, data = data.split(b'\n', 1)
+                # send in pieces of about a millisecond on the line
+                step = max(1, int(1e-3 / self.char_time))
+                for i in range(0, len(RESPONSE), step):
+                    chunk = RESPONSE[i:i+step]
+                    time.sleep(len(chunk) * self.char_time)
+                    os.write(self.fd, chunk)
+
+
+class LegacySerialInstrument(pyserial.SerialInstrument):
+    "Character-at-a-time read loop as implemented before buffering"
+    def read_raw(self, num=-1):
+        data = b''
+        term_char = str(self.term_char).encode('utf-8')[0:1]
+        while True:
+            c = self.serial.read(1)
+            data += c
+            num -= 1
+            if c == term_char:
+                break
+            if num == 0:
+                break
+        return data
+
+    def ask(self, message, num=-1, encoding='utf-8'):
+        if type(message) is tuple or type(message) is list:
+            return [self.ask(m, num, encoding) for m in message]
+        self.write(message, encoding)
+        return self.read(num, encoding)
+
+
+def bench(cls, baudrate, count, pipeline):
+    master, slave = os.openpty()
+    responder = Responder(master, baudrate)
+    responder.start()
+
+    inst = cls(os.ttyname(slave), baudrate=baudrate, timeout=5)
+
+    t0 = time.time()
+    c0 = time.thread_time()
+    if pipeline:
+        for i in range(0, count, 10):
+            inst.ask([':MEAS:VOLT?'] * 10)
+    else:
+        for i in range(count):
+            inst.ask(':MEAS:VOLT?')
+    cpu = time.thread_time() - c0
+    wall = time.time() - t0
+
+    inst.serial.close()
+    os.close(slave)
+    os.close(master)
+
+    return count / wall, cpu / count
+
+
+def main():
+    for baudrate, count in [(9600, 50), (115200, 500)]:
+        print("%d baud:" % baudrate)
+        for name, cls, pipeline in [
+                ("legacy", LegacySerialInstrument, False),
+                ("buffered", pyserial.SerialInstrument, False),
+                ("buffered, pipelined", pyserial.SerialInstrument, True)]:
+            qps, cpu = bench(cls, baudrate, count, pipeline)
+            print("  %-20s %8.1f queries/s %8.1f us CPU/query" % (name, qps, cpu * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+
+Python Interchangeable Virtual Instrument Library
+
+Copyright (c) 2016 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+# ASCII numeric response parsing benchmark
+#
+# Measures the time to parse a 50k reading comma-separated DMM response with
+# decode_values, compared against the previous split and per-element float
+# conversion.
+#
+# usage: python benchmarks/bench_values.py
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+
+import ivi
+
+
+def legacy_decode(s, delim=','):
+    "Parsing as implemented before decode_values"
+    return np.array(list(map(float, s.split(delim))))
+
+
+def bench(f, number):
+    t = min(timeit.repeat(f, number=number, repeat=5))
+    return t / number
+
+
+def main():
+    readings = np.random.uniform(-10, 10, 50000)
+    readings[::1000] = 9.9e37
+    s = ','.join('%+.8E' % v for v in readings)
+    out = np.empty(len(readings))
+
+    t_new = bench(lambda: ivi.decode_values(s, out=out, overload=np.inf), 20)
+    t_old = bench(lambda: legacy_decode(s), 20)
+
+    print("decode_values, 50k readings:  %8.3f ms" % (t_new * 1e3))
+    print("split and float(), 50k:       %8.3f ms" % (t_old * 1e3))
+    print("speedup:                      %8.1fx" % (t_old / t_new))
+
+
+if __name__ == '__main__':
+    main()
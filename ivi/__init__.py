@@ -56,5 +56,12 @@ __all__ = [
         "testequity"]
 
 from .ivi import *
+from .registry import list_drivers
+from . import session
+try:
+    from .fleet import Fleet
+except ImportError:
+    # concurrent.futures is not available (Python 2 without futures)
+    pass
 from . import *
 
@@ -27,7 +27,6 @@ THE SOFTWARE.
 from .agilent2000A import *
 
 import numpy as np
-import struct
 
 from .. import ivi
 from .. import fgen
@@ -175,14 +174,8 @@ class agilent3000A(agilent2000A, fgen.ArbWfm, fgen.ArbFrequency,
         if len(y) % self._arbitrary_waveform_quantum != 0:
             raise ivi.ValueNotSupportedException()
 
-        raw_data = b''
-
-        for f in y:
-            # clip at -1 and 1
-            if f > 1.0: f = 1.0
-            if f < -1.0: f = -1.0
-
-            raw_data = raw_data + struct.pack('<f', f)
+        # clip on [-1,1]
+        raw_data = fgen.encode_arbitrary_waveform(y, '<f4')
 
         self._write_ieee_block(raw_data, ':%s:arbitrary:data ' % self._output_name[index])
 
@@ -24,14 +24,17 @@ THE SOFTWARE.
 
 """
 
+import numpy as np
 import time
 import struct
 
 from .. import ivi
 from .. import dmm
+from .. import extra
 from .. import scpi
 
-class agilent34410A(scpi.dmm.Base):
+class agilent34410A(scpi.dmm.Base, scpi.dmm.MultiPoint, scpi.dmm.SoftwareTrigger,
+                extra.dmm.Streaming):
     "Agilent 34410A IVI DMM driver"
     
     def __init__(self, *args, **kwargs):
@@ -41,6 +44,9 @@ class agilent34410A(scpi.dmm.Base):
         
         self._memory_size = 5
         
+        # transfer readings as binary doubles
+        self._reading_format = 'real,64'
+        
         self._identity_description = "Agilent 34410A/11A IVI DMM driver"
         self._identity_identifier = ""
         self._identity_revision = ""
@@ -85,6 +91,21 @@ class agilent34410A(scpi.dmm.Base):
     
     
     
+    def _measurement_stream_read(self, max_count=None):
+        if self._driver_operation_simulate:
+            return None
+        points = int(self._ask("data:points?"))
+        if points == 0:
+            return None
+        if max_count is not None:
+            points = min(points, max_count)
+        # R? removes readings from memory and returns them in a block
+        self._configure_reading_format()
+        data = self._ask_for_ieee_block("r? %d" % points)
+        if self._reading_format == 'real,64':
+            return np.frombuffer(data, np.float64)
+        return ivi.decode_values(data.decode('utf-8'))
+    
     def _memory_save(self, index):
         index = int(index)
         if index < 1 or index > self._memory_size:
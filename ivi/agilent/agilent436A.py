@@ -244,8 +244,9 @@ class agilent436A(ivi.Driver, pwrmeter.Base, pwrmeter.ZeroCorrection, pwrmeter.M
         self._write(cmd)
     
     def _measurement_read(self, maximum_time):
-        self._measurement_initiate()
-        return self._measurement_fetch()
+        with self._transaction():
+            self._measurement_initiate()
+            return self._measurement_fetch()
     
     def _get_channel_range_lower(self, index):
         index = ivi.get_index(self._channel_name, index)
@@ -221,10 +221,11 @@ class agilent85644A(ivi.Driver, scpi.common.Memory):
         code = 0
         message = "Self test passed"
         if not self._driver_operation_simulate:
-            self._write("*TST?")
-            # wait for test to complete
-            time.sleep(30)
-            code = int(self._read())
+            with self._transaction():
+                self._write("*TST?")
+                # wait for test to complete
+                time.sleep(30)
+                code = int(self._read())
             if code != 0:
                 message = "Self test failed"
         return (code, message)
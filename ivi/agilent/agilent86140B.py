@@ -29,6 +29,8 @@ from .. import extra
 from .. import scpi
 import time
 
+import numpy as np
+
 AmplitudeUnitsMapping = {'dBm' : 'dbm',
                          'watt' : 'w'}
 DetectorType = set(['auto_peak', 'average', 'maximum_peak', 'minimum_peak', 'sample', 'rms'])
@@ -39,6 +41,10 @@ ScreenshotImageFormatMapping = {
         'pcl': 'pcl',
         'cgm': 'cgm',
         'gif': 'gif'}
+TraceDataFormatMapping = {
+        'ascii': None,
+        'real,32': '>f4',
+        'real,64': '>f8'}
 
 class agilent86140B(ivi.Driver, extra.common.Screenshot, scpi.common.Memory):
     "Agilent 86140B Series Optical Spectrum Analyzer Driver"
@@ -68,6 +74,8 @@ class agilent86140B(ivi.Driver, extra.common.Screenshot, scpi.common.Memory):
         self._sweep_coupling_sweep_time_auto = False
         self._trace_name = list()
         self._trace_type = list()
+        self._trace_data_format = 'real,32'
+        self._trace_data_format_sent = None
         self._acquisition_vertical_scale = 'logarithmic'
         self._sweep_coupling_video_bandwidth = 1e2
         self._sweep_coupling_video_bandwidth_auto = False
@@ -325,7 +333,8 @@ class agilent86140B(ivi.Driver, extra.common.Screenshot, scpi.common.Memory):
                        signals obtained by sweeping from the start wavelength to the stop wavelength
                        (in wavelength domain, in time domain the amplitude array is ordered from
                        beginning of sweep to end). The Amplitude Units attribute determines the
-                       units of the points in the Amplitude array.
+                       units of the points in the Amplitude array. The trace is returned as a
+                       TraceYT object; its X values are the wavelengths of the points in meters.
                        
                        This function does not check the instrument status. The user calls the
                        Error Query function at the conclusion of the sequence to check the
@@ -473,12 +482,13 @@ class agilent86140B(ivi.Driver, extra.common.Screenshot, scpi.common.Memory):
         
         format = ScreenshotImageFormatMapping[format]
         
-        self._write("hcopy:device:language \"%s\"" % format)
-        self._write("hcopy:data?")
-        
-        time.sleep(25)
-        
-        return self._read_ieee_block()
+        with self._transaction():
+            self._write("hcopy:device:language \"%s\"" % format)
+            self._write("hcopy:data?")
+            
+            time.sleep(25)
+            
+            return self._read_ieee_block()
     
     def _get_level_amplitude_units(self):
         if not self._driver_operation_simulate and not self._get_cache_valid():
@@ -735,17 +745,35 @@ class agilent86140B(ivi.Driver, extra.common.Screenshot, scpi.common.Memory):
         name = self._trace_name[index]
         
         if self._driver_operation_simulate:
-            return list()
+            return ivi.TraceYT()
         
-        self._write('format:data ascii')
-        l = self._ask('trace:data:y? %s' % name)
+        fmt = self._trace_data_format
+        if fmt != self._trace_data_format_sent or not self._get_cache_valid('trace_data_format'):
+            self._write('format:data %s' % fmt)
+            if fmt != 'ascii':
+                # big endian, as the dtypes in TraceDataFormatMapping expect
+                self._write('format:border normal')
+            self._trace_data_format_sent = fmt
+            self._set_cache_valid(tag='trace_data_format')
         
-        data = list()
+        dtype = TraceDataFormatMapping[fmt]
+        
+        trace = ivi.TraceYT()
+        trace.y_increment = 1
+        
+        if dtype is None:
+            trace.y_raw = ivi.decode_values(self._ask('trace:data:y? %s' % name))
+        else:
+            trace.y_raw = np.frombuffer(self._ask_for_ieee_block('trace:data:y? %s' % name), dtype)
         
-        for p in l.split(','):
-            data.append(float(p))
+        # wavelength axis
+        start = self._get_wavelength_start()
+        stop = self._get_wavelength_stop()
+        trace.x_origin = start
+        if len(trace) > 1:
+            trace.x_increment = (stop - start) / (len(trace) - 1)
         
-        return data
+        return trace
     
     def _acquisition_initiate(self):
         if not self._driver_operation_simulate:
@@ -193,9 +193,7 @@ class agilent90000(agilentBaseInfiniium):
         
         format = ScreenshotImageFormatMapping[format]
         
-        self._write(":display:data? %s, screen, on, %s" % (format, 'invert' if invert else 'normal'))
-        
-        return self._read_ieee_block()
+        return self._ask_for_ieee_block(":display:data? %s, screen, on, %s" % (format, 'invert' if invert else 'normal'))
     
     def _get_channel_common_mode(self, index):
         index = ivi.get_index(self._analog_channel_name, index)
@@ -348,6 +346,7 @@ class agilent90000(agilentBaseInfiniium):
         return data
     
     def _measurement_read_waveform(self, index, maximum_time):
+        self._measurement_acquire(maximum_time)
         return self._measurement_fetch_waveform(index)
     
     def _measurement_initiate(self):
@@ -162,9 +162,10 @@ class agilentBase8340(rfsiggen.Base, rfsiggen.ModulateAM, rfsiggen.ModulateFM,
         if self._driver_operation_simulate:
             return b''
 
-        self._write("OL?")
+        with self._transaction():
+            self._write("OL?")
 
-        return self._read_raw()
+            return self._read_raw()
 
     def _system_load_setup(self, data):
         if self._driver_operation_simulate:
@@ -226,10 +227,9 @@ class agilentBase8340(rfsiggen.Base, rfsiggen.ModulateAM, rfsiggen.ModulateFM,
         return True
 
     def _rf_wait_until_settled(self, maximum_time):
-        t = 0
-        while not self._rf_is_settled() and t < maximum_time:
-            time.sleep(0.01)
-            t = t + 0.01
+        # status byte bit 4 is set when the source has settled
+        if not self._wait_for_stb(1 << 4, ivi.max_time_to_seconds(maximum_time)):
+            raise ivi.MaxTimeoutExceededException()
 
     def _get_analog_modulation_am_enabled(self):
         #if not self._driver_operation_simulate and not self._get_cache_valid():
@@ -24,10 +24,8 @@ THE SOFTWARE.
 
 """
 
-import array
 import io
 import struct
-import sys
 import time
 
 import numpy as np
@@ -240,11 +238,12 @@ class agilentBase8590(ivi.Driver, specan.Base,
         code = 0
         message = "Self test passed"
         if not self._driver_operation_simulate:
-            self._write("CNF?")
-            # wait for test to complete
-            time.sleep(40)
-            # TODO any way to check status?
-            code = int(self._read())
+            with self._transaction():
+                self._write("CNF?")
+                # wait for test to complete
+                time.sleep(40)
+                # TODO any way to check status?
+                code = int(self._read())
             if code != 0:
                 message = "Self test failed"
         return (code, message)
@@ -272,9 +271,10 @@ class agilentBase8590(ivi.Driver, specan.Base,
         if self._driver_operation_simulate:
             return b''
         
-        self._write("OL?")
-        
-        return self._read_raw()
+        with self._transaction():
+            self._write("OL?")
+            
+            return self._read_raw()
     
     def _system_load_setup(self, data):
         if self._driver_operation_simulate:
@@ -317,10 +317,11 @@ class agilentBase8590(ivi.Driver, specan.Base,
         
         #format = ScreenshotImageFormatMapping[format]
         
-        self._write("PRNPRT 0")
-        self._write("PRINT 1")
-        
-        rtl = io.BytesIO(self._read_raw())
+        with self._transaction():
+            self._write("PRNPRT 0")
+            self._write("PRINT 1")
+            
+            rtl = io.BytesIO(self._read_raw())
 
         img = hprtl.parse_hprtl(rtl)
 
@@ -809,15 +810,16 @@ class agilentBase8590(ivi.Driver, specan.Base,
         log_scale = float(self._ask("lg?"))
         ref_level = float(self._ask("rl?"))
 
-        self._write('tdf a; mds w;')
-        self._write(cmd)
+        with self._transaction():
+            self._write('tdf a; mds w;')
+            self._write(cmd)
 
-        buf = self._read_raw(4)
-        if buf[0:2] != b'#A':
-            return None
+            buf = self._read_raw(4)
+            if buf[0:2] != b'#A':
+                return None
 
-        cnt = struct.unpack(">H", buf[2:4])[0]
-        buf = self._read_raw(cnt)
+            cnt = struct.unpack(">H", buf[2:4])[0]
+            buf = self._read_raw(cnt)
 
         trace = ivi.TraceY()
 
@@ -832,10 +834,7 @@ class agilentBase8590(ivi.Driver, specan.Base,
             trace.y_origin = 0
             trace.y_reference = 0
 
-        trace.y_raw = array.array('h', buf)
-
-        if sys.byteorder == 'little':
-            trace.y_raw.byteswap()
+        trace.y_raw = np.frombuffer(buf, dtype='>i2')
 
         return trace
 
@@ -48,9 +48,10 @@ class agilentBase8590A(agilentBase8590):
 
         #format = ScreenshotImageFormatMapping[format]
 
-        self._write("PRINT 1")
+        with self._transaction():
+            self._write("PRINT 1")
 
-        rtl = io.BytesIO(self._read_raw())
+            rtl = io.BytesIO(self._read_raw())
 
         img = hprtl.parse_hprtl(rtl)
 
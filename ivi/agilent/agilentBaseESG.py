@@ -29,6 +29,8 @@ from .. import rfsiggen
 from .. import extra
 from .. import scpi
 
+import numpy as np
+
 LFGeneratorWaveformMapping = {
     'sine': 'sine',
     'dual_sine': 'dual',
@@ -42,13 +44,31 @@ LFGeneratorWaveformMapping = {
     'dc': 'dc'
     }
 
+# sweep mode: list type, frequency mode, power mode
+SweepModeMapping = {
+    'none': (None, 'cw', 'fixed'),
+    'frequency_step': ('step', 'list', 'fixed'),
+    'power_step': ('step', 'cw', 'list'),
+    'list': ('list', 'list', 'list')
+    }
+
+TriggerSourceMapping = {
+    'immediate': 'imm',
+    'external': 'ext',
+    'software': 'bus'
+    }
+
+def format_list(values):
+    "Format a list of values as a comma separated string"
+    return ','.join('%.12g' % v for v in np.asarray(values, dtype=float).ravel())
+
 class agilentBaseESG(scpi.common.IdnCommand, scpi.common.ErrorQuery, scpi.common.Reset,
                      scpi.common.SelfTest,
                      rfsiggen.Base, rfsiggen.ModulateAM,
                      rfsiggen.ModulateFM, rfsiggen.ModulatePM, rfsiggen.AnalogModulationSource,
                      rfsiggen.ModulatePulse, rfsiggen.LFGenerator, rfsiggen.LFGeneratorOutput,
                      rfsiggen.Sweep, rfsiggen.FrequencyStep, rfsiggen.PowerStep, rfsiggen.List,
-                     extra.common.Memory, ivi.Driver):
+                     rfsiggen.SoftwareTrigger, extra.common.Memory, ivi.Driver):
     "Agilent ESG series IVI RF signal generator driver"
 
     def __init__(self, *args, **kwargs):
@@ -68,6 +88,10 @@ class agilentBaseESG(scpi.common.IdnCommand, scpi.common.ErrorQuery, scpi.common
         self._rf_level_reference_enabled = False
         self._sweep_frequency_step_points = 2
         self._sweep_power_step_points = 2
+        self._sweep_mode = 'none'
+        self._sweep_trigger_source = 'immediate'
+        self._sweep_list_lists = dict()
+        self._sweep_list_uploaded = None
 
         self._frequency_low = 250e3
         self._frequency_high = 4e9
@@ -167,6 +191,17 @@ class agilentBaseESG(scpi.common.IdnCommand, scpi.common.ErrorQuery, scpi.common
             self._write("*rcl %d, %d" % (reg, seq))
             self.driver_operation.invalidate_all_attributes()
 
+    def _driver_operation_invalidate_all_attributes(self):
+        super(agilentBaseESG, self)._driver_operation_invalidate_all_attributes()
+        # the list in the instrument may have been replaced
+        self._sweep_list_uploaded = None
+
+    def _utility_reset(self):
+        super(agilentBaseESG, self)._utility_reset()
+        # *RST clears the list and turns off sweeping
+        self._sweep_list_uploaded = None
+        self._sweep_mode = 'none'
+
     def _get_rf_frequency(self):
         if not self._driver_operation_simulate and not self._get_cache_valid():
             self._rf_frequency = float(self._ask("frequency?"))
@@ -316,10 +351,8 @@ class agilentBaseESG(scpi.common.IdnCommand, scpi.common.ErrorQuery, scpi.common
         return True
 
     def _rf_wait_until_settled(self, maximum_time):
-        t = 0
-        while not self._rf_is_settled() and t < maximum_time:
-            time.sleep(0.01)
-            t = t + 0.01
+        if not self._wait_for(self._rf_is_settled, ivi.max_time_to_seconds(maximum_time)):
+            raise ivi.MaxTimeoutExceededException()
 
     def _get_analog_modulation_am_enabled(self):
         if not self._driver_operation_simulate and not self._get_cache_valid():
@@ -568,15 +601,60 @@ class agilentBaseESG(scpi.common.IdnCommand, scpi.common.ErrorQuery, scpi.common
         return self._sweep_mode
 
     def _set_sweep_mode(self, value):
-        value = int(value)
+        if value not in SweepModeMapping:
+            raise ivi.ValueNotSupportedException()
+        list_type, frequency_mode, power_mode = SweepModeMapping[value]
+        if value == 'list':
+            lst = self._sweep_list_upload()
+            if lst['frequency'] is None:
+                frequency_mode = 'cw'
+            if lst['power'] is None:
+                power_mode = 'fixed'
+        if not self._driver_operation_simulate:
+            with self.batch():
+                if list_type is not None:
+                    self._write(":list:type %s" % list_type)
+                self._write(":frequency:mode %s" % frequency_mode)
+                self._write(":power:mode %s" % power_mode)
+                if value != 'none':
+                    self._write(":initiate:continuous on")
         self._sweep_mode = value
+        self._sweep_configure_trigger()
 
     def _get_sweep_trigger_source(self):
         return self._sweep_trigger_source
 
     def _set_sweep_trigger_source(self, value):
-        value = str(value)
+        if value not in TriggerSourceMapping:
+            raise ivi.ValueNotSupportedException()
         self._sweep_trigger_source = value
+        self._sweep_configure_trigger()
+
+    def _sweep_configure_trigger(self):
+        # in single step mode the trigger source advances the sweep point by
+        # point, otherwise it starts the sweep and the points follow the dwell
+        if self._sweep_mode == 'list':
+            single_step = self._sweep_list_single_step_enabled
+        elif self._sweep_mode == 'frequency_step':
+            single_step = self._sweep_frequency_step_single_step_enabled
+        elif self._sweep_mode == 'power_step':
+            single_step = self._sweep_power_step_single_step_enabled
+        else:
+            return
+        source = TriggerSourceMapping[self._sweep_trigger_source]
+        if not self._driver_operation_simulate:
+            with self.batch():
+                if single_step:
+                    self._write(":trigger:source imm")
+                    self._write(":list:trigger:source %s" % source)
+                else:
+                    self._write(":trigger:source %s" % source)
+                    self._write(":list:trigger:source imm")
+
+    def _send_software_trigger(self):
+        if self._sweep_trigger_source != 'software':
+            raise ivi.TriggerNotSoftwareException()
+        self._trigger()
 
     def _get_sweep_frequency_step_start(self):
         if not self._driver_operation_simulate and not self._get_cache_valid():
@@ -644,6 +722,8 @@ class agilentBaseESG(scpi.common.IdnCommand, scpi.common.ErrorQuery, scpi.common
     def _set_sweep_frequency_step_single_step_enabled(self, value):
         value = bool(value)
         self._sweep_frequency_step_single_step_enabled = value
+        if self._sweep_mode == 'frequency_step':
+            self._sweep_configure_trigger()
 
     def _get_sweep_frequency_step_dwell(self):
         if not self._driver_operation_simulate and not self._get_cache_valid():
@@ -723,6 +803,8 @@ class agilentBaseESG(scpi.common.IdnCommand, scpi.common.ErrorQuery, scpi.common
     def _set_sweep_power_step_single_step_enabled(self, value):
         value = bool(value)
         self._sweep_power_step_single_step_enabled = value
+        if self._sweep_mode == 'power_step':
+            self._sweep_configure_trigger()
 
     def _get_sweep_power_step_dwell(self):
         if not self._driver_operation_simulate and not self._get_cache_valid():
@@ -749,7 +831,10 @@ class agilentBaseESG(scpi.common.IdnCommand, scpi.common.ErrorQuery, scpi.common
 
     def _set_sweep_list_selected_list(self, value):
         value = str(value)
+        if value not in self._sweep_list_lists:
+            raise rfsiggen.FrequencyListUnknownException()
         self._sweep_list_selected_list = value
+        self._sweep_list_upload()
 
     def _get_sweep_list_single_step_enabled(self):
         return self._sweep_list_single_step_enabled
@@ -757,6 +842,8 @@ class agilentBaseESG(scpi.common.IdnCommand, scpi.common.ErrorQuery, scpi.common
     def _set_sweep_list_single_step_enabled(self, value):
         value = bool(value)
         self._sweep_list_single_step_enabled = value
+        if self._sweep_mode == 'list':
+            self._sweep_configure_trigger()
 
     def _get_sweep_list_dwell(self):
         return self._sweep_list_dwell
@@ -764,19 +851,66 @@ class agilentBaseESG(scpi.common.IdnCommand, scpi.common.ErrorQuery, scpi.common
     def _set_sweep_list_dwell(self, value):
         value = float(value)
         self._sweep_list_dwell = value
-
-    def _sweep_list_create_frequency(self, name, frequency):
-        pass
-
-    def _sweep_list_create_power(self, name, power):
-        pass
-
-    def _sweep_list_create_frequency_power(self, name, frequency, power):
-        pass
+        lst = self._sweep_list_lists.get(self._sweep_list_selected_list)
+        if lst is not None and lst['dwell'] is None and self._sweep_list_uploaded is not None:
+            if not self._driver_operation_simulate:
+                self._write(":list:dwell %e" % value)
+
+    def _sweep_list_upload(self):
+        "Load the selected list into the instrument, unless it is already loaded"
+        name = self._sweep_list_selected_list
+        if name not in self._sweep_list_lists:
+            raise rfsiggen.FrequencyListUnknownException()
+        lst = self._sweep_list_lists[name]
+        if self._sweep_list_uploaded == name:
+            return lst
+        if not self._driver_operation_simulate:
+            # each list is sent as a single command
+            if lst['frequency'] is not None:
+                self._write(":list:frequency %s" % format_list(lst['frequency']))
+            if lst['power'] is not None:
+                self._write(":list:power %s" % format_list(lst['power']))
+            if lst['dwell'] is not None:
+                self._write(":list:dwell %s" % format_list(lst['dwell']))
+            else:
+                self._write(":list:dwell %e" % self._sweep_list_dwell)
+            self._write(":list:dwell:type list")
+        self._sweep_list_uploaded = name
+        return lst
+
+    def _sweep_list_create(self, name, frequency, power, dwell):
+        name = str(name)
+        lst = dict(frequency=None, power=None, dwell=None)
+        if frequency is not None:
+            lst['frequency'] = np.array(frequency, dtype=float).ravel()
+        if power is not None:
+            lst['power'] = np.array(power, dtype=float).ravel()
+        if dwell is not None:
+            lst['dwell'] = np.array(dwell, dtype=float).ravel()
+        self._sweep_list_lists[name] = lst
+        if self._sweep_list_uploaded == name:
+            self._sweep_list_uploaded = None
+        if self._sweep_list_selected_list == name:
+            self._sweep_list_upload()
+
+    def _sweep_list_create_frequency(self, name, frequency, dwell=None):
+        self._sweep_list_create(name, frequency, None, dwell)
+
+    def _sweep_list_create_power(self, name, power, dwell=None):
+        self._sweep_list_create(name, None, power, dwell)
+
+    def _sweep_list_create_frequency_power(self, name, frequency, power, dwell=None):
+        if len(frequency) != len(power):
+            raise ivi.ValueNotSupportedException()
+        self._sweep_list_create(name, frequency, power, dwell)
 
     def _sweep_list_clear_all(self):
-        pass
+        self._sweep_list_lists = dict()
+        self._sweep_list_selected_list = ''
+        self._sweep_list_uploaded = None
 
     def _sweep_list_reset(self):
-        pass
+        # restart the sweep from the first point
+        if not self._driver_operation_simulate:
+            self._write(":abort")
 
@@ -156,9 +156,7 @@ class agilentBaseInfiniium(agilentBaseScope):
         
         format = self._display_screenshot_image_format_mapping[format]
         
-        self._write(":display:data? %s, screen, on, %s" % (format, 'invert' if invert else 'normal'))
-        
-        return self._read_ieee_block()
+        return self._ask_for_ieee_block(":display:data? %s, screen, on, %s" % (format, 'invert' if invert else 'normal'))
     
     def _get_display_vectors(self):
         if not self._driver_operation_simulate and not self._get_cache_valid():
@@ -252,6 +250,7 @@ class agilentBaseInfiniium(agilentBaseScope):
         return data
     
     def _measurement_read_waveform(self, index, maximum_time):
+        self._measurement_acquire(maximum_time)
         return self._measurement_fetch_waveform(index)
     
     def _measurement_initiate(self):
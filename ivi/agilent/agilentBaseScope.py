@@ -184,6 +184,7 @@ class agilentBaseScope(scpi.common.IdnCommand, scpi.common.ErrorQuery, scpi.comm
         self._channel_invert = list()
         self._channel_probe_id = list()
         self._channel_bw_limit = list()
+        self._waveform_source = None
         
         super(agilentBaseScope, self).__init__(*args, **kwargs)
         
@@ -548,9 +549,7 @@ class agilentBaseScope(scpi.common.IdnCommand, scpi.common.ErrorQuery, scpi.comm
         if self._driver_operation_simulate:
             return b''
         
-        self._write(":system:setup?")
-        
-        return self._read_ieee_block()
+        return self._ask_for_ieee_block(":system:setup?")
     
     def _system_load_setup(self, data):
         if self._driver_operation_simulate:
@@ -577,10 +576,7 @@ class agilentBaseScope(scpi.common.IdnCommand, scpi.common.ErrorQuery, scpi.comm
         format = self._display_screenshot_image_format_mapping[format]
         
         self._write(":hardcopy:inksaver %d" % int(bool(invert)))
-        self._write(":display:data? %s" % format)
-
-        scr = self._read_ieee_block()
-        self._read_raw() # flush buffer
+        scr = self._ask_for_ieee_block(":display:data? %s" % format)
 
         return scr
     
@@ -1339,18 +1335,25 @@ class agilentBaseScope(scpi.common.IdnCommand, scpi.common.ErrorQuery, scpi.comm
         if self._driver_operation_simulate:
             return ivi.TraceYT()
 
-        self._write(":waveform:source %s" % self._channel_name[index])
-        if sys.byteorder == 'little':
-            self._write(":waveform:byteorder lsbfirst")
-        else:
-            self._write(":waveform:byteorder msbfirst")
-        self._write(":waveform:unsigned 1")
-        self._write(":waveform:format word")
-
         trace = ivi.TraceYT()
 
-        # Read preamble
-        pre = self._ask(":waveform:preamble?").split(',')
+        # Configure transfer and read preamble in one message
+        # transfer settings are only sent when changed since the last fetch
+        with self.batch():
+            if not self._get_cache_valid('waveform_source') or self._waveform_source != index:
+                self._write(":waveform:source %s" % self._channel_name[index])
+            if not self._get_cache_valid('waveform_format'):
+                if sys.byteorder == 'little':
+                    self._write(":waveform:byteorder lsbfirst")
+                else:
+                    self._write(":waveform:byteorder msbfirst")
+                self._write(":waveform:unsigned 1")
+                self._write(":waveform:format word")
+            pre = self._ask(":waveform:preamble?").split(',')
+
+        self._waveform_source = index
+        self._set_cache_valid(tag='waveform_source')
+        self._set_cache_valid(tag='waveform_format')
 
         acq_format = int(pre[0])
         acq_type = int(pre[1])
@@ -1372,14 +1375,19 @@ class agilentBaseScope(scpi.common.IdnCommand, scpi.common.ErrorQuery, scpi.comm
 
         # Read waveform data
         raw_data = self._ask_for_ieee_block(":waveform:data?")
-        self._read_raw() # flush buffer
 
         # Store in trace object
         trace.y_raw = array.array('H', raw_data[0:points*2])
 
         return trace
     
+    def _measurement_acquire(self, maximum_time):
+        self._measurement_initiate()
+        if not self._wait_for_operation_complete(ivi.max_time_to_seconds(maximum_time)):
+            raise ivi.MaxTimeoutExceededException()
+    
     def _measurement_read_waveform(self, index, maximum_time):
+        self._measurement_acquire(maximum_time)
         return self._measurement_fetch_waveform(index)
     
     def _measurement_initiate(self):
@@ -1480,6 +1488,7 @@ class agilentBaseScope(scpi.common.IdnCommand, scpi.common.ErrorQuery, scpi.comm
         return 0
     
     def _measurement_read_waveform_measurement(self, index, measurement_function, maximum_time):
+        self._measurement_acquire(maximum_time)
         return self._measurement_fetch_waveform_measurement(index, measurement_function)
     
     def _get_acquisition_number_of_envelopes(self):
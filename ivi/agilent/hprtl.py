@@ -25,24 +25,109 @@ THE SOFTWARE.
 """
 
 import io
+import re
 import struct
 import numpy as np
 
+# color modes (*r#U): number of planes, color table
+ColorModes = {
+    -4: (4, [ # KCMY
+        (255, 255, 255), # white
+        (127, 127, 127), # white
+        (  0, 255, 255), # cyan
+        (  0, 127, 127), # cyan
+        (255,   0, 255), # magenta
+        (127,   0, 127), # magenta
+        (  0,   0, 255), # blue
+        (  0,   0, 127), # blue
+        (255, 255,   0), # yellow
+        (127, 127,   0), # yellow
+        (  0, 255,   0), # green
+        (  0, 127,   0), # green
+        (255,   0,   0), # red
+        (127,   0,   0), # red
+        ( 63,  63,  63), # black
+        (  0,   0,   0)  # black
+    ]),
+    -3: (3, [ # CMY
+        (255, 255, 255), # white
+        (  0, 255, 255), # cyan
+        (255,   0, 255), # magenta
+        (  0,   0, 255), # blue
+        (255, 255,   0), # yellow
+        (  0, 255,   0), # green
+        (255,   0,   0), # red
+        (  0,   0,   0)  # black
+    ]),
+    1: (1, [ # K
+        (255, 255, 255), # white
+        (  0,   0,   0)  # black
+    ]),
+    3: (3, [ # RGB
+        (  0,   0,   0), # black
+        (255,   0,   0), # red
+        (  0, 255,   0), # green
+        (255, 255,   0), # yellow
+        (  0,   0, 255), # blue
+        (255,   0, 255), # magenta
+        (  0, 255, 255), # cyan
+        (255, 255, 255)  # white
+    ]),
+    4: (4, [ # indexed RGB
+        (  0,   0,   0), # black
+        (  0,   0,   0), # black
+        (127,   0,   0), # red
+        (255,   0,   0), # red
+        (  0, 127,   0), # green
+        (  0, 255,   0), # green
+        (127, 127,   0), # yellow
+        (255, 255,   0), # yellow
+        (  0,   0, 127), # blue
+        (  0,   0, 255), # blue
+        (127,   0, 127), # magenta
+        (255,   0, 255), # magenta
+        (  0, 127, 127), # cyan
+        (  0, 255, 255), # cyan
+        (127, 127, 127), # white
+        (255, 255, 255)  # white
+    ])
+}
+
+# ESC* command: [group][value][parameter], null bytes in the value are ignored
+_command_re = re.compile(br'(.)([-0-9\x00]*)(.)', re.S)
+
+def _decode_packbits(d):
+    """Decode a PackBits (compression mode 2) row"""
+    out = list()
+    k = 0
+    n = len(d)
+    while k < n:
+        h = d[k]
+        k += 1
+        if h < 128:
+            # literal run
+            out.append(d[k:k+h+1])
+            k += h+1
+        elif h > 128:
+            # repeated byte
+            out.append(d[k:k+1] * (257-h))
+            k += 1
+    return b''.join(out)
+
 def parse_hprtl(rtl_file):
     """Convert HP Raster Transfer Language (RTL) to numpy array"""
-    color = 1
     width = 0
     byte_width = 0
-    height = 0
     compression = 0
 
-    current_row = 0
     plane_cnt = 1
     current_plane = 0
 
     resolution = 1
 
-    plane_data = None
+    # rows of plane data, one bytes object per plane
+    rows = list()
+    row_planes = 1
 
     in_raster = True
 
@@ -50,278 +135,162 @@ def parse_hprtl(rtl_file):
     green = 0
     blue = 0
 
-    color_list = [
-        (255, 255, 255), # white
-        (  0,   0,   0) # black
-    ]
+    color_list = list(ColorModes[1][1])
 
     if type(rtl_file) == str:
-        rtlf = open(rtl_file, 'rb')
+        with open(rtl_file, 'rb') as f:
+            data = f.read()
+    elif hasattr(rtl_file, 'read'):
+        data = rtl_file.read()
     else:
-        rtlf = rtl_file
+        data = rtl_file
+    data = bytes(data)
 
+    pos = 0
     while True:
-        s = rtlf.read(1)
+        pos = data.find(b'\x1b', pos)
 
-        if len(s) == 0:
+        if pos < 0 or pos + 1 >= len(data):
             break
 
-        if s[0] != 0x1b:
+        if data[pos+1:pos+2] != b'*':
+            pos += 2
             continue
 
-        s = rtlf.read(1)
+        # valid ESC* command
+        m = _command_re.match(data, pos+2)
 
-        if len(s) == 0:
+        if m is None:
             break
 
-        if s[0] == ord('*'):
-            # valid ESC* command
-            # read [letter][numbers][letter]
-            cmd = rtlf.read(2)
-
-            while True:
-                if (cmd[-1] < ord('0') or cmd[-1] > ord('9')) and cmd[-1] != ord('-'):
-                    break
-
-                s = rtlf.read(1)
-
-                # ignore null bytes
-                if s[0] != 0:
-                    cmd += s
-
-            ca = cmd[0]
-            cb = cmd[-1]
-
-            #print(cmd)
-
-            if ca == ord('r') and (cb == ord('u') or cb == ord('U')):
-                # color command *r#u or *r#U
-                color = int(cmd[1:-1])
-
-                if color == -4:
-                    # KCMY
-                    plane_cnt = 4
-                    color_list = [
-                        (255, 255, 255), # white
-                        (127, 127, 127), # white
-                        (  0, 255, 255), # cyan
-                        (  0, 127, 127), # cyan
-                        (255,   0, 255), # magenta
-                        (127,   0, 127), # magenta
-                        (  0,   0, 255), # blue
-                        (  0,   0, 127), # blue
-                        (255, 255,   0), # yellow
-                        (127, 127,   0), # yellow
-                        (  0, 255,   0), # green
-                        (  0, 127,   0), # green
-                        (255,   0,   0), # red
-                        (127,   0,   0), # red
-                        ( 63,  63,  63), # black
-                        (  0,   0,   0)  # black
-                    ]
-                elif color == -3:
-                    # CMY
-                    plane_cnt = 3
-                    color_list = [
-                        (255, 255, 255), # white
-                        (  0, 255, 255), # cyan
-                        (255,   0, 255), # magenta
-                        (  0,   0, 255), # blue
-                        (255, 255,   0), # yellow
-                        (  0, 255,   0), # green
-                        (255,   0,   0), # red
-                        (  0,   0,   0)  # black
-                    ]
-                elif color == 1:
-                    # K
-                    plane_cnt = 1
-                    color_list = [
-                        (255, 255, 255), # white
-                        (  0,   0,   0)  # black
-                    ]
-                elif color == 3:
-                    # RGB
-                    plane_cnt = 3
-                    color_list = [
-                        (  0,   0,   0), # black
-                        (255,   0,   0), # red
-                        (  0, 255,   0), # green
-                        (255, 255,   0), # yellow
-                        (  0,   0, 255), # blue
-                        (255,   0, 255), # magenta
-                        (  0, 255, 255), # cyan
-                        (255, 255, 255)  # white
-                    ]
-                elif color == 4:
-                    # indexed RGB
-                    plane_cnt = 4
-                    color_list = [
-                        (  0,   0,   0), # black
-                        (  0,   0,   0), # black
-                        (127,   0,   0), # red
-                        (255,   0,   0), # red
-                        (  0, 127,   0), # green
-                        (  0, 255,   0), # green
-                        (127, 127,   0), # yellow
-                        (255, 255,   0), # yellow
-                        (  0,   0, 127), # blue
-                        (  0,   0, 255), # blue
-                        (127,   0, 127), # magenta
-                        (255,   0, 255), # magenta
-                        (  0, 127, 127), # cyan
-                        (  0, 255, 255), # cyan
-                        (127, 127, 127), # white
-                        (255, 255, 255)  # white
-                    ]
-                else:
-                    raise Exception("Invalid color")
-            elif ca == ord('r') and (cb == ord('a') or cb == ord('A')):
-                # start raster graphics
-                # only grab the first section
-                if height == 0:
-                    in_raster = True
-                elif in_raster:
-                    # if we missed the stop of one section, stop on the start of the next
-                    in_raster = False
-            elif ca == ord('r') and (cb == ord('c') or cb == ord('C')):
-                # end raster graphics
+        pos = m.end()
+
+        ca = m.group(1).lower()
+        cb = m.group(3)
+        val = m.group(2).replace(b'\x00', b'')
+        p = cb.lower()
+
+        if ca == b'r' and p == b'u':
+            # color command *r#u or *r#U
+            color = int(val)
+            if color not in ColorModes:
+                raise Exception("Invalid color")
+            plane_cnt, color_list = ColorModes[color]
+            color_list = list(color_list)
+        elif ca == b'r' and p == b'a':
+            # start raster graphics
+            # only grab the first section
+            if not rows:
+                in_raster = True
+            elif in_raster:
+                # if we missed the stop of one section, stop on the start of the next
                 in_raster = False
-            elif ca == ord('r') and (cb == ord('b') or cb == ord('B')):
-                # unknown
-                pass
-            elif ca == ord('r') and (cb == ord('s') or cb == ord('S')):
-                # raster width
-                width = int(cmd[1:-1])
-                byte_width = int((width+7)/8)
-            elif ca == ord('r') and (cb == ord('t') or cb == ord('T')):
-                # raster height
-                #height = int(cmd[1:-1])
-                pass
-            elif ca == ord('b') and (cb == ord('m') or cb == ord('M')):
-                # set compression
-                compression = int(cmd[1:-1])
-            elif ca == ord('t') and (cb == ord('r') or cb == ord('R')):
-                # set resolution
-                resolution = int(cmd[1:-1])
-            elif ca == ord('v') and (cb == ord('a') or cb == ord('A')):
-                # set red component
-                red = int(cmd[1:-1])
-            elif ca == ord('v') and (cb == ord('b') or cb == ord('B')):
-                # set green component
-                green = int(cmd[1:-1])
-            elif ca == ord('v') and (cb == ord('c') or cb == ord('C')):
-                # set blue component
-                blue = int(cmd[1:-1])
-            elif ca == ord('v') and (cb == ord('i') or cb == ord('I')):
-                # assign index
-                ind = int(cmd[1:-1])
-                color_list[ind] = (red, green, blue)
-            elif ca == ord('p') and (cb == ord('n') or cb == ord('N')):
-                # unknown
-                pass
-            elif ca == ord('v') and (cb == ord('o') or cb == ord('O')):
-                # pattern transparency mode
-                pass
-            elif ca == ord('v') and (cb == ord('n') or cb == ord('N')):
-                # source transparency mode
-                pass
-            elif ca == ord('p') and (cb == ord('x') or cb == ord('X')):
-                # move CAP horizontal
-                pass
-            elif ca == ord('p') and (cb == ord('y') or cb == ord('Y')):
-                # move CAP vertical
-                pass
-            elif ca == ord('b') and (cb == ord('v') or cb == ord('V') or cb == ord('w') or cb == ord('W')):
-                # image row
-                l = int(cmd[1:-1])
-
-                if l > 0:
-                    # read row
-                    d = rtlf.read(l)
-
-                    # skip if we are not in a raster section
-                    if not in_raster:
-                        continue
-
-                    # set width if not yet set
-                    # width must be set if compression enabled, otherwise
-                    # all lines will be the same length
-                    if width == 0:
-                        width = l * 8
-
-                    if byte_width == 0:
-                        byte_width = l
-
-                    # add row if on first plane
-                    if current_plane == 0:
-                        if height == 0:
-                            plane_data = np.zeros((10, byte_width, plane_cnt), dtype=np.uint8)
-
-                        height += 1
-
-                        if height >= plane_data.shape[0]:
-                            # need to add more rows
-                            plane_data = np.append(plane_data, np.zeros((10, byte_width, plane_cnt), dtype=np.uint8), 0)
-
-                    if compression == 0 or compression == 1:
-                        x = 0
-                        for b in d:
-                            plane_data[height-1][x][current_plane] = b
-                            x += 1
-                    elif compression == 2:
-                        k = 0
-                        x = 0
-                        while True:
-                            if len(d) <= k:
-                                break
-                            h = d[k]
-                            k += 1
-                            if h == 128:
-                                continue
-                            if h < 128:
-                                for j in range(h+1):
-                                    b = d[k]
-                                    k += 1
-                                    plane_data[height-1][x][current_plane] = b
-                                    x += 1
-                            if h > 128:
-                                b = d[k]
-                                k += 1
-                                for j in range(257-h):
-                                    plane_data[height-1][x][current_plane] = b
-                                    x += 1
-                    else:
-                        raise Exception("Invalid compression")
-
-                    # go to next plane, if more than one plane
-                    if plane_cnt > 0:
-                        current_plane += 1
-                        if current_plane == plane_cnt or cb == ord('w') or cb == ord('W'):
-                            current_plane = 0
+        elif ca == b'r' and p == b'c':
+            # end raster graphics
+            in_raster = False
+        elif ca == b'r' and p == b'b':
+            # unknown
+            pass
+        elif ca == b'r' and p == b's':
+            # raster width
+            width = int(val)
+            byte_width = int((width+7)/8)
+        elif ca == b'r' and p == b't':
+            # raster height
+            pass
+        elif ca == b'b' and p == b'm':
+            # set compression
+            compression = int(val)
+        elif ca == b't' and p == b'r':
+            # set resolution
+            resolution = int(val)
+        elif ca == b'v' and p == b'a':
+            # set red component
+            red = int(val)
+        elif ca == b'v' and p == b'b':
+            # set green component
+            green = int(val)
+        elif ca == b'v' and p == b'c':
+            # set blue component
+            blue = int(val)
+        elif ca == b'v' and p == b'i':
+            # assign index
+            color_list[int(val)] = (red, green, blue)
+        elif ca == b'p' and p in b'nxy':
+            # unknown, move CAP horizontal, move CAP vertical
+            pass
+        elif ca == b'v' and p in b'on':
+            # pattern and source transparency modes
+            pass
+        elif ca == b'b' and p in b'vw':
+            # image row
+            l = int(val)
+
+            if l > 0:
+                # read row
+                d = data[pos:pos+l]
+                pos += l
+
+                # skip if we are not in a raster section
+                if not in_raster:
+                    continue
+
+                # set width if not yet set
+                # width must be set if compression enabled, otherwise
+                # all lines will be the same length
+                if width == 0:
+                    width = l * 8
+
+                if byte_width == 0:
+                    byte_width = l
+
+                # add row if on first plane
+                if current_plane == 0:
+                    if not rows:
+                        row_planes = plane_cnt
+                    rows.append([b''] * row_planes)
+
+                if compression == 0 or compression == 1:
+                    pass
+                elif compression == 2:
+                    d = _decode_packbits(d)
                 else:
-                    if cb == ord('w') or cb == ord('W'):
-                        current_plane = 0
+                    raise Exception("Invalid compression")
+
+                rows[-1][current_plane] = d
+
+                # go to next plane, if more than one plane
+                current_plane += 1
+                if current_plane == plane_cnt or p == b'w':
+                    current_plane = 0
             else:
-                raise Exception("Invalid command (%s)" % (repr(cmd)))
+                if p == b'w':
+                    current_plane = 0
+        else:
+            raise Exception("Invalid command (%s)" % (repr(data[m.start()-2:m.end()])))
+
+    height = len(rows)
+
+    # assemble plane data, padding or truncating rows to the raster width
+    buf = bytearray(height * row_planes * byte_width)
+    offset = 0
+    for row in rows:
+        for d in row:
+            d = d[0:byte_width]
+            buf[offset:offset+len(d)] = d
+            offset += byte_width
+    plane_data = np.frombuffer(bytes(buf), dtype=np.uint8).reshape((height, row_planes, byte_width))
 
     # convert to bits
-    plane_data = np.unpackbits(plane_data, axis=1)
+    plane_data = np.unpackbits(plane_data, axis=2)[:, :, 0:width]
 
-    # strip off extra rows
-    plane_data = plane_data[0:height, 0:width, :]
+    # combine planes into color indices, first plane is the most significant bit
+    index = np.zeros((height, width), dtype=np.uint8)
+    for k in range(row_planes):
+        index |= plane_data[:, k, :] << (plane_cnt-1-k)
 
     # convert plane data to RGB
-    plane_data = np.right_shift(np.packbits(plane_data, axis=2), 8-plane_cnt)
-    
-    rgb_data = np.zeros((height, width, 3), dtype=np.uint8)
-
-    for y in range(height):
-        for x in range(width):
-            rgb_data[y][x] = color_list[plane_data[y][x][0]]
-
-    plane_data = rgb_data
-
-    return plane_data
+    return np.array(color_list, dtype=np.uint8)[index]
 
 def generate_bmp(img_data):
     """Generate a BMP format image from a numpy array"""
@@ -366,6 +335,9 @@ def generate_bmp(img_data):
     bmp.write(struct.pack('<L', color_table_entries)) # number of colors in palette (0 = 2^n)
     bmp.write(struct.pack('<L', 0)) # number of important colors in palette (0 = all)
 
+    # image data, bottom row first, rows padded to a multiple of 4 bytes
+    rows = np.zeros((height, row_size), dtype=np.uint8)
+
     if img_data.shape[2] == 1:
         # monochrome
 
@@ -374,14 +346,8 @@ def generate_bmp(img_data):
         bmp.write(struct.pack('<BBBx', 0, 0, 0)) # color 1 red, green, blue
 
         # image data
-        plane_data = np.packbits(img_data, axis=1)
-
-        for y in range(plane_data.shape[0]-1, -1, -1):
-            for x in range(plane_data.shape[1]):
-                bmp.write(struct.pack('<B', plane_data[y][x][0]))
-            if plane_data.shape[1] % 4 > 0:
-                for x in range(4 - (plane_data.shape[1] % 4)):
-                    bmp.write(b'\0')
+        plane_data = np.packbits(img_data[::-1, :, 0], axis=1)
+        rows[:, 0:plane_data.shape[1]] = plane_data
 
     else:
         # rgb
@@ -389,13 +355,9 @@ def generate_bmp(img_data):
         # color table
         # no color table for RGB
 
-        # image data
-        for y in range(img_data.shape[0]-1, -1, -1):
-            for x in range(img_data.shape[1]):
-                bmp.write(struct.pack('<BBB', img_data[y][x][2], img_data[y][x][1], img_data[y][x][0]))
-            if (img_data.shape[1]*3) % 4 > 0:
-                for x in range(4 - ((img_data.shape[1]*3) % 4)):
-                    bmp.write(b'\0')
+        # image data, stored as BGR
+        rows[:, 0:width*3] = img_data[::-1, :, 2::-1].reshape((height, width*3))
 
-    return bmp.getvalue()
+    bmp.write(rows.tobytes())
 
+    return bmp.getvalue()
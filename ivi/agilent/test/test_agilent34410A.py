@@ -0,0 +1,137 @@
+"""
+
+Python Interchangeable Virtual Instrument Library
+
+Copyright (c) 2014-2016 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+
+import struct
+import unittest
+
+import ivi
+from .. import agilent34410A
+
+class Virtual34410A(object):
+    def __init__(self):
+        # unread response data is kept across commands
+        self.pending = bytearray()
+        self.cmd_log = list()
+        self.format = 'ascii'
+        self.border = '>'
+        self.readings = [1.5, -2.25, 9.9e37, 0.125]
+        self.memory = list()
+
+    def write_raw(self, data):
+        for cmd in data.decode().strip().lower().split(';'):
+            self.cmd_log.append(cmd)
+            if cmd == ':format:data real,64':
+                self.format = 'real'
+            elif cmd == ':format:data ascii':
+                self.format = 'ascii'
+            elif cmd == ':format:border swapped':
+                self.border = '<'
+            elif cmd == ':format:border normal':
+                self.border = '>'
+            elif cmd == '*rst':
+                self.format = 'ascii'
+            elif cmd in (':fetch?', ':read?'):
+                self.pending += self.format_readings(self.readings) + b'\n'
+            elif cmd == 'data:points?':
+                self.pending += b'%d\n' % len(self.memory)
+            elif cmd.startswith('r? '):
+                n = int(cmd[3:])
+                data = self.format_readings(self.memory[0:n])
+                del self.memory[0:n]
+                if self.format != 'real':
+                    data = ivi.build_ieee_block(data)
+                self.pending += data + b'\n'
+            elif cmd == '*idn?':
+                self.pending += b'AGILENT TECHNOLOGIES,34410A,0,1.0\n'
+            elif cmd.endswith('?'):
+                self.pending += b'0\n'
+
+    def format_readings(self, readings):
+        if self.format == 'real':
+            return ivi.build_ieee_block(struct.pack(self.border + '%dd' % len(readings), *readings))
+        return ','.join('%+.8E' % v for v in readings).encode()
+
+    def read_raw(self, num=-1):
+        # stop at the termination character, like a serial port
+        i = self.pending.find(b'\n')
+        n = len(self.pending) if i < 0 else i + 1
+        if num >= 0:
+            n = min(n, num)
+        data = bytes(self.pending[0:n])
+        del self.pending[0:n]
+        return data
+
+
+class TestAgilent34410A(unittest.TestCase):
+    def setUp(self):
+        self.instr = Virtual34410A()
+        self.drv = agilent34410A(self.instr)
+
+    def test_fetch_multi_point(self):
+        data = self.drv.measurement.fetch_multi_point(1)
+        self.assertEqual(list(data), self.instr.readings)
+        self.assertEqual(data.dtype, 'float64')
+        self.assertEqual(self.drv.measurement.fetch(1), 1.5)
+        # format is only configured once
+        self.assertEqual(self.instr.cmd_log.count(':format:data real,64'), 1)
+
+    def test_fetch_multi_point_ascii(self):
+        self.drv._reading_format = 'ascii'
+        data = self.drv.measurement.fetch_multi_point(1)
+        self.assertEqual(list(data), self.instr.readings)
+        self.assertEqual(data.dtype, 'float64')
+        self.assertEqual(self.drv.measurement.read(1), 1.5)
+
+    def test_query_after_readings(self):
+        # every reading transfer is read completely, terminator included
+        idn = 'AGILENT TECHNOLOGIES,34410A,0,1.0'
+        for fmt in ('real,64', 'ascii'):
+            self.drv._reading_format = fmt
+            self.assertEqual(self.drv.measurement.fetch(1), 1.5)
+            self.assertEqual(self.drv._ask('*idn?'), idn)
+            self.assertEqual(self.drv.measurement.read(1), 1.5)
+            self.assertEqual(self.drv._ask('*idn?'), idn)
+            self.assertEqual(list(self.drv.measurement.read_multi_point(1)), self.instr.readings)
+            self.assertEqual(self.drv._ask('*idn?'), idn)
+            self.assertEqual(len(self.instr.pending), 0)
+
+    def test_stream(self):
+        for fmt in ('real,64', 'ascii'):
+            self.drv._reading_format = fmt
+            self.instr.memory = [float(i) for i in range(10)]
+            data = list()
+            with self.drv.measurement.stream(max_count=3) as s:
+                for chunk in s:
+                    self.assertTrue(len(chunk) <= 3)
+                    data.extend(chunk)
+                    if len(data) == 10:
+                        s.stop()
+            self.assertEqual(data, list(range(10)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+
+Python Interchangeable Virtual Instrument Library
+
+Copyright (c) 2014-2016 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+import io
+import unittest
+
+import numpy as np
+
+import ivi
+from .. import agilent86140B
+
+class Virtual86140B(object):
+    def __init__(self):
+        self.read_buffer = io.BytesIO()
+        self.rx_log = list()
+        self.format = 'ascii'
+        self.trace = np.linspace(-60, -10, 1001)
+
+    def write_raw(self, data):
+        cmd = data.decode().strip().lower()
+        self.rx_log.append(cmd)
+        if cmd.startswith('format:data '):
+            self.format = cmd.split(' ', 1)[1]
+            return
+        elif cmd == 'sense:wavelength:start?':
+            resp = b'+1.50000000E-006\n'
+        elif cmd == 'sense:wavelength:stop?':
+            resp = b'+1.60000000E-006\n'
+        elif cmd.startswith('trace:data:y?'):
+            if self.format == 'real,32':
+                resp = ivi.build_ieee_block(self.trace.astype('>f4').tobytes()) + b'\n'
+            elif self.format == 'real,64':
+                resp = ivi.build_ieee_block(self.trace.astype('>f8').tobytes()) + b'\n'
+            else:
+                resp = (','.join('%e' % v for v in self.trace) + '\n').encode()
+        elif cmd.endswith('?'):
+            resp = b'0\n'
+        else:
+            return
+        self.read_buffer = io.BytesIO(resp)
+
+    def read_raw(self, num=-1):
+        return self.read_buffer.read(num)
+
+
+class TestAgilent86140B(unittest.TestCase):
+    def setUp(self):
+        self.instr = Virtual86140B()
+        self.drv = agilent86140B(self.instr)
+
+    def test_fetch_y(self):
+        trace = self.drv.traces[0].fetch_y()
+        self.assertEqual(self.instr.format, 'real,32')
+        self.assertTrue('format:border normal' in self.instr.rx_log)
+        self.assertEqual(len(trace), 1001)
+        np.testing.assert_allclose(trace.get_y(), self.instr.trace, rtol=1e-6)
+        np.testing.assert_allclose(trace.get_x(), np.linspace(1.5e-6, 1.6e-6, 1001))
+
+        # format is only sent once
+        self.instr.rx_log = list()
+        self.drv.traces[0].fetch_y()
+        self.assertEqual(self.instr.rx_log, ['trace:data:y? tra'])
+
+    def test_fetch_y_formats(self):
+        for fmt in ['real,64', 'ascii']:
+            # a changed format is sent even while the cache is valid
+            self.drv._trace_data_format = fmt
+            trace = self.drv.traces[0].fetch_y()
+            self.assertEqual(self.instr.format, fmt)
+            np.testing.assert_allclose(trace.get_y(), self.instr.trace, rtol=1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+
+Python Interchangeable Virtual Instrument Library
+
+Copyright (c) 2014-2016 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+
+import io
+import struct
+import sys
+import unittest
+
+import ivi
+from .. import agilentDSOX3034A
+
+class VirtualDSOX3034A(object):
+    def __init__(self):
+        self.read_buffer = io.BytesIO()
+        self.rx_log = list()
+        self.points = 10
+
+    def write_raw(self, data):
+        self.rx_log.append(data)
+        cmd = data.decode().strip().lower().split(';')[-1]
+        if cmd == ':waveform:preamble?':
+            resp = b'1,0,%d,1,1e-9,0,0,0.01,0,32768\n' % self.points
+        elif cmd == ':waveform:data?':
+            bo = '<' if sys.byteorder == 'little' else '>'
+            resp = ivi.build_ieee_block(struct.pack(bo + '%dH' % self.points, *range(self.points))) + b'\n'
+        elif cmd.endswith('?'):
+            resp = b'0\n'
+        else:
+            return
+        self.read_buffer = io.BytesIO(resp)
+
+    def read_raw(self, num=-1):
+        return self.read_buffer.read(num)
+
+
+class TestAgilentDSOX3034A(unittest.TestCase):
+    def setUp(self):
+        self.instr = VirtualDSOX3034A()
+        self.drv = agilentDSOX3034A(self.instr)
+
+    def test_fetch_waveform(self):
+        self.instr.rx_log = list()
+        trace = self.drv.channels[0].measurement.fetch_waveform()
+        self.assertEqual(len(trace), self.instr.points)
+        self.assertEqual(list(trace.y_raw), list(range(self.instr.points)))
+        self.assertTrue(self.instr.rx_log[0].startswith(b':waveform:source channel1;'))
+
+        # unchanged transfer settings are not sent again
+        self.instr.rx_log = list()
+        self.drv.channels[0].measurement.fetch_waveform()
+        self.assertEqual(self.instr.rx_log, [b':waveform:preamble?', b':waveform:data?'])
+
+        self.instr.rx_log = list()
+        self.drv.channels[1].measurement.fetch_waveform()
+        self.assertEqual(self.instr.rx_log[0], b':waveform:source channel2;:waveform:preamble?')
+
+        # reset invalidates transfer settings
+        self.drv.utility.reset()
+        self.instr.rx_log = list()
+        self.drv.channels[1].measurement.fetch_waveform()
+        self.assertTrue(self.instr.rx_log[0].startswith(b':waveform:source channel2;:waveform:byteorder'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+"""
+
+Python Interchangeable Virtual Instrument Library
+
+Copyright (c) 2014-2016 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+import io
+import unittest
+
+import numpy as np
+
+import ivi
+from .. import agilentE4400B
+
+class VirtualE4400B(object):
+    def __init__(self):
+        self.read_buffer = io.BytesIO()
+        self.rx_log = list()
+        self.power_condition = 0
+
+    def write_raw(self, data):
+        cmd = data.decode()
+        self.rx_log.extend(cmd.split(';'))
+        if cmd == 'status:questionable:power:condition?':
+            self.read_buffer = io.BytesIO(('%d\n' % self.power_condition).encode())
+        elif cmd.endswith('?'):
+            self.read_buffer = io.BytesIO(b'0\n')
+
+    def read_raw(self, num=-1):
+        return self.read_buffer.read(num)
+
+
+class TestAgilentE4400B(unittest.TestCase):
+    def setUp(self):
+        self.instr = VirtualE4400B()
+        self.drv = agilentE4400B(self.instr)
+
+    def test_list_sweep(self):
+        freq = np.linspace(1e6, 1e9, 1000)
+        power = np.linspace(-20, 0, 1000)
+        self.drv.sweep.list.create_frequency_power('cal', freq, power)
+        self.assertRaises(ivi.rfsiggen.FrequencyListUnknownException,
+            setattr, self.drv.sweep.list, 'selected_list', 'missing')
+
+        self.instr.rx_log = list()
+        self.drv.sweep.list.selected_list = 'cal'
+        self.drv.sweep.list.single_step_enabled = True
+        self.drv.sweep.trigger_source = 'software'
+        self.drv.sweep.mode = 'list'
+
+        log = self.instr.rx_log
+        uploads = [c for c in log if c.startswith(':list:frequency ')]
+        self.assertEqual(len(uploads), 1)
+        np.testing.assert_allclose([float(v) for v in uploads[0].split(' ', 1)[1].split(',')], freq)
+        self.assertEqual(len([c for c in log if c.startswith(':list:power ')]), 1)
+        self.assertTrue(':frequency:mode list' in log)
+        self.assertTrue(':power:mode list' in log)
+        self.assertEqual(log[-2:], [':trigger:source imm', ':list:trigger:source bus'])
+
+        # selecting the loaded list again does not upload it again
+        self.instr.rx_log = list()
+        self.drv.sweep.list.selected_list = 'cal'
+        self.assertEqual(self.instr.rx_log, [])
+
+        self.drv.send_software_trigger()
+        self.assertEqual(self.instr.rx_log, ['*TRG'])
+
+        self.drv.sweep.mode = 'none'
+        self.assertTrue(':frequency:mode cw' in self.instr.rx_log)
+
+    def test_list_sweep_after_reset(self):
+        freq = np.linspace(1e6, 1e9, 10)
+        self.drv.sweep.list.create_frequency('cal', freq)
+        self.drv.sweep.list.selected_list = 'cal'
+        self.drv.sweep.mode = 'list'
+        self.drv.utility.reset()
+        self.assertEqual(self.drv.sweep.mode, 'none')
+
+        # *RST cleared the list in the instrument, so it is sent again
+        self.instr.rx_log = list()
+        self.drv.sweep.mode = 'list'
+        self.assertEqual(len([c for c in self.instr.rx_log if c.startswith(':list:frequency ')]), 1)
+
+    def test_wait_until_settled(self):
+        self.drv.rf.wait_until_settled(100)
+        # unleveled
+        self.instr.power_condition = 1 << 1
+        self.assertRaises(ivi.MaxTimeoutExceededException, self.drv.rf.wait_until_settled, 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
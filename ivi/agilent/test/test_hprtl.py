@@ -0,0 +1,74 @@
+"""
+
+Python Interchangeable Virtual Instrument Library
+
+Copyright (c) 2014-2016 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+import io
+import struct
+import unittest
+
+import numpy as np
+
+from .. import hprtl
+
+class TestHPRTL(unittest.TestCase):
+
+    def test_parse_packbits(self):
+        # 12 pixel wide monochrome image, second row PackBits compressed
+        rtl = (b'\x1bE\x1b*r1U\x1b*r12S\x1b*r1A'
+            b'\x1b*b2W\xf0\x0f'
+            b'\x1b*b2M\x1b*b4W\x00\xaa\xff\xff'
+            b'\x1b*rC')
+        img = hprtl.parse_hprtl(io.BytesIO(rtl))
+        self.assertEqual(img.shape, (2, 12, 3))
+        black = (img == 0).all(axis=2).astype(int)
+        self.assertEqual(list(black[0]), [1]*4 + [0]*4 + [0]*4)
+        self.assertEqual(list(black[1]), [1, 0]*4 + [1]*4)
+
+    def test_parse_rgb(self):
+        # 3 plane RGB, ESC bytes in row data, palette entry reassigned
+        rtl = (b'\x1b*r3U\x1b*r3S\x1b*v10A\x1b*v20B\x1b*v30C\x1b*v1I\x1b*r1A'
+            b'\x1b*b1V\x80\x1b*b1V\x1b\x1b*b1W\xc0'
+            b'\x1b*rC')
+        img = hprtl.parse_hprtl(rtl)
+        self.assertEqual(img.shape, (1, 3, 3))
+        self.assertEqual(img[0].tolist(), [[255, 0, 255], [10, 20, 30], [0, 0, 0]])
+
+    def test_generate_bmp(self):
+        img = np.arange(2*3*3, dtype=np.uint8).reshape((2, 3, 3))
+        bmp = hprtl.generate_bmp(img)
+        offset, = struct.unpack('<L', bmp[10:14])
+        self.assertEqual(len(bmp), offset + 2*12)
+        # bottom row first, BGR, padded to 4 bytes
+        self.assertEqual(bmp[offset:offset+12], bytes([11, 10, 9, 14, 13, 12, 17, 16, 15, 0, 0, 0]))
+
+        mono = np.zeros((2, 9, 1), dtype=np.uint8)
+        mono[0, 0] = 1
+        bmp = hprtl.generate_bmp(mono)
+        offset, = struct.unpack('<L', bmp[10:14])
+        self.assertEqual(bmp[offset:], bytes([0, 0, 0, 0, 0x80, 0, 0, 0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
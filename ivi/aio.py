@@ -0,0 +1,167 @@
+"""
+
+Python Interchangeable Virtual Instrument Library
+
+Copyright (c) 2016 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+# Asyncio front-end for IVI drivers
+#
+# This is a thread offload wrapper, not asynchronous I/O: the interfaces only
+# have blocking transports, so each driver operation runs as a blocking call
+# on a worker thread while the event loop stays free.  By default every
+# AsyncDriver has a worker thread of its own; pass a shared executor to bound
+# the number of threads.  Operations on one instrument always run in order.
+
+import asyncio
+import collections
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+try:
+    _get_running_loop = asyncio.get_running_loop
+except AttributeError:
+    # Python < 3.7
+    _get_running_loop = asyncio.get_event_loop
+
+
+def _set_future(fut, result, error):
+    if fut.cancelled():
+        return
+    if error is not None:
+        fut.set_exception(error)
+    else:
+        fut.set_result(result)
+
+
+class AsyncAttribute(object):
+    """
+    Reference to a property, method or collection of an AsyncDriver
+
+    Attribute access and indexing extend the reference without touching the
+    instrument.  Awaiting the reference reads the property, and calling it
+    calls the method; both run on the driver worker thread.  Use set to
+    write a property.
+    """
+
+    def __init__(self, root, path):
+        self._root = root
+        self._path = path
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return AsyncAttribute(self._root, self._path + ((False, name),))
+
+    def __getitem__(self, key):
+        return AsyncAttribute(self._root, self._path + ((True, key),))
+
+    def _resolve(self, path):
+        obj = self._root.driver
+        for item, key in path:
+            if item:
+                obj = obj[key]
+            else:
+                obj = getattr(obj, key)
+        return obj
+
+    def _call(self, args, kwargs):
+        return self._resolve(self._path)(*args, **kwargs)
+
+    def _set(self, value):
+        item, key = self._path[-1]
+        obj = self._resolve(self._path[:-1])
+        if item:
+            obj[key] = value
+        else:
+            setattr(obj, key, value)
+
+    def __call__(self, *args, **kwargs):
+        return self._root._run(self._call, args, kwargs)
+
+    def __await__(self):
+        return self._root._run(self._resolve, self._path).__await__()
+
+
+class AsyncDriver(AsyncAttribute):
+    """
+    Asyncio front-end for a driver
+
+    Wraps a driver and exposes its properties and methods as awaitables.  The
+    driver I/O still blocks; it is run on a worker thread so that it does not
+    block the event loop:
+
+    scope = ivi.aio.AsyncDriver(ivi.agilent.agilentDSOX3034A("TCPIP0::192.168.1.104::INSTR"))
+    await ivi.aio.set(scope.timebase.range, 1e-3)
+    rng = await scope.timebase.range
+    trace = await scope.channels[0].measurement.fetch_waveform()
+
+    Without executor, each AsyncDriver runs the operations of its driver on
+    a worker thread of its own, so awaiting many AsyncDrivers together, for
+    instance with asyncio.gather, overlaps the instrument round trips at the
+    cost of one thread per instrument.  Pass a shared executor (such as a
+    concurrent.futures.ThreadPoolExecutor) to use at most its number of
+    threads for all instruments; operations of one driver still run one at
+    a time and in order.
+    """
+
+    def __init__(self, driver, loop=None, executor=None):
+        super(AsyncDriver, self).__init__(self, ())
+        self.driver = driver
+        self._loop = loop
+        self._own_executor = executor is None
+        self._executor = ThreadPoolExecutor(max_workers=1) if executor is None else executor
+        # pending operations, run one at a time in submission order
+        self._jobs = collections.deque()
+        self._lock = threading.Lock()
+
+    def _work(self):
+        with self._lock:
+            loop, fut, f = self._jobs.popleft()
+            try:
+                result = f()
+            except Exception as e:
+                loop.call_soon_threadsafe(_set_future, fut, None, e)
+            else:
+                loop.call_soon_threadsafe(_set_future, fut, result, None)
+
+    def _run(self, f, *args, **kwargs):
+        "Run f(*args, **kwargs) on a worker thread, returns an awaitable"
+        loop = self._loop or _get_running_loop()
+        fut = loop.create_future()
+        self._jobs.append((loop, fut, partial(f, *args, **kwargs)))
+        self._executor.submit(self._work)
+        return fut
+
+    async def close(self):
+        "Close the driver and stop its worker thread, if it has its own"
+        try:
+            await self._run(self.driver.close)
+        finally:
+            if self._own_executor:
+                self._executor.shutdown(wait=False)
+
+
+def set(attr, value):
+    "Set the property referenced by an AsyncAttribute, returns an awaitable"
+    return attr._root._run(attr._set, value)
@@ -224,6 +224,13 @@ class chroma62000p(chromaBaseDCPwr):
                 return float(self._ask("FETC:CURR?"))
         return 0
 
+    def _output_measure_all_commands(self, index):
+        """
+        This function returns the queries used to measure the voltage and
+        current of the output with outputs.measure_all.
+        """
+        return [":FETC:VOLT?", ":FETC:CURR?"]
+
     # Tested on Chroma 62012P-80-60; working
     def _get_output_slew_rate(self, index):
         """
@@ -24,7 +24,8 @@ THE SOFTWARE.
 
 """
 
-# Phase shifters
-from .colbyPDL10A import colbyPDL10A
-
+from ..registry import register_drivers
 
+register_drivers(__name__, [
+        # Phase shifters
+        "colbyPDL10A"])
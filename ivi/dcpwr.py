@@ -24,6 +24,8 @@ THE SOFTWARE.
 
 """
 
+import numpy as np
+
 from . import ivi
 
 # Parameter Values
@@ -32,6 +34,7 @@ RangeType = set(['current', 'voltage'])
 OutputState = set(['constant_voltage', 'constant_current', 'over_voltage',
                 'over_current', 'unregulated'])
 MeasurementType = set(['current', 'voltage'])
+MeasureAllType = np.dtype([('voltage', np.float64), ('current', np.float64)])
 
 
 def get_range(range_list, offset, val):
@@ -617,6 +620,14 @@ class Measurement(ivi.IviContainer):
                         * 'voltage'
                         * 'current'
                         """, cls, grp, '7.2.1'))
+        self._add_method('outputs.measure_all',
+                        self._outputs_measure_all,
+                        ivi.Doc("""
+                        Measures the voltage and current of every output and returns a numpy
+                        structured array with one record per output and the fields 'voltage'
+                        and 'current'.  Drivers read all outputs in as few instrument round
+                        trips as possible.
+                        """))
     
     def _output_measure(self, index, type):
         index = ivi.get_index(self._output_name, index)
@@ -624,5 +635,11 @@ class Measurement(ivi.IviContainer):
             raise ivi.ValueNotSupportedException()
         return 0
     
+    def _outputs_measure_all(self):
+        out = np.zeros(len(self._output_name), dtype=MeasureAllType)
+        for i in range(len(self._output_name)):
+            out[i] = (self._output_measure(i, 'voltage'), self._output_measure(i, 'current'))
+        return out
+    
     
 
@@ -24,7 +24,8 @@ THE SOFTWARE.
 
 """
 
-# Programmable fiberoptic instrument
-from .diconGP700 import diconGP700
-
+from ..registry import register_drivers
 
+register_drivers(__name__, [
+        # Programmable fiberoptic instrument
+        "diconGP700"])
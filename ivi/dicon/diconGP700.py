@@ -167,6 +167,15 @@ class diconGP700(scpi.common.IdnCommand, scpi.common.ErrorQuery, scpi.common.Res
                         ivi.Doc("""
                         Set switch input and output configuration.
                         """))
+        self._add_method('switches.route',
+                        self._switch_route,
+                        ivi.Doc("""
+                        Set several switches at once.  Takes a dict or a list of (switch,
+                        position) pairs, where position is an output or an (output, input)
+                        tuple.  Each switch may appear only once.  The whole table is checked
+                        before any switch moves, switches known to be in position already are
+                        skipped and the remaining moves are sent as one command sequence.
+                        """))
         self._add_property('switches[].name',
                         self._get_switch_name,
                         None,
@@ -467,8 +476,8 @@ class diconGP700(scpi.common.IdnCommand, scpi.common.ErrorQuery, scpi.common.Res
                     self._set_cache_valid(True, 'switch_input', index)
             return (self._switch_output[index], self._switch_input[index])
     
-    def _switch_set(self, index, output, input=None):
-        index = ivi.get_index(self._switch_name, index)
+    def _switch_command(self, index, output, input=None):
+        "Check switch position and return command to move there, or None if already there"
         name = self._switch_name[index]
         
         output = int(output)
@@ -480,29 +489,78 @@ class diconGP700(scpi.common.IdnCommand, scpi.common.ErrorQuery, scpi.common.Res
                 raise ivi.OutOfRangeException()
             if input is not None and (input < 1 or input > self._switch_input_count[index]):
                 raise ivi.OutOfRangeException()
-            if not self._driver_operation_simulate:
-                if input is None:
-                    self._write("%s %d" % (name, output))
-                else:
-                    self._write("%s %d, %d" % (name, output, input))
-            else:
-                self._switch_output[index] = output
-                self._set_cache_valid(True, 'switch_output', index)
-                if input is not None:
-                    self._switch_input[index] = input
-                    self._set_cache_valid(True, 'switch_input', index)
         elif name[0] == 'P' or name[0] == 'S':
             if output < 1 or output > self._switch_output_count[index]:
                 raise ivi.OutOfRangeException()
             if input is not None and input != 1:
                 raise ivi.OutOfRangeException()
-            if not self._driver_operation_simulate:
-                self._write("%s %d" % (name, output))
+            input = None
+        
+        # skip the move if the switch is known to be in position already
+        if (self._get_cache_valid('switch_output', index) and self._switch_output[index] == output and
+                (input is None or (self._get_cache_valid('switch_input', index) and self._switch_input[index] == input))):
+            return None
+        
+        if input is None:
+            return "%s %d" % (name, output)
+        else:
+            return "%s %d, %d" % (name, output, input)
+    
+    def _switch_update(self, index, output, input=None):
+        "Record switch position in the cache"
+        name = self._switch_name[index]
+        
+        self._switch_output[index] = int(output)
+        self._set_cache_valid(True, 'switch_output', index)
+        if name[0] == 'P' or name[0] == 'S':
+            self._switch_input[index] = 1
+            self._set_cache_valid(True, 'switch_input', index)
+        elif input is not None:
+            self._switch_input[index] = int(input)
+            self._set_cache_valid(True, 'switch_input', index)
+    
+    def _switch_set(self, index, output, input=None):
+        index = ivi.get_index(self._switch_name, index)
+        
+        cmd = self._switch_command(index, output, input)
+        if cmd is None:
+            return
+        
+        if not self._driver_operation_simulate:
+            self._write(cmd)
+        self._switch_update(index, output, input)
+    
+    def _switch_route(self, routes):
+        # accept a dict or a sequence of (switch, position) pairs
+        if hasattr(routes, 'items'):
+            routes = routes.items()
+        
+        # check the whole table before moving anything
+        moves = list()
+        seen = set()
+        for switch, position in routes:
+            index = ivi.get_index(self._switch_name, switch)
+            if index in seen:
+                # later entries would be checked against stale positions
+                raise ivi.ValueNotSupportedException("Switch %s listed more than once" % self._switch_name[index])
+            seen.add(index)
+            if type(position) is tuple or type(position) is list:
+                output, input = position
             else:
-                self._switch_output[index] = output
-                self._switch_input[index] = 1
-                self._set_cache_valid(True, 'switch_output', index)
-                self._set_cache_valid(True, 'switch_input', index)
+                output, input = position, None
+            cmd = self._switch_command(index, output, input)
+            if cmd is not None:
+                moves.append((index, output, input, cmd))
+        
+        if not moves:
+            return
+        
+        if not self._driver_operation_simulate:
+            # send as a command list so the interface can pipeline the writes
+            self._write([cmd for index, output, input, cmd in moves])
+        
+        for index, output, input, cmd in moves:
+            self._switch_update(index, output, input)
     
     def _get_switch_name(self, index):
         index = ivi.get_index(self._switch_name, index)
@@ -0,0 +1,92 @@
+"""
+
+Python Interchangeable Virtual Instrument Library
+
+Copyright (c) 2014-2016 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+import io
+import unittest
+
+import ivi
+from .. import diconGP700
+
+class VirtualGP700(object):
+    def __init__(self):
+        self.read_buffer = io.BytesIO()
+        self.rx_log = list()
+
+    def write_raw(self, data):
+        cmd = data.decode()
+        self.rx_log.append(cmd)
+        if cmd == 'system:config?':
+            resp = b'M1 O8 I2,P1 OUTPUTS8,S2\n'
+        elif cmd.endswith('?'):
+            resp = b'1\n'
+        else:
+            return
+        self.read_buffer = io.BytesIO(resp)
+
+    def read_raw(self, num=-1):
+        return self.read_buffer.read(num)
+
+
+class TestDiconGP700(unittest.TestCase):
+    def setUp(self):
+        self.instr = VirtualGP700()
+        self.drv = diconGP700(self.instr)
+
+    def test_switch_cache(self):
+        self.assertEqual(self.drv._switch_name, ['M1', 'P1', 'S01', 'S02'])
+        self.instr.rx_log = list()
+        self.drv.switches['P1'].set(3)
+        self.assertEqual(self.drv.switches['P1'].output, 3)
+        # already in position
+        self.drv.switches['P1'].set(3)
+        self.assertEqual(self.instr.rx_log, ['P1 3'])
+
+    def test_switch_route(self):
+        self.drv.switches['S01'].set(2)
+        self.instr.rx_log = list()
+        self.drv.switches.route({'M1': (4, 2), 'P1': 5, 'S01': 2, 'S02': 1})
+        self.assertEqual(sorted(self.instr.rx_log), ['M1 4, 2', 'P1 5', 'S02 1'])
+        self.assertEqual(self.drv.switches['M1'].get(), (4, 2))
+
+        self.instr.rx_log = list()
+        self.drv.switches.route([('M1', (4, 2)), ('P1', 6)])
+        self.assertEqual(self.instr.rx_log, ['P1 6'])
+
+        # invalid entries are rejected before anything moves
+        self.instr.rx_log = list()
+        self.assertRaises(ivi.OutOfRangeException, self.drv.switches.route, [('P1', 7), ('S02', 3)])
+        self.assertEqual(self.instr.rx_log, [])
+
+        # a switch listed twice is rejected, even when the last entry matches the cache
+        self.assertEqual(self.drv.switches['P1'].output, 6)
+        self.assertRaises(ivi.ValueNotSupportedException, self.drv.switches.route, [('P1', 5), ('P1', 6)])
+        self.assertRaises(ivi.ValueNotSupportedException, self.drv.switches.route, [('P1', 5), (self.drv._switch_name.index('P1'), 6)])
+        self.assertEqual(self.instr.rx_log, [])
+        self.assertEqual(self.drv.switches['P1'].output, 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+"""
+
+Python Interchangeable Virtual Instrument Library
+
+Copyright (c) 2014-2016 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+import collections
+import threading
+from functools import partial
+
+from .. import ivi
+
+class ReadingStream(object):
+    """
+    Iterator over chunks of DMM readings
+
+    A background thread repeatedly calls read, which returns an array of the
+    readings removed from the instrument since the previous call (empty if
+    none are available), and queues every nonempty result.  Iterating yields
+    the queued arrays in order, blocking until the next one is available.
+    Iteration ends once stop is called and the queue is drained; an exception
+    raised by read stops the thread and is raised again by the iterator.
+
+    At most max_queued arrays are kept.  When the consumer falls behind, the
+    thread stops reading until there is room again (overflow='block'), so no
+    readings are lost as long as the instrument reading memory does not
+    overflow.  With overflow='drop', the oldest arrays are dropped instead and
+    the number of dropped readings is counted in dropped.
+    """
+
+    def __init__(self, read, poll_interval=0.01, max_queued=256, overflow='block'):
+        if overflow not in ('block', 'drop'):
+            raise ivi.ValueNotSupportedException()
+        self._read = read
+        self._poll_interval = poll_interval
+        self._max_queued = max_queued
+        self._overflow = overflow
+        self._queue = collections.deque()
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._finished = False
+        self.error = None
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                data = self._read()
+                if data is not None and len(data) > 0:
+                    self._put(data)
+                else:
+                    self._stop.wait(self._poll_interval)
+        except Exception as e:
+            self.error = e
+        finally:
+            with self._cond:
+                self._finished = True
+                self._cond.notify_all()
+
+    def _put(self, data):
+        with self._cond:
+            while len(self._queue) >= self._max_queued:
+                if self._overflow == 'drop':
+                    self.dropped += len(self._queue.popleft())
+                elif self._stop.is_set():
+                    # keep readings already taken from the instrument
+                    break
+                else:
+                    self._cond.wait(self._poll_interval)
+            self._queue.append(data)
+            self._cond.notify_all()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        with self._cond:
+            while not self._queue and not self._finished:
+                self._cond.wait()
+            if self._queue:
+                data = self._queue.popleft()
+                self._cond.notify_all()
+                return data
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+        raise StopIteration
+
+    next = __next__
+
+    def stop(self):
+        "Stop draining the instrument; readings already queued can still be iterated"
+        self._stop.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+class Streaming(ivi.IviContainer):
+    "Extension IVI methods for DMMs that can stream readings out of reading memory while measuring"
+
+    def __init__(self, *args, **kwargs):
+        super(Streaming, self).__init__(*args, **kwargs)
+
+        self._add_method('measurement.stream',
+                        self._measurement_stream,
+                        ivi.Doc("""
+                        Starts draining readings from the instrument reading memory in a
+                        background thread and returns an iterator over numpy arrays of readings.
+                        The reading memory is polled every poll_interval seconds while empty and
+                        at most max_count readings are transferred at a time.  At most max_queued
+                        arrays are buffered; if they are not consumed in time, draining pauses
+                        until there is room.  Pass overflow='drop' to drop the oldest arrays
+                        instead, counting the lost readings in the dropped attribute of the stream.
+
+                        Configure the trigger system (usually with an infinite trigger count) and
+                        call measurement.initiate before or after starting the stream.  Call stop
+                        on the returned stream, or use it as a context manager, to stop draining.
+                        Each transfer is a single driver transaction, so the driver can be used
+                        from other threads while streaming.
+
+                        Example:
+
+                        dmm.trigger.multi_point.count = float('inf')
+                        dmm.measurement.initiate()
+                        with dmm.measurement.stream() as s:
+                            for chunk in s:
+                                log(chunk)
+                        """))
+
+    def _measurement_stream(self, poll_interval=0.01, max_count=None, max_queued=256, overflow='block'):
+        return ReadingStream(partial(self._measurement_stream_transfer, max_count), poll_interval,
+                max_queued, overflow)
+
+    def _measurement_stream_transfer(self, max_count=None):
+        with self._transaction():
+            return self._measurement_stream_read(max_count)
+
+    def _measurement_stream_read(self, max_count=None):
+        return None
+
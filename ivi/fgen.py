@@ -24,6 +24,8 @@ THE SOFTWARE.
 
 """
 
+import numpy as np
+
 from . import ivi
 
 # Exceptions
@@ -46,6 +48,31 @@ TerminalConfiguration = set(['single_ended', 'differential'])
 TriggerSlope = set(['positive', 'negative', 'either'])
 
 
+def encode_arbitrary_waveform(y, dtype='<f4', bits=None):
+    """
+    Encode normalized arbitrary waveform samples for upload
+
+    Samples are clipped to [-1, 1].  If bits is None, the clipped values are
+    converted to the floating point type dtype.  Otherwise, they are scaled to
+    unsigned offset binary codes from 0 to 2**bits-2 (so that 0.0 maps to the
+    mid-scale code) and converted to the integer type dtype.  Returns the
+    encoded data as bytes.
+    """
+    y = np.asarray(y, dtype=float)
+    yc = np.clip(y, -1.0, 1.0)
+
+    if bits is None:
+        return yc.astype(dtype).tobytes()
+
+    # offset binary: -1 -> 0, 1 -> 2**bits-2, rounded to nearest
+    yc += 1.0
+    yc *= ((1 << bits) - 2) / 2.0
+    yc += 0.5
+    np.floor(yc, out=yc)
+
+    return yc.astype(dtype).tobytes()
+
+
 class Base(ivi.IviContainer):
     "Base IVI methods for all function generators"
     
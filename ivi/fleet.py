@@ -0,0 +1,178 @@
+"""
+
+Python Interchangeable Virtual Instrument Library
+
+Copyright (c) 2016 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from . import ivi
+
+
+def resolve_attribute(obj, name):
+    "Resolve a dotted attribute name with optional indices, such as 'outputs[0].voltage_level'"
+    for part in name.split('.'):
+        key = None
+        k = part.find('[')
+        if k >= 0:
+            key = part[k+1:part.index(']')]
+            part = part[:k]
+        obj = getattr(obj, part)
+        if key is not None:
+            obj = obj[int(key) if key.lstrip('-').isdigit() else key]
+    return obj
+
+
+def _set_attribute(obj, name, value):
+    if '.' in name:
+        base, name = name.rsplit('.', 1)
+        obj = resolve_attribute(obj, base)
+    setattr(obj, name, value)
+
+
+class FleetResult(list):
+    """
+    Per member results of a fleet operation
+
+    The list holds one result per member, in member order; members that
+    failed hold None.  errors holds the exception raised for each member, or
+    None for members that succeeded.
+    """
+
+    def __init__(self, values, errors):
+        super(FleetResult, self).__init__(values)
+        self.errors = errors
+
+    @property
+    def failed(self):
+        "Indices of members that failed"
+        return [i for i, e in enumerate(self.errors) if e is not None]
+
+    def check(self):
+        "Raise the exception of the first failed member, if any"
+        for e in self.errors:
+            if e is not None:
+                raise e
+        return self
+
+
+class Fleet(object):
+    """
+    Group of drivers operated on in parallel
+
+    Operations run on all members at once in a thread pool and return a
+    FleetResult with the per member results and exceptions.  Each member has
+    a lock so that concurrent fleet operations do not interleave on one
+    instrument.  If timeout is set, members that do not complete in time fail
+    with IOTimeoutException (the operation itself cannot be interrupted and
+    keeps the member locked until it completes).  get, set, set_each and map
+    take a timeout keyword and call takes _timeout to override it per call.
+
+    Example:
+
+    supplies = ivi.Fleet([ivi.rigol.rigolDP832(r) for r in resources])
+    supplies.set('outputs[0].voltage_level', 5.0)
+    supplies.call('outputs[0].configure_current_limit', 'regulate', 0.5)
+    v = supplies.call('outputs.measure_all').check()
+    """
+
+    def __init__(self, drivers, max_workers=None, timeout=None):
+        self.drivers = list(drivers)
+        self.timeout = timeout
+        self._locks = [threading.RLock() for d in self.drivers]
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or max(len(self.drivers), 1))
+
+    def __len__(self):
+        return len(self.drivers)
+
+    def __getitem__(self, index):
+        return self.drivers[index]
+
+    def __iter__(self):
+        return iter(self.drivers)
+
+    def _run(self, i, f, args):
+        with self._locks[i]:
+            return f(self.drivers[i], *args)
+
+    def map(self, f, *iterables, **kwargs):
+        """
+        Call f(driver, *args) for every member in parallel
+
+        Additional iterables supply per member arguments, as with map.
+        """
+        timeout = kwargs.get('timeout', self.timeout)
+        args = list(zip(*iterables)) if iterables else [()] * len(self.drivers)
+        if len(args) != len(self.drivers):
+            raise ivi.ValueNotSupportedException("Expected one argument per member")
+
+        futures = [self._executor.submit(self._run, i, f, args[i]) for i in range(len(self.drivers))]
+
+        deadline = None if timeout is None else time.time() + timeout
+
+        values = list()
+        errors = list()
+        for fut in futures:
+            try:
+                values.append(fut.result(None if deadline is None else max(deadline - time.time(), 0)))
+                errors.append(None)
+            except FutureTimeoutError:
+                values.append(None)
+                errors.append(ivi.IOTimeoutException())
+            except Exception as e:
+                values.append(None)
+                errors.append(e)
+
+        return FleetResult(values, errors)
+
+    def get(self, name, **kwargs):
+        "Read a property on every member"
+        return self.map(lambda d: resolve_attribute(d, name), **kwargs)
+
+    def set(self, name, value, **kwargs):
+        "Set a property to the same value on every member"
+        return self.map(lambda d: _set_attribute(d, name, value), **kwargs)
+
+    def set_each(self, name, values, **kwargs):
+        "Set a property on every member to the corresponding value from values"
+        return self.map(lambda d, v: _set_attribute(d, name, v), values, **kwargs)
+
+    def call(self, name, *args, **kwargs):
+        """
+        Call a method with the same arguments on every member
+
+        The _timeout keyword overrides the fleet timeout for this call; all
+        other keywords are passed to the method.
+        """
+        timeout = kwargs.pop('_timeout', self.timeout)
+        return self.map(lambda d: resolve_attribute(d, name)(*args, **kwargs), timeout=timeout)
+
+    def close(self):
+        "Close all members and stop the thread pool"
+        try:
+            return self.call('close')
+        finally:
+            self._executor.shutdown(wait=False)
@@ -0,0 +1,370 @@
+"""
+
+Python Interchangeable Virtual Instrument Library
+
+Copyright (c) 2012-2016 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+import errno
+import re
+import select
+import socket
+import struct
+import time
+
+# HiSLIP (IVI-6.1) message header: prologue, message type, control code,
+# message parameter, payload length
+HEADER = struct.Struct('>2sBBIQ')
+PROLOGUE = b'HS'
+
+# message types
+INITIALIZE = 0
+INITIALIZE_RESPONSE = 1
+FATAL_ERROR = 2
+ERROR = 3
+ASYNC_LOCK = 4
+ASYNC_LOCK_RESPONSE = 5
+DATA = 6
+DATA_END = 7
+DEVICE_CLEAR_COMPLETE = 8
+DEVICE_CLEAR_ACKNOWLEDGE = 9
+ASYNC_REMOTE_LOCAL_CONTROL = 10
+ASYNC_REMOTE_LOCAL_RESPONSE = 11
+TRIGGER = 12
+INTERRUPTED = 13
+ASYNC_INTERRUPTED = 14
+ASYNC_MAXIMUM_MESSAGE_SIZE = 15
+ASYNC_MAXIMUM_MESSAGE_SIZE_RESPONSE = 16
+ASYNC_INITIALIZE = 17
+ASYNC_INITIALIZE_RESPONSE = 18
+ASYNC_DEVICE_CLEAR = 19
+ASYNC_SERVICE_REQUEST = 20
+ASYNC_STATUS_QUERY = 21
+ASYNC_STATUS_RESPONSE = 22
+ASYNC_DEVICE_CLEAR_ACKNOWLEDGE = 23
+
+PROTOCOL_VERSION = 0x0100
+VENDOR_ID = 0x5049 # 'PI'
+FIRST_MESSAGE_ID = 0xffffff00
+
+# remote/local control codes
+DISABLE_REMOTE = 0
+ENABLE_REMOTE = 1
+DISABLE_REMOTE_GO_TO_LOCAL = 2
+ENABLE_REMOTE_GO_TO_REMOTE = 3
+ENABLE_REMOTE_LOCK_OUT_LOCAL = 4
+ENABLE_REMOTE_GO_TO_REMOTE_LOCK_OUT_LOCAL = 5
+GO_TO_LOCAL = 6
+
+def parse_visa_resource_string(resource_string):
+    # valid resource strings:
+    # TCPIP::10.0.0.1::hislip0::INSTR
+    # TCPIP0::10.0.0.1::hislip0::INSTR
+    # TCPIP0::10.0.0.1::hislip0,4880::INSTR
+    m = re.match(r'^(?P<prefix>(?P<type>TCPIP)\d*)(::(?P<arg1>[^\s:]+))(::(?P<arg2>hislip\d*)(,(?P<port>\d+))?)(::(?P<suffix>INSTR))$',
+            resource_string, re.I)
+
+    if m is not None:
+        return dict(
+                type = m.group('type').upper(),
+                prefix = m.group('prefix'),
+                arg1 = m.group('arg1'),
+                arg2 = m.group('arg2'),
+                port = m.group('port'),
+                suffix = m.group('suffix'),
+        )
+
+class HislipInstrument:
+    "HiSLIP instrument interface client"
+    def __init__(self, host, sub_address = 'hislip0', port = 4880, timeout = 10, max_message_size = 1 << 20):
+
+        if host.upper().startswith("TCPIP") and '::' in host:
+            res = parse_visa_resource_string(host)
+
+            if res is None:
+                raise IOError("Invalid resource string")
+
+            host = res['arg1']
+            sub_address = res['arg2']
+            if res['port'] is not None:
+                port = int(res['port'])
+
+        self.host = host
+        self.port = port
+        self.sub_address = sub_address
+        self.timeout = timeout
+        self.max_message_size = max_message_size
+
+        # synchronous channel
+        self.sync_socket = self._connect()
+        self._send(self.sync_socket, INITIALIZE, 0, (PROTOCOL_VERSION << 16) | VENDOR_ID,
+                str(sub_address).encode('ascii'))
+        msg_type, control, param, payload = self._recv_expect(self.sync_socket, INITIALIZE_RESPONSE)
+        self.overlap = bool(control & 1)
+        self.server_protocol_version = param >> 16
+        self.session_id = param & 0xffff
+
+        # asynchronous channel
+        self.async_socket = self._connect()
+        self._send(self.async_socket, ASYNC_INITIALIZE, 0, self.session_id)
+        msg_type, control, param, payload = self._recv_expect(self.async_socket, ASYNC_INITIALIZE_RESPONSE)
+        self.server_vendor_id = param
+
+        # negotiate maximum message size
+        self._send(self.async_socket, ASYNC_MAXIMUM_MESSAGE_SIZE, 0, 0,
+                struct.pack('>Q', max_message_size))
+        msg_type, control, param, payload = self._recv_expect(self.async_socket, ASYNC_MAXIMUM_MESSAGE_SIZE_RESPONSE)
+        self.server_max_message_size = struct.unpack('>Q', payload)[0]
+
+        # service request received on the asynchronous channel
+        self._srq = False
+
+        self._reset()
+
+    def _connect(self):
+        s = socket.create_connection((self.host, self.port), self.timeout)
+        # send small messages immediately
+        s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return s
+
+    def _reset(self):
+        self.message_id = FIRST_MESSAGE_ID
+        # ID of the last message sent on the synchronous channel
+        self._last_message_id = (FIRST_MESSAGE_ID - 2) & 0xffffffff
+        # a complete response has been read since the last message was sent
+        self.rmt_delivered = False
+        # response data not yet returned
+        self._buf = bytearray()
+        # DataEnd received for the current response
+        self._end = False
+
+    def _next_message_id(self):
+        self._last_message_id = self.message_id
+        self.message_id = (self.message_id + 2) & 0xffffffff
+        return self._last_message_id
+
+    def _send(self, sock, msg_type, control, param, payload = b''):
+        header = HEADER.pack(PROLOGUE, msg_type, control, param, len(payload))
+        if len(payload) < 4096:
+            sock.sendall(header + payload)
+        else:
+            sock.sendall(header)
+            sock.sendall(payload)
+
+    def _recv_exact(self, sock, n):
+        data = bytearray(n)
+        view = memoryview(data)
+        got = 0
+        while got < n:
+            k = sock.recv_into(view[got:])
+            if k == 0:
+                raise IOError(errno.ECONNRESET, "Connection closed")
+            got += k
+        return data
+
+    def _recv(self, sock):
+        prologue, msg_type, control, param, length = HEADER.unpack(self._recv_exact(sock, HEADER.size))
+        if prologue != PROLOGUE:
+            self._send(sock, FATAL_ERROR, 1, 0, b'Poorly formed message header')
+            raise IOError("Invalid HiSLIP message header")
+        payload = self._recv_exact(sock, length) if length else bytearray()
+        if msg_type == FATAL_ERROR:
+            raise IOError("HiSLIP fatal error %d: %s" % (control, payload.decode('utf-8', 'replace')))
+        if msg_type == ERROR:
+            raise IOError("HiSLIP error %d: %s" % (control, payload.decode('utf-8', 'replace')))
+        return msg_type, control, param, payload
+
+    def _recv_expect(self, sock, expect):
+        while True:
+            msg_type, control, param, payload = self._recv(sock)
+            if msg_type == expect:
+                return msg_type, control, param, payload
+            if msg_type == ASYNC_SERVICE_REQUEST:
+                self._srq = True
+            if msg_type in (ASYNC_SERVICE_REQUEST, ASYNC_INTERRUPTED, INTERRUPTED,
+                    DATA, DATA_END):
+                # unsolicited, or response data discarded by a device clear
+                continue
+            raise IOError("Unexpected HiSLIP message type %d" % msg_type)
+
+    def _rmt_control(self):
+        control = 1 if self.rmt_delivered else 0
+        self.rmt_delivered = False
+        return control
+
+    def write_raw(self, data):
+        "Write binary data to instrument"
+        if not self.overlap and (self._buf or self._end):
+            # synchronized mode: the server discards the unread response
+            del self._buf[:]
+            self._end = False
+
+        # split into messages the server accepts
+        size = max(self.server_max_message_size - HEADER.size, 1)
+        data = memoryview(data)
+        offset = 0
+        while True:
+            chunk = data[offset:offset+size]
+            offset += size
+            last = offset >= len(data)
+            self._send(self.sync_socket, DATA_END if last else DATA, self._rmt_control(),
+                    self._next_message_id(), chunk.tobytes())
+            if last:
+                break
+
+    def _recv_data(self):
+        "Receive the next response message into the buffer"
+        msg_type, control, param, payload = self._recv(self.sync_socket)
+        if msg_type in (DATA, DATA_END):
+            if not self.overlap and param != self._last_message_id:
+                # stale response to an interrupted query
+                return
+            self._buf += payload
+            if msg_type == DATA_END:
+                self._end = True
+        elif msg_type == INTERRUPTED:
+            if not self.overlap:
+                del self._buf[:]
+                self._end = False
+        elif msg_type != ASYNC_SERVICE_REQUEST:
+            raise IOError("Unexpected HiSLIP message type %d" % msg_type)
+
+    def read_raw(self, num=-1):
+        "Read binary data from instrument"
+        while not self._end and (num < 0 or len(self._buf) < num):
+            self._recv_data()
+
+        n = len(self._buf) if num < 0 else min(num, len(self._buf))
+        data = bytes(self._buf[0:n])
+        del self._buf[0:n]
+
+        if self._end and not self._buf:
+            # response complete
+            self._end = False
+            self.rmt_delivered = True
+
+        return data
+
+    def ask_raw(self, data, num=-1):
+        "Write then read binary data"
+        self.write_raw(data)
+        return self.read_raw(num)
+
+    def write(self, message, encoding = 'utf-8'):
+        "Write string to instrument"
+        if type(message) is tuple or type(message) is list:
+            # recursive call for a list of commands
+            for message_i in message:
+                self.write(message_i, encoding)
+            return
+
+        self.write_raw(str(message).encode(encoding))
+
+    def read(self, num=-1, encoding = 'utf-8'):
+        "Read string from instrument"
+        return self.read_raw(num).decode(encoding).rstrip('\r\n')
+
+    def ask(self, message, num=-1, encoding = 'utf-8'):
+        "Write then read string"
+        if type(message) is tuple or type(message) is list:
+            if self.overlap:
+                # overlapped mode: pipeline the queries, the server
+                # returns the responses in order
+                for message_i in message:
+                    self.write(message_i, encoding)
+                return [self.read(num, encoding) for message_i in message]
+
+            # recursive call for a list of commands
+            val = list()
+            for message_i in message:
+                val.append(self.ask(message_i, num, encoding))
+            return val
+
+        self.write(message, encoding)
+        return self.read(num, encoding)
+
+    def read_stb(self):
+        "Read status byte"
+        self._send(self.async_socket, ASYNC_STATUS_QUERY, self._rmt_control(), self._last_message_id)
+        msg_type, control, param, payload = self._recv_expect(self.async_socket, ASYNC_STATUS_RESPONSE)
+        return control
+
+    def wait_for_srq(self, timeout=None):
+        "Wait for service request, returns False on timeout"
+        deadline = None if timeout is None else time.time() + timeout
+        while not self._srq:
+            remaining = None if deadline is None else deadline - time.time()
+            if remaining is not None and remaining <= 0:
+                return False
+            r, w, x = select.select([self.async_socket], [], [], remaining)
+            if not r:
+                return False
+            msg_type, control, param, payload = self._recv(self.async_socket)
+            if msg_type == ASYNC_SERVICE_REQUEST:
+                self._srq = True
+        self._srq = False
+        return True
+
+    def trigger(self):
+        "Send trigger command"
+        self._send(self.sync_socket, TRIGGER, self._rmt_control(), self._next_message_id())
+
+    def clear(self):
+        "Send clear command"
+        self._send(self.async_socket, ASYNC_DEVICE_CLEAR, 0, 0)
+        msg_type, control, param, payload = self._recv_expect(self.async_socket, ASYNC_DEVICE_CLEAR_ACKNOWLEDGE)
+        # accept the feature setting preferred by the server
+        self._send(self.sync_socket, DEVICE_CLEAR_COMPLETE, control, 0)
+        msg_type, control, param, payload = self._recv_expect(self.sync_socket, DEVICE_CLEAR_ACKNOWLEDGE)
+        self.overlap = bool(control & 1)
+        self._reset()
+
+    def _remote_local(self, control):
+        self._send(self.async_socket, ASYNC_REMOTE_LOCAL_CONTROL, control, self._last_message_id)
+        self._recv_expect(self.async_socket, ASYNC_REMOTE_LOCAL_RESPONSE)
+
+    def remote(self):
+        "Send remote command"
+        self._remote_local(ENABLE_REMOTE_GO_TO_REMOTE)
+
+    def local(self):
+        "Send local command"
+        self._remote_local(GO_TO_LOCAL)
+
+    def lock(self):
+        "Send lock command"
+        self._send(self.async_socket, ASYNC_LOCK, 1, int(self.timeout * 1000))
+        msg_type, control, param, payload = self._recv_expect(self.async_socket, ASYNC_LOCK_RESPONSE)
+        if control != 1:
+            raise IOError("Failed to acquire lock")
+
+    def unlock(self):
+        "Send unlock command"
+        self._send(self.async_socket, ASYNC_LOCK, 0, self._last_message_id)
+        msg_type, control, param, payload = self._recv_expect(self.async_socket, ASYNC_LOCK_RESPONSE)
+        if control not in (1, 2):
+            raise IOError("Failed to release lock")
+
+    def close(self):
+        "Close connection"
+        self.async_socket.close()
+        self.sync_socket.close()
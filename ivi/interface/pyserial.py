@@ -37,7 +37,7 @@ def parse_visa_resource_string(resource_string):
     # ASRL::/dev/ttyUSB0::INSTR
     # ASRL::/dev/ttyUSB0,9600::INSTR
     # ASRL::/dev/ttyUSB0,9600,8n1::INSTR
-    m = re.match('^(?P<prefix>(?P<type>ASRL)\d*)(::(?P<arg1>[^\s:]+))?(::(?P<suffix>INSTR))$',
+    m = re.match(r'^(?P<prefix>(?P<type>ASRL)\d*)(::(?P<arg1>[^\s:]+))?(::(?P<suffix>INSTR))$',
             resource_string, re.I)
 
     if m is not None:
@@ -51,7 +51,7 @@ def parse_visa_resource_string(resource_string):
 class SerialInstrument:
     "Serial instrument interface client"
     def __init__(self, port = None, baudrate=9600, bytesize=8, paritymode=0, stopbits=1, timeout=None,
-                xonxoff=False, rtscts=False, dsrdtr=False):
+                xonxoff=False, rtscts=False, dsrdtr=False, bufsize=4096):
 
         if port.upper().startswith("ASRL") and '::' in port:
             res = parse_visa_resource_string(port)
@@ -90,6 +90,11 @@ class SerialInstrument:
         self.wait_dsr = False
         self.message_delay = 0
 
+        # maximum read size
+        self.bufsize = bufsize
+        # received data not yet returned
+        self._buf = bytearray()
+
         self.update_settings()
     
     def update_settings(self):
@@ -147,21 +152,64 @@ class SerialInstrument:
             while not self.serial.getDSR():
                 time.sleep(0.01)
     
+    def _can_pipeline(self):
+        # instruments that need a delay or handshake between
+        # messages must get them one at a time
+        return self.term_char is not None and self.message_delay <= 0 and not self.wait_dsr
+    
+    def _write_many(self, messages, encoding):
+        "Write several messages with a single serial write"
+        term_char = str(self.term_char).encode('utf-8')[0:1]
+        data = bytearray()
+        for message in messages:
+            data += str(message).encode(encoding)
+            if not data.endswith(term_char):
+                data += term_char
+        self.serial.write(data)
+    
+    def _in_waiting(self):
+        try:
+            return self.serial.in_waiting
+        except AttributeError:
+            # pyserial 2.x
+            return self.serial.inWaiting()
+    
+    def _recv(self):
+        "Read everything available into the buffer, waiting for at least one byte"
+        n = self._in_waiting()
+        if n == 0:
+            # block for the next byte (up to the port timeout),
+            # then drain whatever arrived with it
+            d = self.serial.read(1)
+            if not d:
+                raise IOError("Read timed out")
+            self._buf += d
+            n = self._in_waiting()
+            if n == 0:
+                return
+        self._buf += self.serial.read(min(n, self.bufsize))
+    
     def read_raw(self, num=-1):
         "Read binary data from instrument"
         
-        data = b''
         term_char = str(self.term_char).encode('utf-8')[0:1]
+        start = 0
         
         while True:
-            c = self.serial.read(1)
-            data += c
-            num -= 1
-            if c == term_char:
+            i = self._buf.find(term_char, start)
+            if i >= 0:
+                n = i + 1
+                if num >= 0 and num < n:
+                    n = num
                 break
-            if num == 0:
+            if num >= 0 and len(self._buf) >= num:
+                n = num
                 break
-            
+            start = len(self._buf)
+            self._recv()
+        
+        data = bytes(self._buf[0:n])
+        del self._buf[0:n]
         return data
     
     def ask_raw(self, data, num=-1):
@@ -172,6 +220,9 @@ class SerialInstrument:
     def write(self, message, encoding = 'utf-8'):
         "Write string to instrument"
         if type(message) is tuple or type(message) is list:
+            if self._can_pipeline():
+                self._write_many(message, encoding)
+                return
             # recursive call for a list of commands
             for message_i in message:
                 self.write(message_i, encoding)
@@ -186,6 +237,10 @@ class SerialInstrument:
     def ask(self, message, num=-1, encoding = 'utf-8'):
         "Write then read string"
         if type(message) is tuple or type(message) is list:
+            if self._can_pipeline():
+                # pipeline the queries, then collect the responses
+                self._write_many(message, encoding)
+                return [self.read(num, encoding) for message_i in message]
             # recursive call for a list of commands
             val = list()
             for message_i in message:
@@ -205,6 +260,13 @@ class SerialInstrument:
     
     def clear(self):
         "Send clear command"
+        # discard unread data
+        del self._buf[:]
+        try:
+            self.serial.reset_input_buffer()
+        except AttributeError:
+            # pyserial 2.x
+            self.serial.flushInput()
         self.write("*CLS")
     
     def remote(self):
@@ -26,7 +26,6 @@ THE SOFTWARE.
 
 import io
 import sys
-from distutils.version import StrictVersion
 
 try:
     import visa
@@ -104,7 +103,19 @@ class PyVisaInstrument:
 
     def read_stb(self):
         "Read status byte"
-        raise NotImplementedError()
+        if not hasattr(self.instrument, 'read_stb'):
+            raise NotImplementedError()
+        return self.instrument.read_stb()
+
+    def wait_for_srq(self, timeout=None):
+        "Wait for service request, returns False on timeout"
+        if not hasattr(self.instrument, 'wait_for_srq'):
+            raise NotImplementedError()
+        try:
+            self.instrument.wait_for_srq(None if timeout is None else max(int(timeout * 1000), 1))
+        except visa.VisaIOError:
+            return False
+        return True
 
     def trigger(self):
         "Send trigger command"
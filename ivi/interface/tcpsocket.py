@@ -0,0 +1,260 @@
+"""
+
+Python Interchangeable Virtual Instrument Library
+
+Copyright (c) 2012-2016 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+import errno
+import re
+import socket
+
+def parse_visa_resource_string(resource_string):
+    # valid resource strings:
+    # TCPIP::10.0.0.1::5025::SOCKET
+    # TCPIP0::10.0.0.1::5025::SOCKET
+    m = re.match(r'^(?P<prefix>(?P<type>TCPIP)\d*)(::(?P<arg1>[^\s:]+))(::(?P<arg2>\d+))(::(?P<suffix>SOCKET))$',
+            resource_string, re.I)
+
+    if m is not None:
+        return dict(
+                type = m.group('type').upper(),
+                prefix = m.group('prefix'),
+                arg1 = m.group('arg1'),
+                arg2 = m.group('arg2'),
+                suffix = m.group('suffix'),
+        )
+
+class SocketInstrument:
+    "Raw TCP socket (SCPI-RAW) instrument interface client"
+    def __init__(self, host, port = 5025, timeout = 10, rcvbuf = 1 << 22, bufsize = 1 << 16):
+
+        if host.upper().startswith("TCPIP") and '::' in host:
+            res = parse_visa_resource_string(host)
+
+            if res is None:
+                raise IOError("Invalid resource string")
+
+            host = res['arg1']
+            port = int(res['arg2'])
+
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.term_char = '\n'
+
+        self.socket = socket.create_connection((host, port), timeout)
+        # send small messages immediately
+        self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+        except socket.error:
+            pass
+
+        # receive buffer
+        self._rx = bytearray(bufsize)
+        self._rxview = memoryview(self._rx)
+        # received data not yet returned
+        self._buf = bytearray()
+        # bytes left in the current message: None at the start of a message,
+        # the remaining length of a definite length block, or -1 when the
+        # message ends with the termination character
+        self._remaining = None
+        # drop a block terminator left over from a partially read message
+        self._skip_term = False
+
+    def _recv(self):
+        n = self.socket.recv_into(self._rxview)
+        if n == 0:
+            raise IOError(errno.ECONNRESET, "Connection closed")
+        self._buf += self._rxview[0:n]
+
+    def _fill(self, n):
+        while len(self._buf) < n:
+            self._recv()
+
+    def _take(self, n):
+        data = bytes(self._buf[0:n])
+        del self._buf[0:n]
+        return data
+
+    def _begin_message(self):
+        term_char = str(self.term_char).encode('utf-8')[0:1]
+
+        self._fill(1)
+        if self._skip_term:
+            self._skip_term = False
+            if self._buf[0:1] == term_char:
+                del self._buf[0:1]
+                self._fill(1)
+
+        self._remaining = -1
+
+        if self._buf[0:1] == b'#':
+            # IEEE block, can contain the termination character,
+            # so determine the length from the header
+            self._fill(2)
+            if self._buf[1:2].isdigit():
+                l = int(self._buf[1:2])
+                if l > 0:
+                    self._fill(2+l)
+                    self._remaining = 2 + l + int(self._buf[2:2+l])
+
+    def _read_block(self, num):
+        "Read from a definite length block into a preallocated buffer"
+        k = self._remaining if num < 0 else min(num, self._remaining)
+        if k <= len(self._buf):
+            data = self._take(k)
+        else:
+            data = bytearray(k)
+            view = memoryview(data)
+            got = len(self._buf)
+            view[0:got] = self._buf
+            del self._buf[:]
+            while got < k:
+                n = self.socket.recv_into(view[got:])
+                if n == 0:
+                    raise IOError(errno.ECONNRESET, "Connection closed")
+                got += n
+            data = bytes(data)
+        self._remaining -= k
+
+        if self._remaining == 0:
+            if num < 0 or len(data) < num:
+                # include the message terminator if it has already arrived,
+                # otherwise drop it at the start of the next message rather
+                # than waiting for it here
+                term_char = str(self.term_char).encode('utf-8')[0:1]
+                if self._buf[0:1] == term_char:
+                    data += self._take(1)
+                elif not self._buf:
+                    self._skip_term = True
+                self._remaining = None
+
+        return data
+
+    def write_raw(self, data):
+        "Write binary data to instrument"
+        if self._remaining == 0:
+            self._skip_term = True
+        self._remaining = None
+
+        term_char = str(self.term_char).encode('utf-8')[0:1]
+        if not data.endswith(term_char):
+            data += term_char
+
+        self.socket.sendall(data)
+
+    def read_raw(self, num=-1):
+        "Read binary data from instrument"
+        if self._remaining is None:
+            self._begin_message()
+
+        if self._remaining >= 0:
+            return self._read_block(num)
+
+        term_char = str(self.term_char).encode('utf-8')[0:1]
+        start = 0
+        while True:
+            i = self._buf.find(term_char, start)
+            if i >= 0:
+                n = i + 1
+                if num < 0 or n <= num:
+                    self._remaining = None
+                else:
+                    n = num
+                break
+            if num >= 0 and len(self._buf) >= num:
+                n = num
+                break
+            start = len(self._buf)
+            self._recv()
+
+        return self._take(n)
+
+    def ask_raw(self, data, num=-1):
+        "Write then read binary data"
+        self.write_raw(data)
+        return self.read_raw(num)
+
+    def write(self, message, encoding = 'utf-8'):
+        "Write string to instrument"
+        if type(message) is tuple or type(message) is list:
+            # recursive call for a list of commands
+            for message_i in message:
+                self.write(message_i, encoding)
+            return
+
+        self.write_raw(str(message).encode(encoding))
+
+    def read(self, num=-1, encoding = 'utf-8'):
+        "Read string from instrument"
+        return self.read_raw(num).decode(encoding).rstrip('\r\n')
+
+    def ask(self, message, num=-1, encoding = 'utf-8'):
+        "Write then read string"
+        if type(message) is tuple or type(message) is list:
+            # recursive call for a list of commands
+            val = list()
+            for message_i in message:
+                val.append(self.ask(message_i, num, encoding))
+            return val
+
+        self.write(message, encoding)
+        return self.read(num, encoding)
+
+    def read_stb(self):
+        "Read status byte"
+        raise NotImplementedError()
+
+    def trigger(self):
+        "Send trigger command"
+        raise NotImplementedError()
+
+    def clear(self):
+        "Send clear command"
+        # discard unread data; the device clear itself needs a control
+        # connection, so callers fall back on *CLS
+        del self._buf[:]
+        self._remaining = None
+        self._skip_term = False
+        raise NotImplementedError()
+
+    def remote(self):
+        "Send remote command"
+        raise NotImplementedError()
+
+    def local(self):
+        "Send local command"
+        raise NotImplementedError()
+
+    def lock(self):
+        "Send lock command"
+        raise NotImplementedError()
+
+    def unlock(self):
+        "Send unlock command"
+        raise NotImplementedError()
+
+    def close(self):
+        "Close connection"
+        self.socket.close()
@@ -0,0 +1,181 @@
+"""
+
+Python Interchangeable Virtual Instrument Library
+
+Copyright (c) 2014-2016 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+import socket
+import struct
+import threading
+import unittest
+
+import ivi
+from .. import hislip
+
+class HislipServer(threading.Thread):
+    "HiSLIP server stub answering from a dict of responses"
+    def __init__(self, responses, overlap=True, max_message_size=1000):
+        super(HislipServer, self).__init__()
+        self.daemon = True
+        self.responses = responses
+        self.overlap = overlap
+        self.max_message_size = max_message_size
+        self.received = list()
+        self.message_ids = list()
+        self.triggers = 0
+        self.stb = 0x42
+        self.lock = threading.Lock()
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.bind(('127.0.0.1', 0))
+        self.server.listen(2)
+        self.port = self.server.getsockname()[1]
+
+    def recv(self, conn):
+        header = b''
+        while len(header) < hislip.HEADER.size:
+            d = conn.recv(hislip.HEADER.size - len(header))
+            if not d:
+                return None
+            header += d
+        prologue, msg_type, control, param, length = hislip.HEADER.unpack(header)
+        payload = b''
+        while len(payload) < length:
+            payload += conn.recv(length - len(payload))
+        return msg_type, control, param, payload
+
+    def service_request(self):
+        self.stb |= 0x20
+        self.send(self.async_conn, hislip.ASYNC_SERVICE_REQUEST, self.stb, 0)
+
+    def send(self, conn, msg_type, control, param, payload=b''):
+        with self.lock:
+            conn.sendall(hislip.HEADER.pack(b'HS', msg_type, control, param, len(payload)) + payload)
+
+    def run(self):
+        sync_conn, addr = self.server.accept()
+        msg_type, control, param, payload = self.recv(sync_conn)
+        self.sub_address = payload
+        self.send(sync_conn, hislip.INITIALIZE_RESPONSE, int(self.overlap), (0x0100 << 16) | 7)
+        async_conn, addr = self.server.accept()
+        msg_type, control, param, payload = self.recv(async_conn)
+        self.session_id = param
+        self.send(async_conn, hislip.ASYNC_INITIALIZE_RESPONSE, 0, 0x5854)
+        self.async_conn = async_conn
+        t = threading.Thread(target=self.run_async, args=(async_conn,))
+        t.daemon = True
+        t.start()
+
+        data = b''
+        while True:
+            msg = self.recv(sync_conn)
+            if msg is None:
+                break
+            msg_type, control, param, payload = msg
+            if msg_type == hislip.TRIGGER:
+                self.triggers += 1
+            elif msg_type == hislip.DEVICE_CLEAR_COMPLETE:
+                data = b''
+                self.send(sync_conn, hislip.DEVICE_CLEAR_ACKNOWLEDGE, control, 0)
+            elif msg_type in (hislip.DATA, hislip.DATA_END):
+                data += payload
+                if msg_type == hislip.DATA_END:
+                    self.received.append(data)
+                    self.message_ids.append(param)
+                    resp = self.responses.get(data)
+                    if data.endswith(b'*OPC'):
+                        # operation completes later, request service
+                        threading.Timer(0.05, self.service_request).start()
+                    elif data == b'*ESR?':
+                        self.stb &= ~0x20
+                        resp = b'1\n'
+                    data = b''
+                    if resp is not None:
+                        # send in small pieces to exercise reassembly
+                        for i in range(0, len(resp), 700):
+                            self.send(sync_conn, hislip.DATA if i + 700 < len(resp) else hislip.DATA_END,
+                                0, param, resp[i:i+700])
+        sync_conn.close()
+
+    def run_async(self, conn):
+        while True:
+            msg = self.recv(conn)
+            if msg is None:
+                break
+            msg_type, control, param, payload = msg
+            if msg_type == hislip.ASYNC_MAXIMUM_MESSAGE_SIZE:
+                self.send(conn, hislip.ASYNC_MAXIMUM_MESSAGE_SIZE_RESPONSE, 0, 0,
+                    struct.pack('>Q', self.max_message_size))
+            elif msg_type == hislip.ASYNC_STATUS_QUERY:
+                self.send(conn, hislip.ASYNC_STATUS_RESPONSE, self.stb, 0)
+            elif msg_type == hislip.ASYNC_DEVICE_CLEAR:
+                self.send(conn, hislip.ASYNC_DEVICE_CLEAR_ACKNOWLEDGE, int(self.overlap), 0)
+            elif msg_type == hislip.ASYNC_REMOTE_LOCAL_CONTROL:
+                self.send(conn, hislip.ASYNC_REMOTE_LOCAL_RESPONSE, 0, 0)
+            elif msg_type == hislip.ASYNC_LOCK:
+                self.send(conn, hislip.ASYNC_LOCK_RESPONSE, 1, 0)
+        conn.close()
+
+
+class TestHislipInstrument(unittest.TestCase):
+
+    def test_hislip(self):
+        payload = bytes(bytearray(range(256)) * 20)
+        long_cmd = b':DATA ' + ivi.build_ieee_block(payload)
+        server = HislipServer({
+            b'*IDN?': b'TEST,HISLIP,0,1.0\n',
+            b':DATA?': ivi.build_ieee_block(payload) + b'\n',
+            b':A?': b'1\n',
+            b':B?': b'2\n',
+            })
+        server.start()
+        drv = ivi.Driver("TCPIP0::127.0.0.1::hislip0,%d::INSTR" % server.port)
+        inst = drv._interface
+        self.assertTrue(isinstance(inst, hislip.HislipInstrument))
+        self.assertTrue(inst.overlap)
+        self.assertEqual(inst.server_max_message_size, 1000)
+        self.assertEqual(drv._ask("*IDN?"), 'TEST,HISLIP,0,1.0')
+        self.assertEqual(bytes(drv._ask_for_ieee_block(":DATA?", chunk_size=1000)), payload)
+        # large message split into several data messages
+        drv._write_raw(long_cmd)
+        # overlapped pipelining
+        self.assertEqual(inst.ask([':A?', ':B?', '*IDN?']), ['1', '2', 'TEST,HISLIP,0,1.0'])
+        self.assertEqual(drv._read_stb(), 0x42)
+        drv._trigger()
+        drv._clear()
+        self.assertEqual(inst.message_id, hislip.FIRST_MESSAGE_ID)
+        self.assertEqual(drv._ask("*IDN?"), 'TEST,HISLIP,0,1.0')
+        inst.remote()
+        inst.lock()
+        inst.unlock()
+        inst.local()
+        drv.close()
+        server.join(5)
+        self.assertEqual(server.sub_address, b'hislip0')
+        self.assertEqual(server.received, [b'*IDN?', b':DATA?', long_cmd, b':A?', b':B?', b'*IDN?', b'*IDN?'])
+        self.assertEqual(server.message_ids[0], hislip.FIRST_MESSAGE_ID)
+        self.assertEqual(server.message_ids[-1], hislip.FIRST_MESSAGE_ID)
+        self.assertEqual(server.triggers, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+"""
+
+Python Interchangeable Virtual Instrument Library
+
+Copyright (c) 2014-2016 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+import os
+import threading
+import time
+import unittest
+
+import ivi
+
+class LegacySerial(object):
+    "pyserial 2.x interface to a port"
+    def __init__(self, port):
+        self.port = port
+
+    def inWaiting(self):
+        return self.port.in_waiting
+
+    def flushInput(self):
+        self.port.reset_input_buffer()
+
+    def read(self, size=1):
+        return self.port.read(size)
+
+    def write(self, data):
+        return self.port.write(data)
+
+
+class TestSerialInstrument(unittest.TestCase):
+
+    @unittest.skipIf(not hasattr(ivi, 'pyserial') or not hasattr(os, 'openpty'), "requires pyserial and a pty")
+    def test_serial(self):
+        master, slave = os.openpty()
+        received = list()
+
+        def respond():
+            data = b''
+            while len(received) < 7:
+                data += os.read(master, 4096)
+                while b'\n' in data:
+                    cmd, data = data.split(b'\n', 1)
+                    received.append(cmd)
+                    # two responses in one write, and one split across writes
+                    if cmd == b':B?':
+                        os.write(master, b'1\n2\n')
+                    elif cmd == b'*IDN?':
+                        os.write(master, b'TEST,')
+                        os.write(master, b'SERIAL\n')
+                    elif cmd == b':LONG?':
+                        os.write(master, b'x' * 2000 + b'\n')
+                    elif cmd == b':SHORT?':
+                        os.write(master, b'1\n')
+
+        t = threading.Thread(target=respond)
+        t.daemon = True
+        t.start()
+
+        inst = ivi.pyserial.SerialInstrument(os.ttyname(slave), timeout=5)
+        self.assertEqual(inst.ask('*IDN?'), 'TEST,SERIAL')
+        self.assertEqual(inst.ask([':A?', ':B?', '*IDN?']), ['1', '2', 'TEST,SERIAL'])
+        self.assertEqual(inst.ask('*IDN?', num=4), 'TEST')
+        self.assertEqual(inst.read(), ',SERIAL')
+        # a short reply after a long one returns as soon as it arrives
+        self.assertEqual(len(inst.ask(':LONG?')), 2000)
+        t0 = time.time()
+        self.assertEqual(inst.ask(':SHORT?'), '1')
+        self.assertTrue(time.time() - t0 < 0.5)
+        t.join(5)
+        inst.serial.close()
+        os.close(slave)
+        os.close(master)
+        self.assertEqual(received, [b'*IDN?', b':A?', b':B?', b'*IDN?', b'*IDN?', b':LONG?', b':SHORT?'])
+
+    @unittest.skipIf(not hasattr(ivi, 'pyserial') or not hasattr(os, 'openpty'), "requires pyserial and a pty")
+    def test_serial_legacy(self):
+        master, slave = os.openpty()
+        received = list()
+
+        def respond():
+            data = b''
+            while len(received) < 3:
+                data += os.read(master, 4096)
+                while b'\n' in data:
+                    cmd, data = data.split(b'\n', 1)
+                    received.append(cmd)
+                    if cmd == b'*IDN?':
+                        os.write(master, b'TEST,SERIAL\n')
+
+        t = threading.Thread(target=respond)
+        t.daemon = True
+        t.start()
+
+        inst = ivi.pyserial.SerialInstrument(os.ttyname(slave), timeout=5)
+        port = inst.serial
+        inst.serial = LegacySerial(port)
+        self.assertEqual(inst.ask('*IDN?'), 'TEST,SERIAL')
+        # stale data is discarded by clear
+        os.write(master, b'stale\n')
+        while port.in_waiting == 0:
+            time.sleep(0.01)
+        inst.clear()
+        self.assertEqual(inst.ask('*IDN?'), 'TEST,SERIAL')
+        t.join(5)
+        port.close()
+        os.close(slave)
+        os.close(master)
+        self.assertEqual(received, [b'*IDN?', b'*CLS', b'*IDN?'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+
+Python Interchangeable Virtual Instrument Library
+
+Copyright (c) 2014-2016 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+import socket
+import threading
+import time
+import unittest
+
+import ivi
+
+class SocketServer(threading.Thread):
+    "Raw SCPI socket server answering from a dict of responses"
+    def __init__(self, responses):
+        super(SocketServer, self).__init__()
+        self.daemon = True
+        self.responses = responses
+        self.received = list()
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.bind(('127.0.0.1', 0))
+        self.server.listen(1)
+        self.port = self.server.getsockname()[1]
+
+    def run(self):
+        conn, addr = self.server.accept()
+        data = b''
+        while True:
+            d = conn.recv(4096)
+            if not d:
+                break
+            data += d
+            while b'\n' in data:
+                cmd, data = data.split(b'\n', 1)
+                self.received.append(cmd)
+                if cmd in self.responses:
+                    resp = self.responses[cmd]
+                    # send in small pieces to exercise reassembly
+                    for i in range(0, len(resp), 700):
+                        conn.sendall(resp[i:i+700])
+        conn.close()
+
+
+class TestSocketInstrument(unittest.TestCase):
+
+    def test_socket(self):
+        payload = bytes(bytearray(range(256)) * 20)
+        server = SocketServer({
+            b'*IDN?': b'TEST,SOCKET,0,1.0\n',
+            b':DATA?': ivi.build_ieee_block(payload) + b'\n',
+            b':SHORT?': b'#15a\nb\nc\n',
+            b':NOTERM?': b'#13abc',
+            # terminator of the previous block arriving late
+            b':LATE?': b'\nOK\n',
+            })
+        server.start()
+        drv = ivi.Driver("TCPIP0::127.0.0.1::%d::SOCKET" % server.port)
+        self.assertEqual(drv._ask("*IDN?"), 'TEST,SOCKET,0,1.0')
+        self.assertEqual(bytes(drv._ask_for_ieee_block(":DATA?", chunk_size=1000)), payload)
+        self.assertEqual(bytes(drv._ask_for_ieee_block(":SHORT?")), b'a\nb\nc')
+        self.assertEqual(drv._ask("*IDN?"), 'TEST,SOCKET,0,1.0')
+        # a block without terminator does not wait for one
+        t = time.time()
+        self.assertEqual(bytes(drv._ask_for_ieee_block(":NOTERM?")), b'abc')
+        self.assertTrue(time.time() - t < 1)
+        self.assertEqual(drv._ask(":LATE?"), 'OK')
+        drv.close()
+        server.join(5)
+        self.assertEqual(server.received, [b'*IDN?', b':DATA?', b':SHORT?', b'*IDN?', b':NOTERM?', b':LATE?'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -25,11 +25,21 @@ THE SOFTWARE.
 """
 
 # import libraries
-import inspect
 import numpy as np
 import re
+import sys
+import threading
+import time
+import warnings
+from contextlib import contextmanager
 from functools import partial
 
+try:
+    from time import monotonic as _monotonic
+except ImportError:
+    # Python 2
+    _monotonic = time.time
+
 # try importing drivers
 # python-vxi11 for LAN instruments
 try:
@@ -62,6 +72,18 @@ try:
 except ImportError:
     pass
 
+# raw TCP socket support
+try:
+    from .interface import tcpsocket
+except ImportError:
+    pass
+
+# HiSLIP support
+try:
+    from .interface import hislip
+except ImportError:
+    pass
+
 # set to True to try loading PyVISA first before
 # other interface libraries
 _prefer_pyvisa = False
@@ -137,81 +159,136 @@ def get_index_dict(l):
     return d
 
 
+# cache tag registry
+# maps getter/setter code objects and explicit tag strings to
+# normalized cache tags so that cache lookups do not need to
+# inspect the call stack
+_cache_tags = dict()
+
+def normalize_cache_tag(tag):
+    "Strip _get/_set and leading underscore from a cache tag"
+    if tag[0:4] == "_get": tag = tag[4:]
+    if tag[0:4] == "_set": tag = tag[4:]
+    if tag[0:1] == "_": tag = tag[1:]
+    return tag
+
+
+def register_cache_tag(f):
+    "Resolve and register the cache tag of a getter or setter"
+    f = getattr(f, '__func__', f)
+    while isinstance(f, partial):
+        f = f.func
+        f = getattr(f, '__func__', f)
+    code = getattr(f, '__code__', None)
+    if code is None:
+        return None
+    try:
+        return _cache_tags[code]
+    except KeyError:
+        tag = normalize_cache_tag(code.co_name)
+        _cache_tags[code] = tag
+        return tag
+
+
+def get_cache_tag(tag):
+    "Look up normalized cache tag for a code object or tag string"
+    try:
+        return _cache_tags[tag]
+    except KeyError:
+        if type(tag) is str:
+            t = normalize_cache_tag(tag)
+        else:
+            t = normalize_cache_tag(tag.co_name)
+        _cache_tags[tag] = t
+        return t
+
+
 class PropertyCollection(object):
-    "A building block to create hierarchical trees of methods and properties"
+    """
+    A building block to create hierarchical trees of methods and properties
+
+    Managed properties are kept in the _props dict and are not stored in the
+    instance __dict__, so ordinary attribute lookups take the normal (fast)
+    path and only names that are not found fall through to __getattr__, which
+    dispatches to the property getter.
+    """
     def __init__(self):
-        d = object.__getattribute__(self, '__dict__')
-        d.setdefault('_props', dict())
-        d.setdefault('_docs', dict())
-        d.setdefault('_locked', False)
+        d = self.__dict__
+        if '_props' not in d:
+            d['_props'] = dict()
+        if '_docs' not in d:
+            d['_docs'] = dict()
+        if '_locked' not in d:
+            d['_locked'] = False
     
     def _add_property(self, name, fget=None, fset=None, fdel=None, doc=None):
         "Add a managed property"
-        d = object.__getattribute__(self, '__dict__')
+        d = self.__dict__
         d['_props'][name] = (fget, fset, fdel)
         d['_docs'][name] = doc
-        d[name] = None
+        d.pop(name, None)
     
     def _add_method(self, name, f=None, doc=None):
         "Add a managed method"
-        d = object.__getattribute__(self, '__dict__')
+        d = self.__dict__
         d['_docs'][name] = doc
         d[name] = f
     
     def _del_property(self, name):
         "Remove managed property or method"
-        d = object.__getattribute__(self, '__dict__')
-        del d['_props'][name]
+        d = self.__dict__
+        d['_props'].pop(name, None)
         del d['_docs'][name]
-        del d[name]
+        d.pop(name, None)
     
     def _lock(self, lock=True):
         "Set lock state to prevent creation or deletion of unmanaged members"
-        d = object.__getattribute__(self, '__dict__')
-        d['_locked'] = lock
+        self.__dict__['_locked'] = lock
     
     def _unlock(self):
         "Unlock object to allow creation or deletion of unmanaged members, equivalent to _lock(False)"
         self._lock(False)
         
-    def __getattribute__(self, name):
-        if name == '__dict__':
-            return object.__getattribute__(self, name)
-        d = object.__getattribute__(self, '__dict__')
-        d.setdefault('_props', dict())
-        d.setdefault('_locked', False)
-        if name in d['_props']:
-            f = d['_props'][name][0]
-            if f is None:
-                raise AttributeError("unreadable attribute")
-            return f()
-        return object.__getattribute__(self, name)
+    def __getattr__(self, name):
+        # only called when normal lookup fails
+        d = self.__dict__
+        try:
+            p = d['_props'][name]
+        except KeyError:
+            if name == '_props':
+                p = d['_props'] = dict()
+                return p
+            if name == '_locked':
+                return False
+            raise AttributeError("'%s' object has no attribute '%s'" % (type(self).__name__, name))
+        f = p[0]
+        if f is None:
+            raise AttributeError("unreadable attribute")
+        return f()
         
     def __setattr__(self, name, value):
-        d = object.__getattribute__(self, '__dict__')
-        d.setdefault('_props', dict())
-        d.setdefault('_locked', False)
-        if name in d['_props']:
-            f = d['_props'][name][1]
+        d = self.__dict__
+        props = d.get('_props')
+        if props is not None and name in props:
+            f = props[name][1]
             if f is None:
                 raise AttributeError("can't set attribute")
             f(value)
             return
-        if name not in d and self._locked:
+        if name not in d and d.get('_locked', False):
             raise AttributeError("locked")
         object.__setattr__(self, name, value)
         
     def __delattr__(self, name):
-        d = object.__getattribute__(self, '__dict__')
-        d.setdefault('_props', dict())
-        d.setdefault('_locked', False)
-        if name in d['_props']:
-            f = d['_props'][name][2]
+        d = self.__dict__
+        props = d.get('_props')
+        if props is not None and name in props:
+            f = props[name][2]
             if f is None:
                 raise AttributeError("can't delete attribute")
             f()
             return
-        if name not in d and self._locked:
+        if name not in d and d.get('_locked', False):
             raise AttributeError("locked")
         object.__delattr__(self, name)
         
@@ -224,11 +301,13 @@ class IndexedPropertyCollection(object):
         self._indicies = list()
         self._indicies_dict = dict()
         self._objs = list()
+        self._template = None
     
     def _add_property(self, name, fget=None, fset=None, fdel=None, doc=None, props = None, docs = None):
         "Add a managed property"
         if props is None:
             props = self._props
+            self._invalidate()
         if docs is None:
             docs = self._docs
         l = name.split('.',1)
@@ -250,6 +329,7 @@ class IndexedPropertyCollection(object):
         "Add a managed method"
         if props is None:
             props = self._props
+            self._invalidate()
         if docs is None:
             docs = self._docs
         l = name.split('.',1)
@@ -275,8 +355,14 @@ class IndexedPropertyCollection(object):
         "Add a sub-method (equivalent to _add_method('sub.name', ...))"
         self._add_method(sub+'.'+name, f, doc)
     
+    def _add_collection_method(self, name, f, doc=None):
+        "Add a method that operates on the whole collection instead of a single index"
+        self.__dict__[name] = f
+        self._docs[name] = doc
+    
     def _del_property(self, name):
         "Delete property"
+        self._invalidate()
         l = name.split('.',1)
         n = l[0]
         r = ''
@@ -287,43 +373,71 @@ class IndexedPropertyCollection(object):
             del self._props[name]
             del self._docs[name]
     
-    def _build_obj(self, props, docs, i):
-        "Build a tree of PropertyCollection objects with the proper index associations"
-        obj = PropertyCollection()
+    def _invalidate(self):
+        "Discard compiled template and built objects after a change to the tree"
+        self._template = None
+        if any(o is not None for o in self._objs):
+            self._objs = [None] * len(self._indicies)
+    
+    def _compile(self, props, docs):
+        "Compile a property tree into a template of (name, item, doc) entries"
+        template = list()
         for n in props:
             itm = props[n]
             doc = docs[n]
             if type(itm) == tuple:
-                fget, fset, fdel = itm
-                fgeti = fseti = fdeli = None
-                if fget is not None: fgeti = partial(fget, i)
-                if fset is not None: fseti = partial(fset, i)
-                if fdel is not None: fdeli = partial(fdel, i)
-                obj._add_property(n, fgeti, fseti, fdeli, doc)
+                template.append((n, itm, doc))
             elif type(itm) == dict:
-                o2 = self._build_obj(itm, doc, i)
-                obj.__dict__[n] = o2
+                template.append((n, self._compile(itm, doc), None))
             elif hasattr(itm, "__call__"):
-                obj._add_method(n, partial(itm, i), doc)
-        obj._lock()
+                template.append((n, itm, doc))
+        return template
+    
+    def _build_obj(self, template, i):
+        "Build a tree of PropertyCollection objects with the proper index associations"
+        obj = PropertyCollection()
+        d = obj.__dict__
+        p = d['_props']
+        dc = d['_docs']
+        for n, itm, doc in template:
+            if type(itm) is tuple:
+                fget, fset, fdel = itm
+                p[n] = (None if fget is None else partial(fget, i),
+                        None if fset is None else partial(fset, i),
+                        None if fdel is None else partial(fdel, i))
+                dc[n] = doc
+            elif type(itm) is list:
+                d[n] = self._build_obj(itm, i)
+            else:
+                dc[n] = doc
+                d[n] = partial(itm, i)
+        d['_locked'] = True
+        return obj
+    
+    def _get_obj(self, i):
+        "Get object for index i, building it on first access"
+        obj = self._objs[i]
+        if obj is None:
+            if self._template is None:
+                self._template = self._compile(self._props, self._docs)
+            obj = self._build_obj(self._template, i)
+            self._objs[i] = obj
         return obj
     
     def _set_list(self, l):
         "Set a list of allowable indicies as an associative array"
         self._indicies = list(l)
         self._indicies_dict = get_index_dict(self._indicies)
-        self._objs = list()
-        for i in range(len(self._indicies)):
-            self._objs.append(self._build_obj(self._props, self._docs, i))
+        self._objs = [None] * len(self._indicies)
     
     def __getitem__(self, key):
         if type(key) is slice:
-            return self._objs[key]
+            return [self._get_obj(i) for i in range(len(self._indicies))[key]]
         i = get_index(self._indicies_dict, key)
-        return self._objs[i]
+        return self._get_obj(i)
 
     def __iter__(self):
-        return self._objs.__iter__()
+        return (self._get_obj(i) for i in range(len(self._indicies)))
     
     def __len__(self):
         return len(self._indicies)
@@ -332,6 +446,46 @@ class IndexedPropertyCollection(object):
         return len(self._indicies)
 
 
+# attribute name parse cache
+# maps dotted attribute names to the path of collections and the leaf name
+_attribute_paths = dict()
+
+def parse_attribute_name(name):
+    "Split a dotted attribute name into a path of (name, collection class) and a leaf name"
+    try:
+        return _attribute_paths[name]
+    except KeyError:
+        pass
+
+    path = list()
+
+    # iterate over name
+    rest = name
+    while len(rest) > 0:
+        # split at first dot
+        l = rest.split('.',1)
+        base = l[0]
+        rest = ''
+
+        # save the rest
+        if len(l) > 1:
+            rest = l[1]
+
+            # is it an indexed object?
+            k = base.find('[')
+            if k > 0:
+                # if so, stop here and add an indexed property collection
+                path.append((base[:k], IndexedPropertyCollection))
+                base = rest
+                rest = ''
+            else:
+                # if not, add a property collection and keep going
+                path.append((base, PropertyCollection))
+
+    _attribute_paths[name] = (tuple(path), base)
+    return _attribute_paths[name]
+
+
 class IviContainer(PropertyCollection):
     def __init__(self, *args, **kwargs):
         super(IviContainer, self).__init__(*args, **kwargs)
@@ -339,41 +493,34 @@ class IviContainer(PropertyCollection):
     def _add_attribute(self, name, attr, doc = None):
         cur_obj = self
 
-        # iterate over name
-        rest = name
-        while len(rest) > 0:
-            # split at first dot
-            l = rest.split('.',1)
-            base = l[0]
-            rest = ''
-
-            # save the rest
-            if len(l) > 1:
-                rest = l[1]
-
-                # is it an indexed object?
-                k = base.find('[')
-                if k > 0:
-                    # if so, stop here and add an indexed property collection
-                    base = base[:k]
-                    cur_obj.__dict__.setdefault(base, IndexedPropertyCollection())
-                    cur_obj = cur_obj.__dict__[base]
-                    base = rest
-                    rest = ''
-                else:
-                    # if not, add a property collection and keep going
-                    cur_obj.__dict__.setdefault(base, PropertyCollection())
-                    cur_obj = cur_obj.__dict__[base]
+        # walk the (cached) path, creating collections as needed
+        path, base = parse_attribute_name(name)
+        for n, cls in path:
+            d = cur_obj.__dict__
+            o = d.get(n)
+            if o is None:
+                o = cls()
+                d[n] = o
+            cur_obj = o
 
         if type(doc) == Doc:
             doc.name = name
 
-        if cur_obj == self:
+        if type(attr) == tuple:
+            # resolve cache tags once at registration time
+            for f in attr[0:2]:
+                if f is not None:
+                    register_cache_tag(f)
+
+        if cur_obj is self:
             if type(attr) == tuple:
                 fget, fset, fdel = attr
                 PropertyCollection._add_property(self, base, fget, fset, fdel, doc)
             else:
                 PropertyCollection._add_method(self, base, attr, doc)
+        elif type(cur_obj) is IndexedPropertyCollection and path[-1][1] is PropertyCollection and type(attr) != tuple:
+            # 'name.method' (no brackets) on an indexed collection
+            cur_obj._add_collection_method(base, attr, doc)
         else:
             if type(attr) == tuple:
                 fget, fset, fdel = attr
@@ -413,7 +560,12 @@ class Doc(object):
 
 class TraceY(object):
     "Y trace object"
+    _y_fields = frozenset(['y_raw', 'y_increment', 'y_origin', 'y_reference', 'y_hole'])
+    _x_fields = frozenset()
+
     def __init__(self):
+        self._y_cache = dict()
+        self._x_cache = dict()
         self.average_count = 1
         self.y_increment = 0
         self.y_origin = 0
@@ -421,54 +573,124 @@ class TraceY(object):
         self.y_raw = None
         self.y_hole = None
 
-    @property
-    def y(self):
-        y = np.array(self.y_raw)
-        yf = y.astype(float)
+    def __setattr__(self, name, value):
+        if name == 'y_raw' and value is not None:
+            # keep a numpy view of the raw buffer (no copy for arrays
+            # and objects that support the buffer protocol)
+            value = np.asarray(value)
+        object.__setattr__(self, name, value)
+        if name in self._y_fields:
+            self._y_cache.clear()
+            if name == 'y_raw':
+                self._x_cache.clear()
+        elif name in self._x_fields:
+            self._x_cache.clear()
+
+    def _get_raw(self):
+        if self.y_raw is None:
+            return np.empty(0)
+        return self.y_raw
+
+    def get_y(self, dtype=float, out=None):
+        """
+        Return scaled Y values
+
+        dtype sets the output data type (e.g. numpy.float32).  If out is
+        specified, the values are computed in place into out instead of a new
+        array.  Results are cached until the raw data or scaling changes; the
+        cached array is read-only.
+        """
+        dtype = np.dtype(dtype)
+        if out is None:
+            try:
+                return self._y_cache[dtype]
+            except KeyError:
+                pass
+        y = self._get_raw()
+        if out is None:
+            yf = np.empty(y.shape, dtype)
+        else:
+            yf = out
+        np.subtract(y, self.y_reference, out=yf, dtype=yf.dtype, casting='unsafe')
+        yf *= self.y_increment
+        yf += self.y_origin
         if self.y_hole is not None:
             yf[y == self.y_hole] = float('nan')
-        return ((yf - self.y_reference) * self.y_increment) + self.y_origin
+        if out is None:
+            yf.flags.writeable = False
+            self._y_cache[dtype] = yf
+        return yf
+
+    @property
+    def y(self):
+        try:
+            return self._y_cache[np.dtype(float)]
+        except KeyError:
+            return self.get_y()
 
     def __getitem__(self, index):
-        y = self.y_raw[index]
-        if y == self.y_hole:
-            y = float('nan')
-        return ((y - self.y_reference) * self.y_increment) + self.y_origin
+        return self.y[index]
 
     def __iter__(self):
-        return (float('nan') if y == self.y_hole else ((y - self.y_reference) * self.y_increment + self.y_origin) for i, y in enumerate(self.y_raw))
+        return iter(self.y)
 
     def __len__(self):
-        return len(self.y_raw)
+        return len(self._get_raw())
 
     def count(self):
-        return len(self.y_raw)
+        return len(self._get_raw())
 
 
 class TraceYT(TraceY):
     "Y-T trace object"
+    _x_fields = frozenset(['x_increment', 'x_origin', 'x_reference'])
+
     def __init__(self):
         super(TraceYT, self).__init__()
         self.x_increment = 0
         self.x_origin = 0
         self.x_reference = 0
 
+    def get_x(self, dtype=float, out=None):
+        """
+        Return X (time) values
+
+        dtype and out behave as in get_y.
+        """
+        dtype = np.dtype(dtype)
+        if out is None:
+            try:
+                return self._x_cache[dtype]
+            except KeyError:
+                pass
+            x = np.arange(len(self), dtype=dtype)
+        else:
+            x = out
+            x[...] = np.arange(len(x))
+        x -= self.x_reference
+        x *= self.x_increment
+        x += self.x_origin
+        if out is None:
+            x.flags.writeable = False
+            self._x_cache[dtype] = x
+        return x
+
     @property
     def x(self):
-        return ((np.arange(len(self.y_raw)) - self.x_reference) * self.x_increment) + self.x_origin
+        try:
+            return self._x_cache[np.dtype(float)]
+        except KeyError:
+            return self.get_x()
 
     @property
     def t(self):
         return self.x
 
     def __getitem__(self, index):
-        y = self.y_raw[index]
-        if y == self.y_hole:
-            y = float('nan')
-        return (((index - self.x_reference) * self.x_increment) + self.x_origin, ((y - self.y_reference) * self.y_increment) + self.y_origin)
+        return (self.x[index], self.y[index])
 
     def __iter__(self):
-        return ((((i - self.x_reference) * self.x_increment) + self.x_origin, float('nan') if y == self.y_hole else ((y - self.y_reference) * self.y_increment) + self.y_origin) for i, y in enumerate(self.y_raw))
+        return zip(self.x, self.y)
 
 
 def add_attribute(obj, name, attr, doc = None):
@@ -524,6 +746,73 @@ def decode_ieee_block(data):
         return data[ind:]
 
 
+# numpy 1.23 and newer parse text in C
+_loadtxt_fast = tuple(int(x) for x in np.__version__.split('.')[0:2]) >= (1, 23)
+
+def decode_values(data, delim=',', out=None, overload=None):
+    """
+    Decode delimited ASCII numeric data into a float64 array
+
+    The string is parsed in bulk; NAN and INF tokens are accepted.  If
+    overload is specified, SCPI overload readings (+/-9.9e37) are replaced
+    with overload carrying the sign of the reading and the SCPI not-a-number
+    value (9.91e37) is replaced with NaN.  If out is specified, the values are
+    stored in out and a view of the filled portion is returned.
+    """
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+    data = data.strip()
+    
+    if not data:
+        val = np.zeros(0)
+    elif _loadtxt_fast:
+        val = np.loadtxt([data], delimiter=delim if delim.strip() else None,
+                comments=None, ndmin=1)
+    else:
+        if delim.strip():
+            n = data.count(delim) + 1
+        else:
+            n = len(data.split())
+        try:
+            with warnings.catch_warnings():
+                # numpy warns when parsing stops early
+                warnings.simplefilter('ignore', DeprecationWarning)
+                val = np.fromstring(data, sep=delim)
+        except ValueError:
+            val = None
+        if val is None or len(val) != n:
+            # bulk parse stopped early, fall back on per-element conversion
+            # so that malformed data raises
+            val = np.array([float(x) for x in data.split(delim if delim.strip() else None)])
+    
+    if overload is not None:
+        a = np.abs(val)
+        nan = a == 9.91e37
+        over = (a >= 9.9e37) & ~nan
+        val[over] = np.copysign(overload, val[over])
+        val[nan] = np.nan
+    
+    if out is not None:
+        if len(out) < len(val):
+            raise OutOfRangeException()
+        out[0:len(val)] = val
+        return out[0:len(val)]
+    
+    return val
+
+
+def max_time_to_seconds(maximum_time):
+    """
+    Convert an IVI maximum time in milliseconds to seconds
+
+    None or a negative value (IVI MaxTimeInfinite is -1) means no limit and
+    is returned as None.
+    """
+    if maximum_time is None or maximum_time < 0:
+        return None
+    return maximum_time / 1000.0
+
+
 def get_sig(sig):
     "Parse various signal inputs into x and y components"
     if type(sig) == tuple and len(sig) == 2:
@@ -558,10 +847,21 @@ def rms(y):
     return np.linalg.norm(y) / np.sqrt(y.size)
 
 
+_trim_doc_cache = dict()
+
 def trim_doc(docstring):
     if not docstring:
         return ''
     docstring = str(docstring)
+    try:
+        return _trim_doc_cache[docstring]
+    except KeyError:
+        pass
+    trimmed = _trim_doc(docstring)
+    _trim_doc_cache[docstring] = trimmed
+    return trimmed
+
+def _trim_doc(docstring):
     # Convert tabs to spaces (following the normal Python rules)
     # and split into a list of lines:
     lines = docstring.expandtabs().splitlines()
@@ -753,6 +1053,132 @@ def help(obj=None, itm=None, complete=False, indent=0):
             """))
 
 
+def open_interface(resource, prefer_pyvisa=False):
+    "Open an interface to the instrument specified by a VISA resource string"
+    # parse VISA resource string
+    # valid resource strings:
+    # TCPIP::10.0.0.1::INSTR
+    # TCPIP0::10.0.0.1::INSTR
+    # TCPIP::10.0.0.1::gpib,5::INSTR
+    # TCPIP0::10.0.0.1::gpib,5::INSTR
+    # TCPIP0::10.0.0.1::usb0::INSTR
+    # TCPIP0::10.0.0.1::usb0[1234::5678::MYSERIAL::0]::INSTR
+    # TCPIP0::10.0.0.1::hislip0::INSTR
+    # TCPIP0::10.0.0.1::5025::SOCKET
+    # USB::1234::5678::INSTR
+    # USB::1234::5678::SERIAL::INSTR
+    # USB0::0x1234::0x5678::INSTR
+    # USB0::0x1234::0x5678::SERIAL::INSTR
+    # USB0::0x1234::0x5678::SERIAL::0::INSTR
+    # GPIB::10::INSTR
+    # GPIB0::10::INSTR
+    # ASRL1::INSTR
+    # ASRL::COM1,9600,8n1::INSTR
+    # ASRL::/dev/ttyUSB0,9600::INSTR
+    # ASRL::/dev/ttyUSB0,9600,8n1::INSTR
+    m = re.match(r'^(?P<prefix>(?P<type>TCPIP|USB|GPIB|ASRL)\d*)(::(?P<arg1>[^\s:]+))?(::(?P<arg2>[^\s:]+(\[.+\])?))?(::(?P<arg3>[^\s:]+))?(::(?P<arg4>[^\s:]+))?(::(?P<suffix>INSTR|SOCKET))$', resource, re.I)
+    if m is None:
+        if 'pyvisa' in globals():
+            # connect with PyVISA
+            return pyvisa.PyVisaInstrument(resource)
+        else:
+            raise IOException('Invalid resource string')
+    else:
+        res_type = m.group('type').upper()
+        res_prefix = m.group('prefix')
+        res_arg1 = m.group('arg1')
+        res_arg2 = m.group('arg2')
+        res_arg3 = m.group('arg3')
+        res_suffix = m.group('suffix').upper()
+
+        if res_type == 'TCPIP' and res_suffix == 'SOCKET':
+            # raw TCP socket connection
+            if prefer_pyvisa and 'pyvisa' in globals():
+                # connect with PyVISA
+                return pyvisa.PyVisaInstrument(resource)
+            elif 'tcpsocket' in globals():
+                # connect with raw socket
+                return tcpsocket.SocketInstrument(resource)
+            elif 'pyvisa' in globals():
+                # connect with PyVISA
+                return pyvisa.PyVisaInstrument(resource)
+            else:
+                raise IOException('Cannot use resource type %s' % res_type)
+        elif res_suffix == 'SOCKET':
+            raise IOException('Cannot use resource type %s with SOCKET' % res_type)
+        elif res_type == 'TCPIP' and res_arg2 is not None and res_arg2.lower().startswith('hislip'):
+            # HiSLIP connection
+            if prefer_pyvisa and 'pyvisa' in globals():
+                # connect with PyVISA
+                return pyvisa.PyVisaInstrument(resource)
+            elif 'hislip' in globals():
+                # connect with HiSLIP
+                return hislip.HislipInstrument(resource)
+            elif 'pyvisa' in globals():
+                # connect with PyVISA
+                return pyvisa.PyVisaInstrument(resource)
+            else:
+                raise IOException('Cannot use resource type %s' % res_type)
+        elif res_type == 'TCPIP':
+            # TCP connection
+            if prefer_pyvisa and 'pyvisa' in globals():
+                # connect with PyVISA
+                return pyvisa.PyVisaInstrument(resource)
+            elif 'vxi11' in globals():
+                # connect with VXI-11
+                return vxi11.Instrument(resource)
+            elif 'pyvisa' in globals():
+                # connect with PyVISA
+                return pyvisa.PyVisaInstrument(resource)
+            else:
+                raise IOException('Cannot use resource type %s' % res_type)
+        elif res_type == 'USB':
+            # USB connection
+            if prefer_pyvisa and 'pyvisa' in globals():
+                # connect with PyVISA
+                return pyvisa.PyVisaInstrument(resource)
+            elif 'usbtmc' in globals():
+                # connect with USBTMC
+                return usbtmc.Instrument(resource)
+            elif 'pyvisa' in globals():
+                # connect with PyVISA
+                return pyvisa.PyVisaInstrument(resource)
+            else:
+                raise IOException('Cannot use resource type %s' % res_type)
+        elif res_type == 'GPIB':
+            # GPIB connection
+            if prefer_pyvisa and 'pyvisa' in globals():
+                # connect with PyVISA
+                return pyvisa.PyVisaInstrument(resource)
+            elif 'linuxgpib' in globals():
+                # connect with linux-gpib
+                return linuxgpib.LinuxGpibInstrument(resource)
+            elif 'pyvisa' in globals():
+                # connect with PyVISA
+                return pyvisa.PyVisaInstrument(resource)
+            else:
+                raise IOException('Cannot use resource type %s' % res_type)
+        elif res_type == 'ASRL':
+            # Serial connection
+            if prefer_pyvisa and 'pyvisa' in globals():
+                # connect with PyVISA
+                return pyvisa.PyVisaInstrument(resource)
+            elif 'pyserial' in globals():
+                # connect with PySerial
+                return pyserial.SerialInstrument(resource)
+            elif 'pyvisa' in globals():
+                # connect with PyVISA
+                return pyvisa.PyVisaInstrument(resource)
+            else:
+                raise IOException('Cannot use resource type %s' % res_type)
+
+        elif 'pyvisa' in globals():
+            # connect with PyVISA
+            return pyvisa.PyVisaInstrument(resource)
+        else:
+            raise IOException('Unknown resource type %s' % res_type)
+
+
 class DriverOperation(IviContainer):
     "Inherent IVI methods for driver operation"
     
@@ -1556,14 +1982,25 @@ class Driver(DriverOperation, DriverIdentity, DriverUtility):
         # process out args for initialize
         kw = {}
         for k in ('range_check', 'query_instr_status', 'cache', 'simulate', 'record_coercions',
-                'interchange_check', 'driver_setup', 'prefer_pyvisa'):
+                'interchange_check', 'driver_setup', 'prefer_pyvisa', 'session_pool'):
             if k in kwargs:
                 kw[k] = kwargs.pop(k)
         
         self._interface = None
+        self._session_pool = None
         self._initialized = False
         self.__dict__.setdefault('_instrument_id', '')
         self._cache_valid = dict()
+        self._ieee_block_chunk_size = 1 << 20
+        # held for every instrument transaction of this driver
+        self._io_lock = threading.RLock()
+        self._batch_depth = 0
+        self._batch_buffer = list()
+        self._batch_length = 0
+        self._batch_encoding = 'utf-8'
+        self._batch_max_length = 1024
+        self._wait_poll_interval = 0.0005
+        self._wait_max_poll_interval = 0.01
         
         super(Driver, self).__init__(*args, **kwargs)
         
@@ -1780,6 +2217,10 @@ class Driver(DriverOperation, DriverIdentity, DriverUtility):
                 self._driver_operation_driver_setup = val
             elif op == 'prefer_pyvisa':
                 self._prefer_pyvisa = bool(val)
+            elif op == 'session_pool':
+                if val is True:
+                    from .session import default_pool as val
+                self._session_pool = val if val is not False else None
             else:
                 raise UnknownOptionException('Invalid option')
 
@@ -1789,99 +2230,10 @@ class Driver(DriverOperation, DriverIdentity, DriverUtility):
         elif resource is None:
             raise IOException('No resource specified!')
         elif type(resource) == str:
-            # parse VISA resource string
-            # valid resource strings:
-            # TCPIP::10.0.0.1::INSTR
-            # TCPIP0::10.0.0.1::INSTR
-            # TCPIP::10.0.0.1::gpib,5::INSTR
-            # TCPIP0::10.0.0.1::gpib,5::INSTR
-            # TCPIP0::10.0.0.1::usb0::INSTR
-            # TCPIP0::10.0.0.1::usb0[1234::5678::MYSERIAL::0]::INSTR
-            # USB::1234::5678::INSTR
-            # USB::1234::5678::SERIAL::INSTR
-            # USB0::0x1234::0x5678::INSTR
-            # USB0::0x1234::0x5678::SERIAL::INSTR
-            # USB0::0x1234::0x5678::SERIAL::0::INSTR
-            # GPIB::10::INSTR
-            # GPIB0::10::INSTR
-            # ASRL1::INSTR
-            # ASRL::COM1,9600,8n1::INSTR
-            # ASRL::/dev/ttyUSB0,9600::INSTR
-            # ASRL::/dev/ttyUSB0,9600,8n1::INSTR
-            m = re.match('^(?P<prefix>(?P<type>TCPIP|USB|GPIB|ASRL)\d*)(::(?P<arg1>[^\s:]+))?(::(?P<arg2>[^\s:]+(\[.+\])?))?(::(?P<arg3>[^\s:]+))?(::(?P<arg4>[^\s:]+))?(::(?P<suffix>INSTR))$', resource, re.I)
-            if m is None:
-                if 'pyvisa' in globals():
-                    # connect with PyVISA
-                    self._interface = pyvisa.PyVisaInstrument(resource)
-                else:
-                    raise IOException('Invalid resource string')
+            if self._session_pool is not None:
+                self._interface = self._session_pool.acquire(resource, self._prefer_pyvisa)
             else:
-                res_type = m.group('type').upper()
-                res_prefix = m.group('prefix')
-                res_arg1 = m.group('arg1')
-                res_arg2 = m.group('arg2')
-                res_arg3 = m.group('arg3')
-                res_suffix = m.group('suffix')
-
-                if res_type == 'TCPIP':
-                    # TCP connection
-                    if self._prefer_pyvisa and 'pyvisa' in globals():
-                        # connect with PyVISA
-                        self._interface = pyvisa.PyVisaInstrument(resource)
-                    elif 'vxi11' in globals():
-                        # connect with VXI-11
-                        self._interface = vxi11.Instrument(resource)
-                    elif 'pyvisa' in globals():
-                        # connect with PyVISA
-                        self._interface = pyvisa.PyVisaInstrument(resource)
-                    else:
-                        raise IOException('Cannot use resource type %s' % res_type)
-                elif res_type == 'USB':
-                    # USB connection
-                    if self._prefer_pyvisa and 'pyvisa' in globals():
-                        # connect with PyVISA
-                        self._interface = pyvisa.PyVisaInstrument(resource)
-                    elif 'usbtmc' in globals():
-                        # connect with USBTMC
-                        self._interface = usbtmc.Instrument(resource)
-                    elif 'pyvisa' in globals():
-                        # connect with PyVISA
-                        self._interface = pyvisa.PyVisaInstrument(resource)
-                    else:
-                        raise IOException('Cannot use resource type %s' % res_type)
-                elif res_type == 'GPIB':
-                    # GPIB connection
-                    if self._prefer_pyvisa and 'pyvisa' in globals():
-                        # connect with PyVISA
-                        self._interface = pyvisa.PyVisaInstrument(resource)
-                    elif 'linuxgpib' in globals():
-                        # connect with linux-gpib
-                        self._interface = linuxgpib.LinuxGpibInstrument(resource)
-                    elif 'pyvisa' in globals():
-                        # connect with PyVISA
-                        self._interface = pyvisa.PyVisaInstrument(resource)
-                    else:
-                        raise IOException('Cannot use resource type %s' % res_type)
-                elif res_type == 'ASRL':
-                    # Serial connection
-                    if self._prefer_pyvisa and 'pyvisa' in globals():
-                        # connect with PyVISA
-                        self._interface = pyvisa.PyVisaInstrument(resource)
-                    elif 'pyserial' in globals():
-                        # connect with PySerial
-                        self._interface = pyserial.SerialInstrument(resource)
-                    elif 'pyvisa' in globals():
-                        # connect with PyVISA
-                        self._interface = pyvisa.PyVisaInstrument(resource)
-                    else:
-                        raise IOException('Cannot use resource type %s' % res_type)
-
-                elif 'pyvisa' in globals():
-                    # connect with PyVISA
-                    self._interface = pyvisa.PyVisaInstrument(resource)
-                else:
-                    raise IOException('Unknown resource type %s' % res_type)
-
+                self._interface = open_interface(resource, self._prefer_pyvisa)
             self._driver_operation_io_resource_descriptor = resource
 
         elif 'vxi11' in globals() and resource.__class__ == vxi11.Instrument:
@@ -1920,34 +2272,34 @@ class Driver(DriverOperation, DriverIdentity, DriverUtility):
     
     def _get_cache_tag(self, tag=None, skip=1):
         if tag is None:
-            stack = inspect.stack()
-            start = 0 + skip
-            if len(stack) < start + 1:
+            try:
+                tag = sys._getframe(skip).f_code
+            except ValueError:
                 return ''
-            tag = stack[start][3] 
-        
-        if tag[0:4] == "_get": tag = tag[4:]
-        if tag[0:4] == "_set": tag = tag[4:]
-        if tag[0] == "_": tag = tag[1:]
-        
-        return tag
+        return get_cache_tag(tag)
 
     def _get_cache_valid(self, tag=None, index=-1, skip_disable=False):
         if not skip_disable and not self._driver_operation_cache:
             return False
-        tag = self._get_cache_tag(tag, 2)
-        if index >= 0:
-            tag = tag + '_%d' % index
+        if tag is None:
+            tag = sys._getframe(1).f_code
         try:
-            return self._cache_valid[tag]
+            tag = _cache_tags[tag]
         except KeyError:
-            self._cache_valid[tag] = False
-            return False
+            tag = get_cache_tag(tag)
+        if index >= 0:
+            tag = (tag, index)
+        return self._cache_valid.get(tag, False)
 
     def _set_cache_valid(self, valid=True, tag=None, index=-1):
-        tag = self._get_cache_tag(tag, 2)
+        if tag is None:
+            tag = sys._getframe(1).f_code
+        try:
+            tag = _cache_tags[tag]
+        except KeyError:
+            tag = get_cache_tag(tag)
         if index >= 0:
-            tag = tag + '_%d' % index
+            tag = (tag, index)
         self._cache_valid[tag] = valid
 
     def _driver_operation_invalidate_all_attributes(self):
@@ -1960,7 +2312,10 @@ class Driver(DriverOperation, DriverIdentity, DriverUtility):
             return
         if not self._initialized or self._interface is None:
             raise NotInitializedException()
-        self._interface.write_raw(data)
+        with self._io_lock:
+            if self._batch_buffer:
+                self._flush_batch()
+            self._interface.write_raw(data)
     
     def _read_raw(self, num=-1):
         "Read binary data from instrument"
@@ -1969,7 +2324,10 @@ class Driver(DriverOperation, DriverIdentity, DriverUtility):
             return b''
         if not self._initialized or self._interface is None:
             raise NotInitializedException()
-        return self._interface.read_raw(num)
+        with self._io_lock:
+            if self._batch_buffer:
+                self._flush_batch()
+            return self._interface.read_raw(num)
     
     def _ask_raw(self, data, num=-1):
         "Write then read binary data"
@@ -1978,12 +2336,15 @@ class Driver(DriverOperation, DriverIdentity, DriverUtility):
             return b''
         if not self._initialized or self._interface is None:
             raise NotInitializedException()
-        try:
-            return self._interface.ask_raw(data, num)
-        except AttributeError:
-            # if interface does not implement ask_raw, emulate it
-            self._write_raw(data)
-            return self._read_raw(num)
+        with self._io_lock:
+            if self._batch_buffer:
+                self._flush_batch()
+            try:
+                return self._interface.ask_raw(data, num)
+            except AttributeError:
+                # if interface does not implement ask_raw, emulate it
+                self._write_raw(data)
+                return self._read_raw(num)
     
     def _write(self, data, encoding = 'utf-8'):
         "Write string to instrument"
@@ -1992,16 +2353,20 @@ class Driver(DriverOperation, DriverIdentity, DriverUtility):
             return
         if not self._initialized or self._interface is None:
             raise NotInitializedException()
-        try:
-            self._interface.write(data, encoding)
-        except AttributeError:
-            if type(data) is tuple or type(data) is list:
-                # recursive call for a list of commands
-                for data_i in data:
-                    self._write(data_i, encoding)
+        with self._io_lock:
+            if self._batch_depth > 0:
+                self._batch_write(data, encoding)
                 return
+            try:
+                self._interface.write(data, encoding)
+            except AttributeError:
+                if type(data) is tuple or type(data) is list:
+                    # recursive call for a list of commands
+                    for data_i in data:
+                        self._write(data_i, encoding)
+                    return
 
-            self._write_raw(str(data).encode(encoding))
+                self._write_raw(str(data).encode(encoding))
     
     def _read(self, num=-1, encoding = 'utf-8'):
         "Read string from instrument"
@@ -2010,10 +2375,13 @@ class Driver(DriverOperation, DriverIdentity, DriverUtility):
             return ''
         if not self._initialized or self._interface is None:
             raise NotInitializedException()
-        try:
-            return self._interface.read(num, encoding)
-        except AttributeError:
-            return self._read_raw(num).decode(encoding).rstrip('\r\n')
+        with self._io_lock:
+            if self._batch_buffer:
+                self._flush_batch()
+            try:
+                return self._interface.read(num, encoding)
+            except AttributeError:
+                return self._read_raw(num).decode(encoding).rstrip('\r\n')
     
     def _ask(self, data, num=-1, encoding = 'utf-8'):
         "Write then read string"
@@ -2022,21 +2390,121 @@ class Driver(DriverOperation, DriverIdentity, DriverUtility):
             return ''
         if not self._initialized or self._interface is None:
             raise NotInitializedException()
-        try:
-            return self._interface.ask(data, num, encoding)
-        except AttributeError:
-            # if interface does not implement ask, emulate it
-            if type(data) is tuple or type(data) is list:
-            #    # recursive call for a list of commands
-                val = list()
-                for data_i in data:
-                    val.append(self._ask(data_i, num, encoding))
-                return val
-
-            self._write(data, encoding)
-            return self._read(num, encoding)
+        with self._transaction():
+            if self._batch_buffer:
+                if type(data) is not tuple and type(data) is not list:
+                    # send the query with the pending commands in one message
+                    self._batch_write(data, encoding)
+                    self._flush_batch()
+                    return self._read(num, encoding)
+                self._flush_batch()
+            try:
+                return self._interface.ask(data, num, encoding)
+            except AttributeError:
+                # if interface does not implement ask, emulate it
+                if type(data) is tuple or type(data) is list:
+                #    # recursive call for a list of commands
+                    val = list()
+                    for data_i in data:
+                        val.append(self._ask(data_i, num, encoding))
+                    return val
+
+                self._write(data, encoding)
+                return self._read(num, encoding)
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Hold the driver I/O lock across a write and the matching read
+
+        The lock of a pooled session is held as well, since the session may
+        be shared with other drivers.
+        """
+        with self._io_lock:
+            if self._session_pool is not None and self._interface is not None:
+                with self._interface:
+                    yield
+            else:
+                yield
     
-    def _ask_for_values(self, msg, delim=',', converter=float, array=True):
+    def _batch_write(self, data, encoding='utf-8'):
+        "Add a command to the pending batch, flushing first if it would not fit"
+        if type(data) is tuple or type(data) is list:
+            for data_i in data:
+                self._batch_write(data_i, encoding)
+            return
+        data = str(data)
+        if self._batch_buffer and encoding != self._batch_encoding:
+            self._flush_batch()
+        # length including separator and path reset colon
+        l = len(data) + (1 if data[0:1] in (':', '*') else 2)
+        if self._batch_buffer and self._batch_length + l > self._batch_max_length:
+            self._flush_batch()
+        if not self._batch_buffer:
+            self._batch_encoding = encoding
+            self._batch_length = len(data)
+        else:
+            self._batch_length += l
+        self._batch_buffer.append(data)
+
+    def _flush_batch(self):
+        "Send pending batched commands as one message"
+        buf = self._batch_buffer
+        if not buf:
+            return
+        self._batch_buffer = list()
+        self._batch_length = 0
+        # a command following a semicolon is relative to the header path of
+        # the previous command unless it starts with a colon; reset the path
+        # so each command is interpreted the same as when sent on its own
+        msg = ';'.join([buf[0]] + [c if c[0:1] in (':', '*') else ':' + c for c in buf[1:]])
+        depth = self._batch_depth
+        self._batch_depth = 0
+        try:
+            self._write(msg, self._batch_encoding)
+        finally:
+            self._batch_depth = depth
+
+    @contextmanager
+    def batch(self, max_length=None):
+        """
+        Batch instrument writes
+
+        Within the context, writes are collected and sent as a single
+        semicolon-separated message instead of one message per command.  The
+        pending commands are sent before any read, and queries are appended to
+        the pending message so the whole batch costs one round trip.  Messages
+        are split so that none exceeds max_length characters (default
+        _batch_max_length).  Any remaining commands are sent on exit; if the
+        block raises, commands that have not been sent yet are discarded.
+
+        Example:
+
+        with scope.batch():
+            scope.channels[0].range = 1
+            scope.channels[0].offset = 0
+            scope.timebase.range = 1e-3
+        """
+        old_max_length = self._batch_max_length
+        if max_length is not None:
+            self._batch_max_length = max_length
+        self._batch_depth += 1
+        try:
+            yield self
+        except:
+            self._batch_depth -= 1
+            self._batch_max_length = old_max_length
+            if self._batch_depth == 0:
+                # don't send a half-built batch
+                self._batch_buffer = list()
+                self._batch_length = 0
+            raise
+        self._batch_depth -= 1
+        self._batch_max_length = old_max_length
+        if self._batch_depth == 0 and not self._driver_operation_simulate:
+            self._flush_batch()
+
+    def _ask_for_values(self, msg, delim=',', converter=float, array=True, out=None, overload=None):
         '''
         write then read a list or array of data
         
@@ -2050,14 +2518,27 @@ class Driver(DriverOperation, DriverIdentity, DriverUtility):
             a datatype used to typecase the elements in the returned list
         array: bool
             convert the output to a numpy array 
+        out : array
+            preallocated array to store float values in, a view of the
+            filled portion is returned
+        overload : float
+            value to replace SCPI overload readings (9.9e37) with, see
+            decode_values
         
         '''
-        s = self._ask(msg)
+        with self._transaction():
+            s = self._ask(msg)
+        if converter is float:
+            # parse floats in bulk
+            val = decode_values(s, delim, out, overload)
+            if array or out is not None:
+                return val
+            return val.tolist()
         s_split = s.split(delim)
-        out = map(converter, s_split)
+        val = list(map(converter, s_split))
         if array:
-            out = np.array(out)
-        return out
+            val = np.array(val)
+        return val
     
     def _read_stb(self):
         "Read status byte"
@@ -2066,10 +2547,101 @@ class Driver(DriverOperation, DriverIdentity, DriverUtility):
             return 0
         if not self._initialized or self._interface is None:
             raise NotInitializedException()
+        with self._io_lock:
+            if self._batch_buffer:
+                self._flush_batch()
+            try:
+                return self._interface.read_stb()
+            except (AttributeError, NotImplementedError):
+                return int(self._ask("*STB?"))
+    
+    def _wait_for(self, condition, maximum_time=None):
+        """
+        Wait until condition() returns True
+
+        The condition is checked immediately, then polled with an interval
+        that starts at _wait_poll_interval and backs off exponentially to
+        _wait_max_poll_interval.  Returns True when the condition is met or
+        False once maximum_time seconds have elapsed.  IVI maximum times are
+        in milliseconds; convert them with max_time_to_seconds.
+        """
+        deadline = None if maximum_time is None else _monotonic() + maximum_time
+        interval = self._wait_poll_interval
+        while True:
+            if condition():
+                return True
+            now = _monotonic()
+            if deadline is not None:
+                if now >= deadline:
+                    return False
+                time.sleep(min(interval, deadline - now))
+            else:
+                time.sleep(interval)
+            interval = min(interval * 1.5, self._wait_max_poll_interval)
+    
+    def _wait_for_stb(self, mask, maximum_time=None, srq=False):
+        """
+        Wait until any of the status byte bits in mask are set
+
+        If srq is set, the instrument must be configured to request service
+        on these bits (*SRE).  The interface is then asked to wait for the
+        service request if it supports it, otherwise the status byte is
+        polled.  Returns False once maximum_time seconds have elapsed.
+        """
+        if self._driver_operation_simulate:
+            return True
+        deadline = None if maximum_time is None else _monotonic() + maximum_time
+        if srq and hasattr(self._interface, 'wait_for_srq'):
+            while not self._read_stb() & mask:
+                remaining = None if deadline is None else deadline - _monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                try:
+                    self._interface.wait_for_srq(remaining)
+                except NotImplementedError:
+                    break
+            else:
+                return True
+        remaining = None if deadline is None else max(deadline - _monotonic(), 0)
+        return self._wait_for(lambda: self._read_stb() & mask, remaining)
+    
+    def _wait_for_operation_complete(self, maximum_time=None):
+        """
+        Wait until all pending operations have completed
+
+        Clears the event status register, sends *OPC with the operation
+        complete event enabled (*ESE 1) and waits for the event status bit in
+        the status byte.  When the interface supports service requests, *SRE
+        32 is added to the service request enable register for the wait.  The
+        previous *ESE and *SRE values are restored afterwards.  Returns False
+        once maximum_time seconds have elapsed.
+        """
+        if self._driver_operation_simulate:
+            return True
+        srq = hasattr(self._interface, 'wait_for_srq')
+        with self._transaction():
+            ese = int(self._ask("*ESE?"))
+            if srq:
+                sre = int(self._ask("*SRE?"))
+            with self.batch():
+                self._write("*ESE 1")
+                if srq:
+                    self._write("*SRE %d" % (sre | 32))
+                # clear events left over from earlier operations
+                self._write("*ESR?")
+                self._write("*OPC")
+            self._read()
         try:
-            return self._interface.read_stb()
-        except (AttributeError, NotImplementedError):
-            return int(self._ask("*STB?"))
+            done = self._wait_for_stb(1 << 5, maximum_time, srq)
+        finally:
+            with self.batch():
+                self._write("*ESE %d" % ese)
+                if srq:
+                    self._write("*SRE %d" % sre)
+        if done:
+            # clear the event status register
+            self._ask("*ESR?")
+        return done
     
     def _trigger(self):
         "Device trigger"
@@ -2077,6 +2649,8 @@ class Driver(DriverOperation, DriverIdentity, DriverUtility):
             print("[simulating] Trigger")
         if not self._initialized or self._interface is None:
             raise NotInitializedException()
+        if self._batch_buffer:
+            self._flush_batch()
         try:
             self._interface.trigger()
         except (AttributeError, NotImplementedError):
@@ -2088,6 +2662,8 @@ class Driver(DriverOperation, DriverIdentity, DriverUtility):
             print("[simulating] Clear")
         if not self._initialized or self._interface is None:
             raise NotInitializedException()
+        if self._batch_buffer:
+            self._flush_batch()
         try:
             return self._interface.clear()
         except (AttributeError, NotImplementedError):
@@ -2099,6 +2675,8 @@ class Driver(DriverOperation, DriverIdentity, DriverUtility):
             print("[simulating] Remote")
         if not self._initialized or self._interface is None:
             raise NotInitializedException()
+        if self._batch_buffer:
+            self._flush_batch()
         return self._interface.remote()
     
     def _local(self):
@@ -2107,36 +2685,102 @@ class Driver(DriverOperation, DriverIdentity, DriverUtility):
             print("[simulating] Local")
         if not self._initialized or self._interface is None:
             raise NotInitializedException()
+        if self._batch_buffer:
+            self._flush_batch()
         return self._interface.local()
     
-    def _read_ieee_block(self):
-        "Read IEEE block"
+    def _read_ieee_block(self, buf=None, chunk_size=None, progress=None):
+        """
+        Read IEEE block
+
+        The payload is read in chunks of chunk_size bytes (default
+        _ieee_block_chunk_size) directly into a preallocated bytearray, or into
+        buf if specified (any writable contiguous buffer, such as a bytearray
+        or numpy array).  If specified, progress is called as
+        progress(received, total) after each chunk.  Exactly the header and
+        the payload are read, then one byte for the message terminator.
+
+        Returns the data as a bytearray, or a uint8 numpy view of buf when buf
+        is specified.
+        """
         # IEEE block binary data is prefixed with #lnnnnnnnn
         # where l is length of n and n is the
         # length of the data
         # ex: #800002000 prefixes 2000 data bytes
 
-        ch = self._read_raw(1)
-
-        if len(ch) == 0:
-            return b''
-
-        while ch != b'#':
-            ch = self._read_raw(1)
-
-        l = int(self._read_raw(1))
-        if l > 0:
-            num = int(self._read_raw(l))
-            raw_data = self._read_raw(num)
-        else:
-            raw_data = self._read_raw()
-
-        return raw_data
-    
-    def _ask_for_ieee_block(self, data, encoding = 'utf-8'):
+        # find the start of the header
+        data = b''
+        while len(data) < 2:
+            d = self._read_raw(2 - len(data))
+            if len(d) == 0:
+                return b''
+            data += d
+            ind = data.find(b'#')
+            data = data[ind:] if ind >= 0 else b''
+
+        l = int(data[1:2])
+
+        if l == 0:
+            # indefinite length, read to end of message
+            return self._read_raw()
+
+        data = b''
+        while len(data) < l:
+            d = self._read_raw(l - len(data))
+            if len(d) == 0:
+                return b''
+            data += d
+
+        num = int(data)
+
+        if num == 0:
+            # consume terminator
+            self._read_raw(1)
+            return bytearray()
+
+        alloc = buf is None
+        if alloc:
+            buf = bytearray(num)
+        out = np.frombuffer(buf, dtype=np.uint8)
+        if len(out) < num:
+            raise OutOfRangeException('Buffer too small for %d byte block' % num)
+
+        if chunk_size is None:
+            chunk_size = self._ieee_block_chunk_size
+
+        got = 0
+        while got < num:
+            # interfaces may return less than requested, such as at a
+            # termination character inside the block
+            d = self._read_raw(min(chunk_size, num - got))
+
+            if len(d) == 0:
+                break
+
+            k = min(len(d), num - got)
+            out[got:got+k] = np.frombuffer(d, dtype=np.uint8, count=k)
+            got += k
+
+            if progress is not None:
+                progress(got, num)
+
+        if got == num:
+            # consume terminator
+            self._read_raw(1)
+
+        if alloc:
+            if got < num:
+                # short read
+                del out
+                del buf[got:]
+            return buf
+        return out[0:got]
+
+    def _ask_for_ieee_block(self, data, encoding = 'utf-8', buf=None, chunk_size=None, progress=None):
         "Write string then read IEEE block"
-        self._write(data, encoding)
-        return self._read_ieee_block()
+        with self._transaction():
+            self._write(data, encoding)
+            return self._read_ieee_block(buf, chunk_size, progress)
 
     def _write_ieee_block(self, data, prefix = None, encoding = 'utf-8'):
         "Write IEEE block"
@@ -24,7 +24,8 @@ THE SOFTWARE.
 
 """
 
-# Optical Grating Filters
-from .jdsuTB9 import jdsuTB9
-
+from ..registry import register_drivers
 
+register_drivers(__name__, [
+        # Optical Grating Filters
+        "jdsuTB9"])
@@ -25,7 +25,8 @@ THE SOFTWARE.
 """
 
 import time
-import struct
+
+import numpy as np
 
 from .. import ivi
 from .. import scope
@@ -530,10 +531,11 @@ class lecroyBaseScope(scpi.common.IdnCommand, scpi.common.ErrorQuery, scpi.commo
         code = 0
         message = "Self test passed"
         if not self._driver_operation_simulate:
-            self._write("*TST?")
-            # Wait for test to complete - may be adjusted if required
-            time.sleep(40)
-            code = int(self._read())
+            with self._transaction():
+                self._write("*TST?")
+                # Wait for test to complete - may be adjusted if required
+                time.sleep(40)
+                code = int(self._read())
             if code != 0:
                 message = "Self test failed"
         return (code, message)
@@ -601,9 +603,7 @@ class lecroyBaseScope(scpi.common.IdnCommand, scpi.common.ErrorQuery, scpi.commo
         if self._driver_operation_simulate:
             return b''
 
-        self._write(":system:setup?")
-
-        return self._read_ieee_block()
+        return self._ask_for_ieee_block(":system:setup?")
 
     # TODO: how to implement the following on LeCroy scope?
     def _system_load_setup(self, data):
@@ -636,10 +636,11 @@ class lecroyBaseScope(scpi.common.IdnCommand, scpi.common.ErrorQuery, scpi.commo
             color = "WHITE"
         else:
             color = "WHITE"
-        self._write(
-            "HCSU DEV,%s,FORMAT,PORTRAIT,BCKG,%s,DEST,\"REMOTE\",PORT,\"NET\",AREA,GRIDAREAONLY" % (str(format), color))
-        self._write("SCDP")
-        return self._read_raw()
+        with self._transaction():
+            self._write(
+                "HCSU DEV,%s,FORMAT,PORTRAIT,BCKG,%s,DEST,\"REMOTE\",PORT,\"NET\",AREA,GRIDAREAONLY" % (str(format), color))
+            self._write("SCDP")
+            return self._read_raw()
 
     # TODO: determine how to handle all :timebase: methods for LeCroy
     def _get_timebase_mode(self):
@@ -1410,7 +1411,7 @@ class lecroyBaseScope(scpi.common.IdnCommand, scpi.common.ErrorQuery, scpi.commo
         index = ivi.get_index(self._channel_name, index)
 
         if self._driver_operation_simulate:
-            return list()
+            return ivi.TraceYT()
 
         # Send the MSB first
         # old - self._write(":waveform:byteorder msbfirst")
@@ -1420,58 +1421,36 @@ class lecroyBaseScope(scpi.common.IdnCommand, scpi.common.ErrorQuery, scpi.commo
         # Read wave description and split up parts into variables
         pre = self._ask("%s:INSPECT? WAVEDESC" % self._channel_name[index]).split("\r\n")
 
-
-        # Replace following with a more simple solution, make it < Python 2.7 compatible
-        temp = []
+        desc = dict()
         for item in pre:
-            temp.append(item.split(':'))
-
-        # Dict comprehension, python 2.7+
-        #mydict = {t[0].strip(): ["".join(elem.strip()) for elem in t[1:]] for t in temp}
-        #format = str(mydict["COMM_TYPE"][0])
-        #points = int(mydict["PNTS_PER_SCREEN"][0])
-        #xincrement = float(mydict["HORIZ_INTERVAL"][0])
-        #xorigin = float(mydict["HORIZ_OFFSET"][0])
-        #yincrement = float(mydict["VERTICAL_GAIN"][0])
-        #yorigin = float(mydict["VERTICAL_OFFSET"][0])
-
-        # Dict with lost comprehension, python 2.6+
-        mydict = dict([(d[0].strip(), "".join(d[1:]).strip()) for d in temp])
-
-        format = str(mydict["COMM_TYPE"])
-        points = int(mydict["PNTS_PER_SCREEN"])
-        xincrement = float(mydict["HORIZ_INTERVAL"])
-        xorigin = float(mydict["HORIZ_OFFSET"])
-        yincrement = float(mydict["VERTICAL_GAIN"])
-        yorigin = float(mydict["VERTICAL_OFFSET"])
+            l = item.split(':')
+            desc[l[0].strip()] = "".join(l[1:]).strip()
+
+        format = str(desc["COMM_TYPE"])
+        points = int(desc["PNTS_PER_SCREEN"])
 
         # Verify that the data is in 'word' format
         if format.lower() != "word":
             raise ivi.UnexpectedResponseException()
 
-        # Read waveform data
-        self._write("%s:WAVEFORM? DAT1" % self._channel_name[index])
-        raw_data = raw_data = self._read_ieee_block()
-
-        # Split out points and convert to time and voltage pairs
-        data = list()
-        for i in range(points):
-            x = (i * xincrement) + xorigin
-
-            yval = struct.unpack(">H", raw_data[i * 2:i * 2 + 2])[0]
+        trace = ivi.TraceYT()
 
-            if yval > 32767:
-                yval = yval - (2 ** 16)
+        trace.x_increment = float(desc["HORIZ_INTERVAL"])
+        trace.x_origin = float(desc["HORIZ_OFFSET"])
+        trace.x_reference = 0
+        trace.y_increment = float(desc["VERTICAL_GAIN"])
+        trace.y_origin = -float(desc["VERTICAL_OFFSET"])
+        trace.y_reference = 0
+        trace.y_hole = 0
 
-            if yval == 0:
-                # hole value
-                y = float('nan')
-            else:
-                y = (yincrement * yval) - yorigin
+        # Read waveform data
+        raw_data = self._ask_for_ieee_block("%s:WAVEFORM? DAT1" % self._channel_name[index])
 
-            data.append((x, y))
+        # Store in trace object as big-endian signed 16 bit view
+        points = min(points, len(raw_data) // 2)
+        trace.y_raw = np.frombuffer(raw_data, dtype='>i2', count=points)
 
-        return data
+        return trace
 
     def _measurement_read_waveform(self, index, maximum_time):
         return self._measurement_fetch_waveform(index)
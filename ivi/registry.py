@@ -0,0 +1,87 @@
+"""
+
+Python Interchangeable Virtual Instrument Library
+
+Copyright (c) 2016 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+import importlib
+import sys
+import types
+
+# driver index
+# maps vendor package name to list of driver names
+# each driver lives in a module of the same name
+_drivers = dict()
+
+
+class LazyDriverPackage(types.ModuleType):
+    "Vendor package that imports driver modules on first attribute access"
+
+    def __getattr__(self, name):
+        if name in _drivers.get(self.__name__, ()):
+            importlib.import_module('.' + name, self.__name__)
+            return self.__dict__[name]
+        raise AttributeError("module '%s' has no attribute '%s'" % (self.__name__, name))
+
+    def __setattr__(self, name, value):
+        # importing a driver module binds the module to the package;
+        # bind the driver class of the same name instead
+        if isinstance(value, types.ModuleType) and name in _drivers.get(self.__name__, ()):
+            value = getattr(value, name, value)
+        types.ModuleType.__setattr__(self, name, value)
+
+    def __dir__(self):
+        return sorted(set(self.__dict__) | set(_drivers.get(self.__name__, ())))
+
+
+def register_drivers(package, drivers):
+    "Register the drivers of a vendor package for import on first access"
+    _drivers[package] = list(drivers)
+
+    mod = sys.modules[package]
+    mod.__all__ = list(drivers)
+
+    try:
+        mod.__class__ = LazyDriverPackage
+    except TypeError:
+        # module class cannot be changed on this Python version,
+        # fall back on importing all drivers
+        for name in drivers:
+            m = importlib.import_module('.' + name, package)
+            setattr(mod, name, getattr(m, name))
+
+
+def list_drivers(vendor=None):
+    """
+    Return a sorted list of available drivers as 'vendor.driver' names
+
+    If vendor is specified, only drivers from that vendor package are listed.
+    Driver modules are not imported.
+    """
+    l = list()
+    for package in _drivers:
+        v = package.rsplit('.', 1)[-1]
+        if vendor is not None and v != vendor:
+            continue
+        l.extend(v + '.' + name for name in _drivers[package])
+    return sorted(l)
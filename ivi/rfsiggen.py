@@ -133,10 +133,8 @@ class Base(ivi.IviContainer):
         return True
     
     def _rf_wait_until_settled(self, maximum_time):
-        t = 0
-        while not self._rf_is_settled() and t < maximum_time:
-            time.sleep(0.01)
-            t = t + 0.01
+        if not self._wait_for(self._rf_is_settled, ivi.max_time_to_seconds(maximum_time)):
+            raise ivi.MaxTimeoutExceededException()
     
     
 class ModulateAM(ivi.IviContainer):
@@ -120,9 +120,10 @@ class rigolBaseDCPwr(scpi.dcpwr.Base, scpi.dcpwr.Trigger, scpi.dcpwr.SoftwareTri
         code = 0
         message = "No Response"
         if not self._driver_operation_simulate:
-            self._write("*TST?")
-            # wait for test to complete
-            message = self._read()
+            with self._transaction():
+                self._write("*TST?")
+                # wait for test to complete
+                message = self._read()
             if 'FAIL' in message:
                 code = -1
         return (code, message)
\ No newline at end of file
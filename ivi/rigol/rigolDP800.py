@@ -81,5 +81,11 @@ class rigolDP800(rigolBaseDCPwr):
         
         self._init_outputs()
         
+    def _output_measure_all_commands(self, index):
+        # measure:all? returns voltage, current and power of one channel
+        return [":measure:all? ch%d" % (index+1)]
+    
+    def _output_measure_all_fields(self, index):
+        return 3
     
     
@@ -109,10 +109,11 @@ class SelfTest(object):
         code = 0
         message = "Self test passed"
         if not self._driver_operation_simulate:
-            self._write("*TST?")
-            # wait for test to complete
-            time.sleep(self._self_test_delay)
-            code = int(self._read())
+            with self._transaction():
+                self._write("*TST?")
+                # wait for test to complete
+                time.sleep(self._self_test_delay)
+                code = int(self._read())
             if code != 0:
                 message = "Self test failed"
         return (code, message)
@@ -150,9 +151,10 @@ class SystemSetup(extra.common.SystemSetup):
         if self._driver_operation_simulate:
             return b''
         
-        self._write("*lrn?")
-        
-        return self._read_raw()
+        with self._transaction():
+            self._write("*lrn?")
+            
+            return self._read_raw()
     
     def _system_load_setup(self, data):
         if self._driver_operation_simulate:
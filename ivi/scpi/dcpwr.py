@@ -24,6 +24,8 @@ THE SOFTWARE.
 
 """
 
+import numpy as np
+
 from .. import ivi
 from .. import dcpwr
 from .. import extra
@@ -516,3 +518,37 @@ class Measurement(dcpwr.Measurement):
                     self._write("instrument:nselect %d" % (index+1))
                 return float(self._ask("measure:current?"))
         return 0
+    
+    def _output_measure_all_commands(self, index):
+        "Commands that query the voltage and current of an output, in that order"
+        cmds = list()
+        if self._output_count > 1:
+            cmds.append(":instrument:nselect %d" % (index+1))
+        cmds.append(":measure:voltage?")
+        cmds.append(":measure:current?")
+        return cmds
+    
+    def _output_measure_all_fields(self, index):
+        "Number of values returned by the measure_all commands of an output"
+        return 2
+    
+    def _outputs_measure_all(self):
+        n = len(self._output_name)
+        out = np.zeros(n, dtype=dcpwr.MeasureAllType)
+        if self._driver_operation_simulate:
+            return out
+        # query all outputs in one message; the responses to the queries
+        # come back in one message separated by semicolons
+        cmds = list()
+        fields = list()
+        for i in range(n):
+            cmds.extend(self._output_measure_all_commands(i))
+            fields.append(self._output_measure_all_fields(i))
+        val = ivi.decode_values(self._ask(';'.join(cmds)).replace(';', ','))
+        if len(val) != sum(fields):
+            raise ivi.UnexpectedResponseException()
+        # voltage and current are the first two values of each output
+        offset = np.cumsum([0] + fields[:-1])
+        out['voltage'] = val[offset]
+        out['current'] = val[offset+1]
+        return out
@@ -25,6 +25,8 @@ THE SOFTWARE.
 """
 
 import math
+import numpy as np
+import sys
 
 from .. import ivi
 from .. import dmm
@@ -92,6 +94,10 @@ class Base(common.IdnCommand, common.ErrorQuery, common.Reset, common.SelfTest,
 
         self._self_test_delay = 40
         
+        # reading transfer format, 'ascii' or 'real,64'
+        self._reading_format = 'ascii'
+        self._reading_format_sent = 'ascii'
+        
         self._identity_description = "Generic SCPI IVI DMM driver"
         self._identity_identifier = ""
         self._identity_revision = ""
@@ -269,9 +275,30 @@ class Base(common.IdnCommand, common.ErrorQuery, common.Reset, common.SelfTest,
         if not self._driver_operation_simulate:
             self._write(":abort")
     
+    def _configure_reading_format(self):
+        "Select the configured reading transfer format if not already selected"
+        fmt = self._reading_format
+        if fmt != self._reading_format_sent or (fmt != 'ascii' and not self._get_cache_valid('reading_format')):
+            self._write(":format:data %s" % fmt)
+            if fmt == 'real,64':
+                # native byte order so readings decode without a copy
+                if sys.byteorder == 'little':
+                    self._write(":format:border swapped")
+                else:
+                    self._write(":format:border normal")
+            self._reading_format_sent = fmt
+            self._set_cache_valid(tag='reading_format')
+    
+    def _ask_for_readings(self, cmd):
+        "Query readings in the configured transfer format, returns a float64 array"
+        self._configure_reading_format()
+        if self._reading_format == 'real,64':
+            return np.frombuffer(self._ask_for_ieee_block(cmd), np.float64)
+        return self._ask_for_values(cmd)
+    
     def _measurement_fetch(self, max_time):
         if not self._driver_operation_simulate:
-            return float(self._ask(":fetch?"))
+            return float(self._ask_for_readings(":fetch?")[0])
         return 0.0
     
     def _measurement_initiate(self):
@@ -289,7 +316,7 @@ class Base(common.IdnCommand, common.ErrorQuery, common.Reset, common.SelfTest,
     
     def _measurement_read(self, max_time):
         if not self._driver_operation_simulate:
-            return float(self._ask(":read?"))
+            return float(self._ask_for_readings(":read?")[0])
         return 0.0
     
     
@@ -357,12 +384,12 @@ class MultiPoint(dmm.MultiPoint):
     
     def _measurement_fetch_multi_point(self, max_time, num_of_measurements = 0):
         if not self._driver_operation_simulate:
-            return self._ask_for_values(":fetch?", array=False)
+            return self._ask_for_readings(":fetch?")
         return [0.0 for i in range(self._trigger_multi_point_count*self._trigger_multi_point_sample_count)]
     
     def _measurement_read_multi_point(self, max_time, num_of_measurements = 0):
         if not self._driver_operation_simulate:
-            return self._ask_for_values(":read?", array=False)
+            return self._ask_for_readings(":read?")
         return [0.0 for i in range(self._trigger_multi_point_count*self._trigger_multi_point_sample_count)]
     
     
@@ -0,0 +1,318 @@
+"""
+
+Python Interchangeable Virtual Instrument Library
+
+Copyright (c) 2016 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+import errno
+import re
+import socket
+import threading
+import time
+
+from . import ivi
+
+# errors that may indicate a broken connection
+ConnectionErrors = (EnvironmentError, EOFError)
+
+# error numbers of a broken connection
+DisconnectErrnos = (errno.ECONNREFUSED, errno.ECONNRESET, errno.ECONNABORTED,
+        errno.EPIPE, errno.ENOTCONN)
+
+
+def is_disconnect(err):
+    """
+    Check whether an exception means the connection was lost
+
+    Timeouts are not disconnects: the instrument may still be processing the
+    command, so it must not be sent again.
+    """
+    if isinstance(err, EOFError):
+        return True
+    if isinstance(err, socket.timeout):
+        return False
+    return isinstance(err, EnvironmentError) and err.errno in DisconnectErrnos
+
+
+def get_link_name(resource):
+    """
+    Return the name of the physical link used by a resource
+
+    Sessions on the same GPIB board or the same LAN host share a lock.
+    """
+    m = re.match(r'^(GPIB\d*)::', resource, re.I)
+    if m is not None:
+        return m.group(1).upper()
+    m = re.match(r'^TCPIP\d*::([^:]+)::', resource, re.I)
+    if m is not None:
+        return 'TCPIP::' + m.group(1).lower()
+    return resource
+
+
+class Session(object):
+    """
+    Shared instrument interface
+
+    Forwards I/O to the underlying interface under a lock shared by all
+    sessions on the same link, so several drivers and threads can use the
+    same controller.  ask and ask_raw hold the lock across the write and the
+    read; wrap other multi-step transactions in 'with session:'.  If the
+    connection is lost (refused, reset or closed), the interface is reopened
+    and writes and queries are retried once; timeouts are never retried.
+    close releases the session back to its pool.
+
+    Other attributes, such as timeout or term_char, are read from and written
+    to the underlying interface; written values are applied again when the
+    interface is reopened.
+    """
+
+    _attributes = ('pool', 'resource', 'prefer_pyvisa', 'lock', 'refcount',
+            'last_used', 'interface', 'settings')
+
+    def __init__(self, pool, resource, prefer_pyvisa=False, lock=None):
+        self.pool = pool
+        self.resource = resource
+        self.prefer_pyvisa = prefer_pyvisa
+        self.lock = lock if lock is not None else threading.RLock()
+        self.refcount = 0
+        self.last_used = time.time()
+        self.interface = None
+        # interface attributes set through the session
+        self.settings = dict()
+        self.open()
+
+    def __getattr__(self, name):
+        interface = self.__dict__.get('interface')
+        if name.startswith('__') or interface is None:
+            raise AttributeError(name)
+        return getattr(interface, name)
+
+    def __setattr__(self, name, value):
+        if name in self._attributes:
+            object.__setattr__(self, name, value)
+            return
+        with self.lock:
+            self.settings[name] = value
+            if self.interface is not None:
+                setattr(self.interface, name, value)
+
+    def open(self):
+        "Open the underlying interface"
+        self.interface = self.pool.open_interface(self.resource, self.prefer_pyvisa)
+        for name, value in self.settings.items():
+            setattr(self.interface, name, value)
+
+    def reconnect(self):
+        "Close and reopen the underlying interface"
+        with self.lock:
+            try:
+                self.interface.close()
+            except Exception:
+                pass
+            self.interface = None
+            self.open()
+
+    def _call(self, name, retry, *args):
+        with self.lock:
+            if self.interface is None:
+                self.open()
+            try:
+                return getattr(self.interface, name)(*args)
+            except ConnectionErrors as e:
+                if not is_disconnect(e):
+                    raise
+                self.reconnect()
+                if not retry:
+                    raise
+                return getattr(self.interface, name)(*args)
+
+    def __enter__(self):
+        self.lock.acquire()
+        return self
+
+    def __exit__(self, *args):
+        self.lock.release()
+
+    def write_raw(self, data):
+        "Write binary data to instrument"
+        self._call('write_raw', True, data)
+
+    def read_raw(self, num=-1):
+        "Read binary data from instrument"
+        return self._call('read_raw', False, num)
+
+    def ask_raw(self, data, num=-1):
+        "Write then read binary data"
+        with self.lock:
+            try:
+                return self._call('ask_raw', True, data, num)
+            except AttributeError:
+                # if interface does not implement ask_raw, emulate it
+                self.write_raw(data)
+                return self.read_raw(num)
+
+    def write(self, message, encoding='utf-8'):
+        "Write string to instrument"
+        try:
+            self._call('write', True, message, encoding)
+        except AttributeError:
+            if type(message) is tuple or type(message) is list:
+                # recursive call for a list of commands
+                for message_i in message:
+                    self.write(message_i, encoding)
+                return
+
+            self.write_raw(str(message).encode(encoding))
+
+    def read(self, num=-1, encoding='utf-8'):
+        "Read string from instrument"
+        try:
+            return self._call('read', False, num, encoding)
+        except AttributeError:
+            return self.read_raw(num).decode(encoding).rstrip('\r\n')
+
+    def ask(self, message, num=-1, encoding='utf-8'):
+        "Write then read string"
+        with self.lock:
+            try:
+                return self._call('ask', True, message, num, encoding)
+            except AttributeError:
+                # if interface does not implement ask, emulate it
+                if type(message) is tuple or type(message) is list:
+                    # recursive call for a list of commands
+                    val = list()
+                    for message_i in message:
+                        val.append(self.ask(message_i, num, encoding))
+                    return val
+
+                self.write(message, encoding)
+                return self.read(num, encoding)
+
+    def read_stb(self):
+        "Read status byte"
+        return self._call('read_stb', True)
+
+    def trigger(self):
+        "Send trigger command"
+        self._call('trigger', True)
+
+    def clear(self):
+        "Send clear command"
+        self._call('clear', True)
+
+    def remote(self):
+        "Send remote command"
+        self._call('remote', True)
+
+    def local(self):
+        "Send local command"
+        self._call('local', True)
+
+    def close(self):
+        "Release session to pool"
+        self.pool.release(self)
+
+
+class SessionPool(object):
+    """
+    Pool of instrument sessions keyed by resource string
+
+    acquire returns a Session for a resource, opening the interface only if
+    no session for the resource is open; all drivers acquiring the same
+    resource share one session.  Released sessions stay open for ttl seconds
+    so that drivers initialized again within that time reuse the connection.
+    Sessions on the same GPIB board or LAN host share a lock.
+
+    Pass the pool as the session_pool option when creating drivers:
+
+    pool = ivi.session.SessionPool(ttl=300)
+    dmm = ivi.agilent.agilent34410A("TCPIP0::192.168.1.104::INSTR", session_pool=pool)
+    """
+
+    def __init__(self, ttl=60.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._sessions = dict()
+        self._link_locks = dict()
+
+    def open_interface(self, resource, prefer_pyvisa=False):
+        "Open an interface for a session"
+        return ivi.open_interface(resource, prefer_pyvisa)
+
+    def acquire(self, resource, prefer_pyvisa=False):
+        "Return a session for a resource, opening it if necessary"
+        key = (resource, bool(prefer_pyvisa))
+        with self._lock:
+            self._expire()
+            session = self._sessions.get(key)
+            if session is None:
+                link = get_link_name(resource)
+                lock = self._link_locks.get(link)
+                if lock is None:
+                    lock = self._link_locks[link] = threading.RLock()
+                session = Session(self, resource, prefer_pyvisa, lock)
+                self._sessions[key] = session
+            session.refcount += 1
+            session.last_used = time.time()
+            return session
+
+    def release(self, session):
+        "Release a session acquired with acquire"
+        with self._lock:
+            if session.refcount > 0:
+                session.refcount -= 1
+            session.last_used = time.time()
+            self._expire()
+
+    def expire(self):
+        "Close sessions that have been idle for longer than ttl"
+        with self._lock:
+            self._expire()
+
+    def _expire(self):
+        now = time.time()
+        for key in list(self._sessions):
+            session = self._sessions[key]
+            if session.refcount == 0 and now - session.last_used >= self.ttl:
+                self._close_session(key)
+
+    def _close_session(self, key):
+        session = self._sessions.pop(key)
+        if session.interface is not None:
+            try:
+                session.interface.close()
+            except Exception:
+                pass
+            session.interface = None
+
+    def close_all(self):
+        "Close all sessions, including ones still in use"
+        with self._lock:
+            for key in list(self._sessions):
+                self._close_session(key)
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+default_pool = SessionPool()
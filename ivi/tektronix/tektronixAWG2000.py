@@ -25,7 +25,6 @@ THE SOFTWARE.
 """
 
 import time
-import struct
 from numpy import *
 
 from .. import ivi
@@ -166,10 +165,11 @@ class tektronixAWG2000(ivi.Driver, fgen.Base, fgen.StdFunc, fgen.ArbWfm,
         code = 0
         message = "Self test passed"
         if not self._driver_operation_simulate:
-            self._write("*TST?")
-            # wait for test to complete
-            time.sleep(60)
-            code = int(self._read())
+            with self._transaction():
+                self._write("*TST?")
+                # wait for test to complete
+                time.sleep(60)
+                code = int(self._read())
             if code != 0:
                 message = "Self test failed"
         return (code, message)
@@ -504,20 +504,8 @@ class tektronixAWG2000(ivi.Driver, fgen.Base, fgen.StdFunc, fgen.ArbWfm,
         self._write(":wfmpre:ymult %e" % (2/(1<<12)))
         self._write(":wfmpre:xincr %e" % xincr)
         
-        raw_data = b''
-        
-        for f in y:
-            # clip at -1 and 1
-            if f > 1.0: f = 1.0
-            if f < -1.0: f = -1.0
-            
-            f = (f + 1) / 2
-            
-            # scale to 12 bits
-            i = int(f * ((1 << 12) - 2) + 0.5) & 0x000fffff
-            
-            # add to raw data, MSB first
-            raw_data = raw_data + struct.pack('>H', i)
+        # scale to 12 bits, MSB first
+        raw_data = fgen.encode_arbitrary_waveform(y, '>u2', 12)
         
         self._write_ieee_block(raw_data, ':curve ')
         
@@ -24,10 +24,10 @@ THE SOFTWARE.
 
 """
 
-import array
-import sys
 import time
 
+import numpy as np
+
 from .. import ivi
 from .. import scope
 from .. import scpi
@@ -185,6 +185,7 @@ class tektronixBaseScope(scpi.common.IdnCommand, scpi.common.Reset, scpi.common.
         self._channel_invert = list()
         self._channel_probe_id = list()
         self._channel_bw_limit = list()
+        self._waveform_source = None
 
         super(tektronixBaseScope, self).__init__(*args, **kwargs)
 
@@ -494,11 +495,12 @@ class tektronixBaseScope(scpi.common.IdnCommand, scpi.common.Reset, scpi.common.
 
         format = self._display_screenshot_image_format_mapping[format]
 
-        self._write(":hardcopy:inksaver %d" % int(bool(invert)))
-        self._write(":save:image:fileformat %s" % format)
-        self._write(":hardcopy start")
+        with self._transaction():
+            self._write(":hardcopy:inksaver %d" % int(bool(invert)))
+            self._write(":save:image:fileformat %s" % format)
+            self._write(":hardcopy start")
 
-        return self._read_raw()
+            return self._read_raw()
 
     def _get_timebase_mode(self):
         if not self._driver_operation_simulate and not self._get_cache_valid():
@@ -1267,16 +1269,23 @@ class tektronixBaseScope(scpi.common.IdnCommand, scpi.common.Reset, scpi.common.
         if self._driver_operation_simulate:
             return ivi.TraceYT()
 
-        self._write(":data:source %s" % self._channel_name[index])
-        self._write(":data:encdg fastest")
-        self._write(":data:width 2")
-        self._write(":data:start 1")
-        self._write(":data:stop 1e10")
-
         trace = ivi.TraceYT()
 
-        # Read preamble
-        pre = self._ask(":wfmoutpre?").split(';')
+        # Configure transfer and read preamble in one message
+        # transfer settings are only sent when changed since the last fetch
+        with self.batch():
+            if not self._get_cache_valid('waveform_source') or self._waveform_source != index:
+                self._write(":data:source %s" % self._channel_name[index])
+            if not self._get_cache_valid('waveform_format'):
+                self._write(":data:encdg fastest")
+                self._write(":data:width 2")
+                self._write(":data:start 1")
+                self._write(":data:stop 1e10")
+            pre = self._ask(":wfmoutpre?").split(';')
+
+        self._waveform_source = index
+        self._set_cache_valid(tag='waveform_source')
+        self._set_cache_valid(tag='waveform_format')
 
         acq_format = pre[7].strip()
         points = int(pre[6])
@@ -1297,27 +1306,26 @@ class tektronixBaseScope(scpi.common.IdnCommand, scpi.common.Reset, scpi.common.
 
         # Read waveform data
         raw_data = self._ask_for_ieee_block(":curve?")
-        self._read_raw() # flush buffer
 
-        # Store in trace object
+        # Store in trace object (data is sent MSB first)
         if point_fmt == 'RP' and point_size == 1:
-            trace.y_raw = array.array('B', raw_data[0:points*2])
+            dtype = 'u1'
         elif point_fmt == 'RP' and point_size == 2:
-            trace.y_raw = array.array('H', raw_data[0:points*2])
+            dtype = '>u2'
         elif point_fmt == 'RI' and point_size == 1:
-            trace.y_raw = array.array('b', raw_data[0:points*2])
+            dtype = 'i1'
         elif point_fmt == 'RI' and point_size == 2:
-            trace.y_raw = array.array('h', raw_data[0:points*2])
+            dtype = '>i2'
         elif point_fmt == 'FP' and point_size == 4:
             trace.y_increment = 1
             trace.y_reference = 0
             trace.y_origin = 0
-            trace.y_raw = array.array('f', raw_data[0:points*4])
+            dtype = '>f4'
         else:
             raise UnexpectedResponseException()
 
-        if sys.byteorder == 'little':
-            trace.y_raw.byteswap()
+        points = min(points, len(raw_data) // point_size)
+        trace.y_raw = np.frombuffer(raw_data, dtype=dtype, count=points)
 
         return trace
 
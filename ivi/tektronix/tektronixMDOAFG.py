@@ -509,9 +509,7 @@ class tektronixMDOAFG(fgen.Base, fgen.StdFunc, fgen.ArbWfm, fgen.ArbFrequency,
             raise ivi.ValueNotSupportedException()
 
         # clip on [-1,1]
-        yc = y.clip(-1, 1)
-
-        raw_data = yc.astype('<f').tobytes()
+        raw_data = fgen.encode_arbitrary_waveform(y, '<f4')
 
         self._write(':%s:arbitrary:emem:points:encdg binary' % self._output_name[index])
         self._write_ieee_block(raw_data, ':%s:arbitrary:emem:points ' % self._output_name[index])
@@ -0,0 +1,92 @@
+"""
+
+Python Interchangeable Virtual Instrument Library
+
+Copyright (c) 2014-2016 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+import asyncio
+import io
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import ivi
+import ivi.agilent
+import ivi.aio
+
+
+class Instrument(object):
+    def __init__(self):
+        self.writes = list()
+        self.read_buffer = io.BytesIO()
+
+    def write_raw(self, data):
+        self.writes.append(data)
+        if b'?' in data:
+            self.read_buffer = io.BytesIO(b'+1.0E-03\n')
+
+    def read_raw(self, num=-1):
+        return self.read_buffer.read(num)
+
+
+class TestAsyncDriver(unittest.TestCase):
+
+    def test_async_driver(self):
+        async def run(drvs):
+            rng = await asyncio.gather(*[d.timebase.range for d in drvs])
+            await ivi.aio.set(drvs[0].timebase.range, 2e-3)
+            rng.append(await drvs[0].timebase.range)
+            name = await drvs[0].channels[1].name
+            for d in drvs:
+                await d.close()
+            return rng, name
+
+        instrs = [Instrument() for i in range(3)]
+        drvs = [ivi.aio.AsyncDriver(ivi.agilent.agilentDSOX3034A(i)) for i in instrs]
+        rng, name = asyncio.run(run(drvs))
+        self.assertEqual(rng, [1e-3, 1e-3, 1e-3, 2e-3])
+        self.assertEqual(name, 'channel2')
+        self.assertTrue(b':timebase:range 2.000000e-03' in instrs[0].writes)
+        self.assertFalse(drvs[0].driver.initialized)
+
+    def test_shared_executor(self):
+        executor = ThreadPoolExecutor(max_workers=2)
+
+        async def run(drvs):
+            # queue all operations at once
+            await asyncio.gather(*[ivi.aio.set(d.timebase.range, (i + 1) * 1e-3)
+                for i in range(3) for d in drvs])
+            rng = await asyncio.gather(*[d.timebase.range for d in drvs])
+            for d in drvs:
+                await d.close()
+            return rng
+
+        instrs = [Instrument() for i in range(4)]
+        drvs = [ivi.aio.AsyncDriver(ivi.agilent.agilentDSOX3034A(i), executor=executor) for i in instrs]
+        self.assertEqual(asyncio.run(run(drvs)), [3e-3] * 4)
+        for instr in instrs:
+            # operations of each driver run in order
+            writes = [w for w in instr.writes if w.startswith(b':timebase:range ')]
+            self.assertEqual(writes[-3:], [b':timebase:range %.6e' % ((i + 1) * 1e-3) for i in range(3)])
+        # a shared executor is left running
+        self.assertEqual(executor.submit(lambda: 1).result(), 1)
+        executor.shutdown()
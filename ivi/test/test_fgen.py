@@ -0,0 +1,111 @@
+"""
+
+Python Interchangeable Virtual Instrument Library
+
+Copyright (c) 2014-2016 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+import struct
+import unittest
+
+import numpy as np
+
+from ivi import fgen
+
+
+# encoding loops as implemented in the drivers before encode_arbitrary_waveform
+def encode_tektronixAWG2000(y):
+    raw_data = b''
+
+    for f in y:
+        # clip at -1 and 1
+        if f > 1.0: f = 1.0
+        if f < -1.0: f = -1.0
+
+        f = (f + 1) / 2
+
+        # scale to 12 bits
+        i = int(f * ((1 << 12) - 2) + 0.5) & 0x000fffff
+
+        # add to raw data, MSB first
+        raw_data = raw_data + struct.pack('>H', i)
+
+    return raw_data
+
+
+def encode_agilent3000A(y):
+    raw_data = b''
+
+    for f in y:
+        # clip at -1 and 1
+        if f > 1.0: f = 1.0
+        if f < -1.0: f = -1.0
+
+        raw_data = raw_data + struct.pack('<f', f)
+
+    return raw_data
+
+
+def encode_tektronixMDOAFG(y):
+    yc = y.clip(-1, 1)
+
+    return yc.astype('<f').tobytes()
+
+
+class TestEncodeArbitraryWaveform(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.waveforms = [
+            # clipped on both sides
+            np.sin(np.linspace(0, 2*np.pi, 1000)) * 1.5,
+            # odd lengths
+            rng.uniform(-1.2, 1.2, 1001),
+            rng.uniform(-1, 1, 3),
+            np.array([0.25]),
+            np.array([]),
+            # full scale, mid scale and just outside
+            np.array([-1.0, 0.0, 1.0, -1.0000001, 1.0000001, -np.inf, np.inf, 1e-12, -1e-12]),
+            # exactly between two codes
+            (np.arange(4095) + 0.5) / 2047.0 - 1.0,
+            ]
+
+    def test_12_bit(self):
+        for y in self.waveforms:
+            self.assertEqual(fgen.encode_arbitrary_waveform(y, '>u2', 12), encode_tektronixAWG2000(y))
+
+    def test_float(self):
+        for y in self.waveforms:
+            self.assertEqual(fgen.encode_arbitrary_waveform(y, '<f4'), encode_agilent3000A(y))
+            self.assertEqual(fgen.encode_arbitrary_waveform(y, '<f4'), encode_tektronixMDOAFG(y))
+
+    def test_list(self):
+        y = [-2, -0.5, 0, 0.5, 2]
+        self.assertEqual(fgen.encode_arbitrary_waveform(y, '>u2', 12), encode_tektronixAWG2000(y))
+        self.assertEqual(fgen.encode_arbitrary_waveform(y, '<f4'), encode_agilent3000A(y))
+
+    def test_codes(self):
+        self.assertEqual(fgen.encode_arbitrary_waveform([-1, 0, 1], '>u2', 12), b'\x00\x00\x07\xff\x0f\xfe')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+
+Python Interchangeable Virtual Instrument Library
+
+Copyright (c) 2014-2016 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+import io
+import time
+import unittest
+
+import ivi
+import ivi.agilent
+
+class DCPwrInstrument(object):
+    def __init__(self):
+        self.writes = list()
+        self.read_buffer = io.BytesIO()
+
+    def write_raw(self, data):
+        self.writes.append(data)
+        if data.startswith(b':instrument:nselect'):
+            # two queries per output, voltage then current
+            n = data.count(b'?') // 2
+            resp = ';'.join('%d.5;0.%d' % (i, i) for i in range(1, n+1))
+            self.read_buffer = io.BytesIO(resp.encode() + b'\n')
+        elif b'?' in data:
+            self.read_buffer = io.BytesIO(b'0\n')
+
+    def read_raw(self, num=-1):
+        return self.read_buffer.read(num)
+
+
+class TestFleet(unittest.TestCase):
+
+    def test_fleet(self):
+        instrs = [DCPwrInstrument() for i in range(4)]
+        fleet = ivi.Fleet([ivi.agilent.agilentE3631A(i) for i in instrs])
+        fleet.set('outputs[1].voltage_level', 5.0).check()
+        self.assertEqual(fleet.get('outputs[1].voltage_level'), [5.0] * 4)
+        fleet.set_each('outputs[0].voltage_level', [1, 2, 3, 4]).check()
+        self.assertEqual(fleet.get('outputs[0].voltage_level'), [1, 2, 3, 4])
+        val = fleet.call('outputs.measure_all').check()
+        self.assertEqual(val[3]['voltage'].tolist(), [1.5, 2.5, 3.5])
+        res = fleet.set('outputs[0].voltage_level', 100)
+        self.assertEqual(res.failed, [0, 1, 2, 3])
+        self.assertTrue(isinstance(res.errors[0], ivi.OutOfRangeException))
+        self.assertRaises(ivi.OutOfRangeException, res.check)
+        fleet.close().check()
+        self.assertFalse(any(d.initialized for d in fleet))
+
+    def test_fleet_call_timeout(self):
+        class Member(object):
+            def wait(self, t, value=None):
+                time.sleep(t)
+                return value
+
+        fleet = ivi.Fleet([Member(), Member()])
+        res = fleet.call('wait', 0.5, _timeout=0.05)
+        self.assertEqual(res.failed, [0, 1])
+        self.assertTrue(isinstance(res.errors[0], ivi.IOTimeoutException))
+        self.assertEqual(fleet.call('wait', 0, value=3).check(), [3, 3])
+        fleet._executor.shutdown(wait=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
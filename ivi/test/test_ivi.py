@@ -24,9 +24,18 @@ THE SOFTWARE.
 
 """
 
+import array
+import io
+import struct
+import threading
 import unittest
 
+import numpy as np
+
 import ivi
+import ivi.agilent
+import ivi.extra.dmm
+import ivi.rigol
 
 class TestIndex(unittest.TestCase):
 
@@ -57,5 +66,570 @@ class TestIndex(unittest.TestCase):
         self.assertRaises(ivi.SelectorRangeException, ivi.get_index, self.index_dict, 100);
         self.assertRaises(ivi.SelectorNameException, ivi.get_index, self.index_dict, 'bad_item');
 
+class TestPropertyCollection(unittest.TestCase):
+
+    def setUp(self):
+        self.value = 0
+        self.pc = ivi.PropertyCollection()
+        self.pc._add_property('rw', self._get, self._set)
+        self.pc._add_property('ro', self._get)
+        self.pc._add_property('wo', None, self._set)
+        self.pc._add_method('method', lambda: 'called')
+        self.pc._lock()
+
+    def _get(self):
+        return self.value
+
+    def _set(self, value):
+        self.value = value
+
+    def test_property(self):
+        self.pc.rw = 5
+        self.assertEqual(self.value, 5)
+        self.assertEqual(self.pc.rw, 5)
+        self.assertEqual(self.pc.ro, 5)
+        self.assertFalse('rw' in self.pc.__dict__)
+        self.assertRaises(AttributeError, setattr, self.pc, 'ro', 1)
+        self.assertRaises(AttributeError, getattr, self.pc, 'wo')
+        self.assertRaises(AttributeError, delattr, self.pc, 'rw')
+        self.assertEqual(self.pc.method(), 'called')
+
+    def test_lock(self):
+        self.assertRaises(AttributeError, setattr, self.pc, 'other', 1)
+        self.assertRaises(AttributeError, getattr, self.pc, 'other')
+        self.pc._unlock()
+        self.pc.other = 1
+        self.assertEqual(self.pc.other, 1)
+        self.pc._lock()
+        self.pc.other = 2
+        self.assertRaises(AttributeError, delattr, self.pc, 'other2')
+
+    def test_del_property(self):
+        self.pc._del_property('rw')
+        self.assertRaises(AttributeError, getattr, self.pc, 'rw')
+        self.pc._del_property('method')
+        self.assertRaises(AttributeError, getattr, self.pc, 'method')
+
+
+class CacheDriver(ivi.Driver):
+    def __init__(self, *args, **kwargs):
+        self._value = 0
+        self._value_reads = 0
+        super(CacheDriver, self).__init__(*args, **kwargs)
+        self._add_property('value',
+                        self._get_value,
+                        self._set_value)
+        self._add_property('channels[].value',
+                        self._get_channel_value)
+
+    def _get_value(self):
+        if not self._get_cache_valid():
+            self._value_reads += 1
+            self._set_cache_valid()
+        return self._value
+
+    def _set_value(self, value):
+        self._value = value
+        self._set_cache_valid()
+
+    def _get_channel_value(self, index):
+        if not self._get_cache_valid(index=index):
+            self._value_reads += 1
+            self._set_cache_valid(index=index)
+        return index
+
+
+class TestIndexedPropertyCollection(unittest.TestCase):
+
+    def setUp(self):
+        self.drv = CacheDriver()
+        self.drv.channels._set_list(['ch1', 'ch2', 'ch3'])
+
+    def test_lazy_build(self):
+        self.assertEqual(self.drv.channels._objs, [None, None, None])
+        self.assertEqual(self.drv.channels['ch2'].value, 1)
+        self.assertTrue(self.drv.channels[1] is self.drv.channels['ch2'])
+        self.assertTrue(self.drv.channels._objs[0] is None)
+        self.assertEqual([ch.value for ch in self.drv.channels], [0, 1, 2])
+        self.assertEqual([ch.value for ch in self.drv.channels[1:]], [1, 2])
+
+    def test_add_after_build(self):
+        self.drv.channels[0].value
+        self.drv._add_property('channels[].sub.name',
+                        lambda i: self.drv.channels._indicies[i])
+        self.assertEqual(self.drv.channels[0].sub.name, 'ch1')
+        self.assertRaises(AttributeError, setattr, self.drv.channels[0].sub, 'name', 'x')
+        self.assertRaises(AttributeError, setattr, self.drv.channels[0], 'other', 1)
+
+
+class TestCache(unittest.TestCase):
+
+    def setUp(self):
+        self.drv = CacheDriver()
+        self.drv.channels._set_list(['ch1', 'ch2'])
+
+    def test_cache_tag(self):
+        self.assertEqual(ivi.get_cache_tag('_get_value'), 'value')
+        self.assertEqual(ivi.get_cache_tag('_set_value'), 'value')
+        self.assertEqual(ivi.get_cache_tag('value'), 'value')
+        self.assertEqual(ivi.register_cache_tag(self.drv._get_value), 'value')
+        self.assertEqual(ivi.register_cache_tag(self.drv._set_value), 'value')
+
+    def test_cache_valid(self):
+        self.drv.value
+        self.drv.value
+        self.assertEqual(self.drv._value_reads, 1)
+        self.drv._set_cache_valid(False, 'value')
+        self.drv.value
+        self.assertEqual(self.drv._value_reads, 2)
+        self.drv.value = 5
+        self.assertEqual(self.drv._get_cache_valid('value'), True)
+        self.drv.driver_operation.invalidate_all_attributes()
+        self.assertEqual(self.drv._get_cache_valid('value'), False)
+
+    def test_cache_valid_index(self):
+        self.drv.channels[0].value
+        self.drv.channels[1].value
+        self.drv.channels[0].value
+        self.assertEqual(self.drv._value_reads, 2)
+        self.assertEqual(self.drv._get_cache_valid('channel_value', 1), True)
+        self.drv._set_cache_valid(False, 'channel_value', 1)
+        self.drv.channels[1].value
+        self.assertEqual(self.drv._value_reads, 3)
+
+    def test_cache_disabled(self):
+        self.drv.driver_operation.cache = False
+        self.drv.value
+        self.drv.value
+        self.assertEqual(self.drv._value_reads, 2)
+
+
+class TestTrace(unittest.TestCase):
+
+    def setUp(self):
+        self.trace = ivi.TraceYT()
+        self.trace.y_raw = array.array('H', [0, 1, 2, 3, 4])
+        self.trace.y_increment = 0.5
+        self.trace.y_origin = 1.0
+        self.trace.y_reference = 2
+        self.trace.y_hole = 0
+        self.trace.x_increment = 1e-3
+        self.trace.x_origin = -1e-3
+        self.trace.x_reference = 0
+
+    def test_y(self):
+        y = self.trace.y
+        self.assertTrue(np.isnan(y[0]))
+        self.assertTrue(np.allclose(y[1:], [0.5, 1.0, 1.5, 2.0]))
+        self.assertEqual(len(self.trace), 5)
+
+    def test_x(self):
+        self.assertTrue(np.allclose(self.trace.x, [-1e-3, 0, 1e-3, 2e-3, 3e-3]))
+        self.assertTrue(self.trace.t is self.trace.x)
+
+    def test_cached(self):
+        y = self.trace.y
+        self.assertTrue(self.trace.y is y)
+        self.assertFalse(y.flags.writeable)
+        self.trace.y_origin = 0.0
+        self.assertFalse(self.trace.y is y)
+        self.assertTrue(np.allclose(self.trace.y[1:], [-0.5, 0.0, 0.5, 1.0]))
+        x = self.trace.x
+        self.trace.x_origin = 0.0
+        self.assertFalse(self.trace.x is x)
+        self.assertEqual(self.trace.x[0], 0.0)
+
+    def test_zero_copy(self):
+        raw = np.arange(5, dtype='>i2')
+        self.trace.y_raw = raw
+        self.assertTrue(self.trace.y_raw is raw)
+
+    def test_dtype_and_out(self):
+        y32 = self.trace.get_y(np.float32)
+        self.assertEqual(y32.dtype, np.float32)
+        self.assertTrue(np.allclose(y32[1:], self.trace.y[1:]))
+        out = np.zeros(5)
+        res = self.trace.get_y(out=out)
+        self.assertTrue(res is out)
+        self.assertTrue(np.allclose(out[1:], self.trace.y[1:]))
+        out = np.zeros(5, np.float32)
+        self.trace.get_x(out=out)
+        self.assertTrue(np.allclose(out, self.trace.x))
+
+    def test_iter(self):
+        l = list(self.trace)
+        self.assertEqual(len(l), 5)
+        self.assertAlmostEqual(l[2][0], 1e-3)
+        self.assertAlmostEqual(l[2][1], 1.0)
+        self.assertAlmostEqual(self.trace[3][1], 1.5)
+
+
+class BlockInstrument(object):
+    def __init__(self, data):
+        self.read_buffer = io.BytesIO(data)
+        self.reads = list()
+
+    def write_raw(self, data):
+        pass
+
+    def read_raw(self, num=-1):
+        self.reads.append(num)
+        return self.read_buffer.read(num)
+
+
+class StreamInstrument(object):
+    "Byte stream instrument that keeps unread data across commands"
+    def __init__(self, responses):
+        self.responses = responses
+        self.pending = bytearray()
+
+    def write_raw(self, data):
+        self.pending += self.responses.get(data.rstrip(b'\n'), b'')
+
+    def read_raw(self, num=-1):
+        # like a serial port, stop at the termination character
+        i = self.pending.find(b'\n')
+        n = len(self.pending) if i < 0 else i + 1
+        if num >= 0:
+            n = min(n, num)
+        data = bytes(self.pending[0:n])
+        del self.pending[0:n]
+        return data
+
+
+class TestIeeeBlock(unittest.TestCase):
+
+    def setUp(self):
+        self.payload = bytes(bytearray(range(256)) * 40)
+
+    def test_read_ieee_block(self):
+        instr = BlockInstrument(ivi.build_ieee_block(self.payload) + b'\n')
+        drv = ivi.Driver(instr)
+        progress = list()
+        data = drv._read_ieee_block(chunk_size=1000, progress=lambda n, t: progress.append((n, t)))
+        self.assertEqual(bytes(data), self.payload)
+        self.assertEqual(progress[-1], (len(self.payload), len(self.payload)))
+        self.assertTrue(max(instr.reads) <= 1000)
+        # terminator consumed
+        self.assertEqual(instr.read_buffer.read(), b'')
+
+    def test_read_ieee_block_short_header(self):
+        instr = BlockInstrument(b'#15hello\n')
+        drv = ivi.Driver(instr)
+        self.assertEqual(bytes(drv._read_ieee_block()), b'hello')
+        self.assertEqual(instr.read_buffer.read(), b'')
+
+    def test_read_ieee_block_stream(self):
+        # terminator consumed even when the block fits in one read
+        instr = StreamInstrument({
+            b':DATA?': b'#18' + struct.pack('>d', 1.5) + b'\n',
+            b':EMPTY?': b'#10\n',
+            b':NL?': b'#13\n\n\n\n',
+            b'*IDN?': b'TEST\n'})
+        drv = ivi.Driver(instr)
+        for i in range(2):
+            self.assertEqual(bytes(drv._ask_for_ieee_block(':DATA?')), struct.pack('>d', 1.5))
+            self.assertEqual(drv._ask('*IDN?'), 'TEST')
+        self.assertEqual(bytes(drv._ask_for_ieee_block(':EMPTY?')), b'')
+        self.assertEqual(drv._ask('*IDN?'), 'TEST')
+        self.assertEqual(bytes(drv._ask_for_ieee_block(':NL?')), b'\n\n\n')
+        self.assertEqual(drv._ask('*IDN?'), 'TEST')
+        self.assertEqual(len(instr.pending), 0)
+
+    def test_read_ieee_block_buffer(self):
+        instr = BlockInstrument(ivi.build_ieee_block(self.payload) + b'\n')
+        drv = ivi.Driver(instr)
+        buf = np.zeros(len(self.payload) // 2 + 10, dtype=np.uint16)
+        data = drv._read_ieee_block(buf=buf, chunk_size=4096)
+        self.assertEqual(len(data), len(self.payload))
+        self.assertEqual(buf.tobytes()[0:len(self.payload)], self.payload)
+        instr = BlockInstrument(ivi.build_ieee_block(self.payload) + b'\n')
+        drv = ivi.Driver(instr)
+        self.assertRaises(ivi.OutOfRangeException, drv._read_ieee_block, bytearray(10))
+
+    def test_read_ieee_block_indefinite(self):
+        instr = BlockInstrument(b'#0hello')
+        drv = ivi.Driver(instr)
+        self.assertEqual(bytes(drv._read_ieee_block()), b'hello')
+
+
+class TestDecodeValues(unittest.TestCase):
+
+    def test_decode_values(self):
+        val = ivi.decode_values('+1.5E+00,-2.0E-01,NAN,+9.9E+37\n')
+        self.assertEqual(val.dtype, np.float64)
+        self.assertEqual(val[0:2].tolist(), [1.5, -0.2])
+        self.assertTrue(np.isnan(val[2]))
+        self.assertEqual(val[3], 9.9e37)
+        self.assertEqual(ivi.decode_values('1 2  3', ' ').tolist(), [1, 2, 3])
+        self.assertEqual(len(ivi.decode_values('')), 0)
+        self.assertRaises(ValueError, ivi.decode_values, '1,abc,3')
+
+    def test_decode_values_overload(self):
+        val = ivi.decode_values('1,9.9E37,-9.9E37,9.91E37', overload=np.inf)
+        self.assertEqual(val[0:3].tolist(), [1, np.inf, -np.inf])
+        self.assertTrue(np.isnan(val[3]))
+
+    def test_decode_values_out(self):
+        out = np.zeros(8)
+        val = ivi.decode_values('1,2,3', out=out)
+        self.assertEqual(val.tolist(), [1, 2, 3])
+        self.assertTrue(np.shares_memory(val, out))
+        self.assertRaises(ivi.OutOfRangeException, ivi.decode_values, '1,2,3', out=np.zeros(2))
+
+
+class RecordingInstrument(object):
+    def __init__(self):
+        self.writes = list()
+        self.read_buffer = io.BytesIO()
+
+    def write_raw(self, data):
+        self.writes.append(data)
+        if b'?' in data:
+            self.read_buffer = io.BytesIO(b'1\n')
+
+    def read_raw(self, num=-1):
+        return self.read_buffer.read(num)
+
+
+class TestBatch(unittest.TestCase):
+
+    def test_batch(self):
+        instr = RecordingInstrument()
+        drv = ivi.Driver(instr)
+        with drv.batch():
+            drv._write(":timebase:range 1")
+            drv._write("trigger:source chan1")
+            drv._write("*CLS")
+            self.assertEqual(instr.writes, [])
+        self.assertEqual(instr.writes, [b':timebase:range 1;:trigger:source chan1;*CLS'])
+
+    def test_batch_query(self):
+        instr = RecordingInstrument()
+        drv = ivi.Driver(instr)
+        with drv.batch():
+            drv._write(":channel1:range 1")
+            self.assertEqual(drv._ask(":channel1:range?"), '1')
+            drv._write(":channel1:offset 0")
+        self.assertEqual(instr.writes, [b':channel1:range 1;:channel1:range?', b':channel1:offset 0'])
+
+    def test_batch_query_list(self):
+        instr = RecordingInstrument()
+        asked = list()
+        def ask(data, num=-1, encoding='utf-8'):
+            # interface-level ask that bypasses the driver write path
+            asked.append(list(data))
+            return ['1' for d in data]
+        instr.ask = ask
+        drv = ivi.Driver(instr)
+        with drv.batch():
+            drv._write(":channel1:range 1")
+            self.assertEqual(drv._ask([":channel1:range?", ":channel1:offset?"]), ['1', '1'])
+        self.assertEqual(instr.writes, [b':channel1:range 1'])
+        self.assertEqual(asked, [[":channel1:range?", ":channel1:offset?"]])
+
+    def test_batch_exception(self):
+        instr = RecordingInstrument()
+        drv = ivi.Driver(instr)
+        try:
+            with drv.batch():
+                drv._write(":channel1:range 1")
+                raise ValueError()
+        except ValueError:
+            pass
+        self.assertEqual(instr.writes, [])
+        with drv.batch():
+            drv._write(":channel1:offset 0")
+        self.assertEqual(instr.writes, [b':channel1:offset 0'])
+
+    def test_batch_max_length(self):
+        instr = RecordingInstrument()
+        drv = ivi.Driver(instr)
+        with drv.batch(max_length=21):
+            for i in range(4):
+                drv._write(":output%d 1" % i)
+        self.assertEqual(instr.writes, [b':output0 1;:output1 1', b':output2 1;:output3 1'])
+        self.assertEqual(drv._batch_max_length, 1024)
+
+
+class DCPwrInstrument(object):
+    def __init__(self):
+        self.writes = list()
+        self.read_buffer = io.BytesIO()
+
+    def write_raw(self, data):
+        self.writes.append(data)
+        if data.startswith(b':instrument:nselect'):
+            # two queries per output, voltage then current
+            n = data.count(b'?') // 2
+            resp = ';'.join('%d.5;0.%d' % (i, i) for i in range(1, n+1))
+            self.read_buffer = io.BytesIO(resp.encode() + b'\n')
+        elif b'?' in data:
+            self.read_buffer = io.BytesIO(b'0\n')
+
+    def read_raw(self, num=-1):
+        return self.read_buffer.read(num)
+
+
+class MeasureAllInstrument(object):
+    "Answers measure:all? with a fixed reply"
+    def __init__(self, reply):
+        self.reply = reply
+        self.writes = list()
+        self.read_buffer = io.BytesIO()
+
+    def write_raw(self, data):
+        self.writes.append(data)
+        if data.startswith(b':measure:all?'):
+            self.read_buffer = io.BytesIO(self.reply.encode() + b'\n')
+        elif b'?' in data:
+            self.read_buffer = io.BytesIO(b'0\n')
+
+    def read_raw(self, num=-1):
+        return self.read_buffer.read(num)
+
+
+class TestMeasureAll(unittest.TestCase):
+
+    def test_measure_all(self):
+        instr = DCPwrInstrument()
+        drv = ivi.agilent.agilentE3631A(instr)
+        instr.writes = list()
+        val = drv.outputs.measure_all()
+        self.assertEqual(val['voltage'].tolist(), [1.5, 2.5, 3.5])
+        self.assertEqual(val['current'].tolist(), [0.1, 0.2, 0.3])
+        self.assertEqual(len(instr.writes), 1)
+        self.assertTrue('outputs.measure_all' in drv.doc())
+        # collection methods are not indexed
+        self.assertFalse(hasattr(drv.outputs[0], 'measure_all'))
+
+    def test_measure_all_fields(self):
+        instr = MeasureAllInstrument('1.5,0.1,0.15;2.5,0.2,0.5;3.5,0.3,1.05')
+        drv = ivi.rigol.rigolDP832(instr)
+        instr.writes = list()
+        val = drv.outputs.measure_all()
+        self.assertEqual(instr.writes, [b':measure:all? ch1;:measure:all? ch2;:measure:all? ch3'])
+        self.assertEqual(val['voltage'].tolist(), [1.5, 2.5, 3.5])
+        self.assertEqual(val['current'].tolist(), [0.1, 0.2, 0.3])
+        # a reply that does not match the queries is not silently reshaped
+        instr.reply = '1.5,0.1;2.5,0.2;3.5,0.3'
+        self.assertRaises(ivi.UnexpectedResponseException, drv.outputs.measure_all)
+        instr.reply = '1.5,0.1,0.15'
+        self.assertRaises(ivi.UnexpectedResponseException, drv.outputs.measure_all)
+
+
+class StreamDriver(ivi.Driver, ivi.extra.dmm.Streaming):
+    "Streams the chunks in memory, checking that the driver I/O lock is held"
+    def __init__(self, *args, **kwargs):
+        self.memory = list()
+        self.locked = list()
+        super(StreamDriver, self).__init__(*args, **kwargs)
+
+    def _measurement_stream_read(self, max_count=None):
+        t = threading.Thread(target=lambda: self.locked.append(not self._io_lock.acquire(False)))
+        t.start()
+        t.join()
+        if self.memory:
+            return np.array(self.memory.pop(0))
+        return None
+
+
+class TestReadingStream(unittest.TestCase):
+
+    def chunks(self, n):
+        "Read function producing n chunks, then stopping the stream set up by start"
+        produced = list()
+        self.started = threading.Event()
+
+        def read():
+            if len(produced) < n:
+                produced.append(len(produced))
+                return np.array(produced[-1:])
+            self.started.wait()
+            self.stream.stop()
+            return None
+        return read
+
+    def start(self, *args, **kwargs):
+        self.stream = ivi.extra.dmm.ReadingStream(*args, **kwargs)
+        self.started.set()
+
+    def test_block(self):
+        read = self.chunks(5)
+        consumed = list()
+
+        def check_room():
+            # with the default overflow, the thread waits for room before reading again
+            self.started.wait()
+            self.assertTrue(len(self.stream._queue) <= 2)
+            return read()
+
+        self.start(check_room, 0, max_queued=2)
+        for chunk in self.stream:
+            self.assertTrue(len(self.stream._queue) <= 2)
+            consumed.extend(chunk.tolist())
+        self.assertEqual(consumed, [0, 1, 2, 3, 4])
+        self.assertEqual(self.stream.dropped, 0)
+        self.assertEqual(self.stream.error, None)
+
+    def test_drop_oldest(self):
+        self.start(self.chunks(10), 0, max_queued=3, overflow='drop')
+        self.stream._thread.join()
+        self.assertEqual([c.tolist() for c in self.stream], [[7], [8], [9]])
+        self.assertEqual(self.stream.dropped, 7)
+
+    def test_error(self):
+        read = self.chunks(2)
+
+        def fail():
+            data = read()
+            if data is None:
+                raise ivi.IOException()
+            return data
+
+        self.start(fail, 0)
+        self.assertEqual(next(self.stream).tolist(), [0])
+        self.assertEqual(next(self.stream).tolist(), [1])
+        self.assertRaises(ivi.IOException, next, self.stream)
+        self.assertRaises(StopIteration, next, self.stream)
+
+    def test_overflow(self):
+        self.assertRaises(ivi.ValueNotSupportedException,
+                ivi.extra.dmm.ReadingStream, self.chunks(0), overflow='wrap')
+
+    def test_driver_lock(self):
+        drv = StreamDriver(RecordingInstrument())
+        drv.memory = [[1.0, 2.0], [3.0]]
+        data = list()
+        with drv.measurement.stream(0) as s:
+            for chunk in s:
+                data.extend(chunk)
+                if len(data) == 3:
+                    s.stop()
+        self.assertEqual(data, [1.0, 2.0, 3.0])
+        self.assertTrue(len(drv.locked) >= 2 and all(drv.locked))
+        # the lock is released between transfers
+        self.assertTrue(drv._io_lock.acquire(False))
+        drv._io_lock.release()
+
+    def test_transaction_blocks_io(self):
+        drv = ivi.Driver(RecordingInstrument())
+        drv._initialized = True
+        done = threading.Event()
+
+        def ask():
+            drv._ask('*idn?')
+            done.set()
+
+        t = threading.Thread(target=ask)
+        with drv._transaction():
+            drv._write('*rst')
+            t.start()
+            self.assertFalse(done.wait(0.05))
+            self.assertEqual(drv._interface.writes, [b'*rst'])
+        t.join()
+        self.assertEqual(drv._interface.writes, [b'*rst', b'*idn?'])
+
+
 if __name__ == '__main__':
     unittest.main()
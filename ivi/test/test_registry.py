@@ -0,0 +1,52 @@
+"""
+
+Python Interchangeable Virtual Instrument Library
+
+Copyright (c) 2014-2016 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+import sys
+import unittest
+
+import ivi
+import ivi.agilent
+
+class TestRegistry(unittest.TestCase):
+
+    def test_list_drivers(self):
+        l = ivi.list_drivers()
+        self.assertTrue('agilent.agilentDSOX3034A' in l)
+        self.assertTrue('tektronix.tektronixAWG2021' in l)
+        self.assertEqual(ivi.list_drivers('colby'), ['colby.colbyPDL10A'])
+
+    def test_lazy_import(self):
+        self.assertTrue('agilent86145B' in dir(ivi.agilent))
+        drv = ivi.agilent.agilent86145B
+        self.assertTrue('ivi.agilent.agilent86145B' in sys.modules)
+        self.assertTrue(issubclass(drv, ivi.Driver))
+        # driver module imported by another driver must be bound as a class
+        self.assertTrue(issubclass(ivi.agilent.agilent86140B, ivi.Driver))
+        self.assertRaises(AttributeError, getattr, ivi.agilent, 'agilentNoSuchDriver')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+"""
+
+Python Interchangeable Virtual Instrument Library
+
+Copyright (c) 2014-2016 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+import io
+import socket
+import threading
+import unittest
+
+import ivi
+import ivi.agilent
+
+class PoolInstrument(object):
+    def __init__(self):
+        self.writes = list()
+        self.read_buffer = io.BytesIO()
+        self.closed = False
+        self.fail = False
+
+    def write_raw(self, data):
+        if self.fail:
+            err, self.fail = self.fail, False
+            raise err
+        self.writes.append(data)
+        if b'?' in data:
+            self.read_buffer = io.BytesIO(b'1\n')
+
+    def read_raw(self, num=-1):
+        return self.read_buffer.read(num)
+
+    def close(self):
+        self.closed = True
+
+
+class CountingLock(object):
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.depth = 0
+
+    def acquire(self, *args):
+        r = self.lock.acquire(*args)
+        self.depth += 1
+        return r
+
+    def release(self):
+        self.depth -= 1
+        self.lock.release()
+
+    __enter__ = acquire
+
+    def __exit__(self, *args):
+        self.release()
+
+
+class VirtualPool(ivi.session.SessionPool):
+    def __init__(self, *args, **kwargs):
+        super(VirtualPool, self).__init__(*args, **kwargs)
+        self.opened = list()
+
+    def open_interface(self, resource, prefer_pyvisa=False):
+        instr = PoolInstrument()
+        self.opened.append(instr)
+        return instr
+
+
+class TestSessionPool(unittest.TestCase):
+
+    def test_share(self):
+        pool = VirtualPool(ttl=60)
+        drv1 = ivi.Driver("TCPIP0::10.0.0.1::INSTR", session_pool=pool)
+        drv2 = ivi.Driver("TCPIP0::10.0.0.1::INSTR", session_pool=pool)
+        drv3 = ivi.Driver("TCPIP0::10.0.0.1::gpib0,5::INSTR", session_pool=pool)
+        self.assertEqual(len(pool.opened), 2)
+        self.assertTrue(drv1._interface is drv2._interface)
+        # same LAN host, same lock
+        self.assertTrue(drv1._interface.lock is drv3._interface.lock)
+        self.assertEqual(drv1._ask("*IDN?"), '1')
+        drv1.close()
+        drv2.close()
+        # idle session kept open and reused
+        drv1 = ivi.Driver("TCPIP0::10.0.0.1::INSTR", session_pool=pool)
+        self.assertEqual(len(pool.opened), 2)
+        self.assertFalse(pool.opened[0].closed)
+        drv1.close()
+        pool.ttl = 0
+        pool.expire()
+        self.assertTrue(pool.opened[0].closed)
+        self.assertEqual(len(pool), 1)
+        pool.close_all()
+        self.assertTrue(pool.opened[1].closed)
+
+    def test_reconnect(self):
+        pool = VirtualPool()
+        drv = ivi.Driver("GPIB0::5::INSTR", session_pool=pool)
+        pool.opened[0].fail = EOFError()
+        self.assertEqual(drv._ask("*IDN?"), '1')
+        self.assertEqual(len(pool.opened), 2)
+        self.assertTrue(pool.opened[0].closed)
+        self.assertEqual(pool.opened[1].writes, [b'*IDN?'])
+
+    def test_timeout_not_retried(self):
+        pool = VirtualPool()
+        drv = ivi.Driver("GPIB0::5::INSTR", session_pool=pool)
+        pool.opened[0].fail = socket.timeout()
+        self.assertRaises(socket.timeout, drv._ask, "*IDN?")
+        self.assertEqual(len(pool.opened), 1)
+        self.assertEqual(pool.opened[0].writes, [])
+
+    def test_transaction_lock(self):
+        pool = VirtualPool()
+        drv = ivi.Driver("GPIB0::5::INSTR", session_pool=pool)
+        instr = pool.opened[0]
+        lock = drv._interface.lock = CountingLock()
+        depth = list()
+        block = io.BytesIO(b'#13abc\n')
+
+        def read_raw(num=-1):
+            # the driver holds the lock from the write through every read
+            depth.append(lock.depth)
+            return block.read(num)
+
+        instr.read_raw = read_raw
+        self.assertEqual(bytes(drv._ask_for_ieee_block(":wav:data?")), b'abc')
+        self.assertTrue(len(depth) > 0)
+        self.assertTrue(min(depth) > 1)
+
+    def test_driver_transaction_lock(self):
+        # drivers pairing _write with _read_raw hold the lock as well
+        pool = VirtualPool()
+        drv = ivi.agilent.agilent8340B("GPIB0::5::INSTR", session_pool=pool)
+        instr = pool.opened[0]
+        lock = drv._interface.lock = CountingLock()
+        depth = list()
+
+        def read_raw(num=-1):
+            depth.append(lock.depth)
+            return b'setup'
+
+        instr.read_raw = read_raw
+        self.assertEqual(drv.system.fetch_setup(), b'setup')
+        self.assertEqual(depth, [2])
+
+    def test_attributes(self):
+        pool = VirtualPool()
+        drv = ivi.Driver("GPIB0::5::INSTR", session_pool=pool)
+        drv._interface.timeout = 5
+        drv._interface.term_char = '\r'
+        self.assertEqual(pool.opened[0].timeout, 5)
+        self.assertEqual(drv._interface.term_char, '\r')
+        # settings survive a reconnect
+        pool.opened[0].fail = EOFError()
+        drv._write("*CLS")
+        self.assertEqual(len(pool.opened), 2)
+        self.assertEqual(pool.opened[1].timeout, 5)
+        self.assertEqual(pool.opened[1].term_char, '\r')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+
+Python Interchangeable Virtual Instrument Library
+
+Copyright (c) 2014-2016 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+import time
+import unittest
+
+import ivi
+from ivi.interface.test.test_hislip import HislipServer
+
+class StatusInstrument(object):
+    "Instrument that sets status byte bit 4 after a delay"
+    def __init__(self, delay):
+        self.settle_time = time.time() + delay
+        self.stb_reads = 0
+
+    def write_raw(self, data):
+        pass
+
+    def read_raw(self, num=-1):
+        return b''
+
+    def read_stb(self):
+        self.stb_reads += 1
+        return 0x10 if time.time() >= self.settle_time else 0
+
+
+class TestWait(unittest.TestCase):
+
+    def test_wait_for_stb(self):
+        instr = StatusInstrument(0.05)
+        drv = ivi.Driver(instr)
+        self.assertTrue(drv._wait_for_stb(0x10, 1.0))
+        self.assertTrue(time.time() - instr.settle_time < 0.02)
+        # polling backs off instead of spinning
+        self.assertTrue(instr.stb_reads < 30)
+
+        instr = StatusInstrument(10)
+        drv = ivi.Driver(instr)
+        t = time.time()
+        self.assertFalse(drv._wait_for_stb(0x10, 0.05))
+        self.assertTrue(0.05 <= time.time() - t < 0.1)
+
+    def test_wait_for_operation_complete(self):
+        server = HislipServer({
+            b'*ESE?': b'4\n',
+            b'*SRE?': b'16\n',
+            b'*ESE 1;*SRE 48;*ESR?;*OPC': b'0\n'})
+        server.start()
+        drv = ivi.Driver("TCPIP0::127.0.0.1::hislip0,%d::INSTR" % server.port)
+        t = time.time()
+        self.assertTrue(drv._wait_for_operation_complete(5))
+        self.assertTrue(time.time() - t < 1)
+        drv.close()
+        server.join(5)
+        # stale events cleared before *OPC, event and service request enable restored
+        self.assertEqual(server.received, [b'*ESE?', b'*SRE?', b'*ESE 1;*SRE 48;*ESR?;*OPC',
+                b'*ESE 4;*SRE 16', b'*ESR?'])
+
+    def test_max_time_to_seconds(self):
+        self.assertEqual(ivi.max_time_to_seconds(1500), 1.5)
+        self.assertEqual(ivi.max_time_to_seconds(0), 0)
+        self.assertEqual(ivi.max_time_to_seconds(-1), None)
+        self.assertEqual(ivi.max_time_to_seconds(None), None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -24,10 +24,9 @@ THE SOFTWARE.
 
 """
 
-# Enviromental Chambers
-from .testequityf4 import testequityf4
-from .testequity140 import testequity140
-
-
-
+from ..registry import register_drivers
 
+register_drivers(__name__, [
+        # Enviromental Chambers
+        "testequityf4",
+        "testequity140"])